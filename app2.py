@@ -1,9 +1,12 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-import itertools
 
-FILTER_NUMBERS = {52, 55, 61, 67, 73, 79, 91}
+import ui
+from lotto import budget, export, metrics, parallel
+from lotto.cache import cached, make_key
+from lotto.jobs import job_runner
+from lotto.pick import calc_unique_combinations, iter_search_blocks, iter_search_blocks_parallel, lazy_combinations
+from lotto.results import ComboArray
+
 
 def check_password():
     if 'authenticated' not in st.session_state:
@@ -15,114 +18,27 @@ def check_password():
         if st.button("로그인", use_container_width=True):
             if password == 1234:
                 st.session_state.authenticated = True
-                st.session_state.filtered_selections = []
-                st.session_state.unfiltered_selections = []
+                st.session_state.filtered_selections = ComboArray()
+                st.session_state.unfiltered_selections = ComboArray()
                 st.rerun()
             else:
                 st.error("❌ 잘못된 비밀번호입니다. 다시 시도해주세요.")
         return False
     return True
 
-def generate_combinations_with_max_two(nums):
-    combs = []
-    if len(nums) == 0:
-        return []
-    combs.extend(itertools.combinations(nums, 1))
-    if len(nums) >= 2:
-        combs.extend(itertools.combinations(nums, 2))
-    return combs
-
-def calc_unique_combinations(inputs):
-    """유효 조합 개수만 계산 (최적화)"""
-    if not all(len(col) > 0 for col in inputs):
-        return 0
-    
-    count = [0]
-    
-    def backtrack(col_idx, current_size, used_numbers):
-        if col_idx == 6:
-            if current_size == 6:
-                count[0] += 1
-            return
-        
-        for size in [1, 2]:
-            if current_size + size > 6:
-                continue
-            if current_size + size + (5 - col_idx) < 6:
-                continue
-                
-            for combo in itertools.combinations(inputs[col_idx], size):
-                if not any(num in used_numbers for num in combo):
-                    backtrack(col_idx + 1, 
-                            current_size + size, 
-                            used_numbers | set(combo))
-    
-    backtrack(0, 0, set())
-    return count[0]
-
-def generate_unfiltered_combinations(inputs):
-    """일반 조합 생성 (최적화)"""
-    results = []
-    
-    def backtrack(col_idx, current_combo, used_numbers):
-        if col_idx == 6:
-            if len(current_combo) == 6:
-                results.append(tuple(current_combo))
-            return
-        
-        for size in [1, 2]:
-            if len(current_combo) + size > 6:
-                continue
-            if len(current_combo) + size + (5 - col_idx) < 6:
-                continue
-                
-            for combo in itertools.combinations(inputs[col_idx], size):
-                if not any(num in used_numbers for num in combo):
-                    backtrack(col_idx + 1, 
-                            current_combo + list(combo), 
-                            used_numbers | set(combo))
-    
-    backtrack(0, [], set())
-    return results
-
-def generate_filtered_combinations(inputs):
-    """필터 조합 생성 (최적화)"""
-    results = []
-    
-    def backtrack(col_idx, current_combo, used_numbers, filter_count):
-        if col_idx == 6:
-            if len(current_combo) == 6 and filter_count <= 1:
-                results.append(tuple(current_combo))
-            return
-        
-        for size in [1, 2]:
-            if len(current_combo) + size > 6:
-                continue
-            if len(current_combo) + size + (5 - col_idx) < 6:
-                continue
-                
-            for combo in itertools.combinations(inputs[col_idx], size):
-                if not any(num in used_numbers for num in combo):
-                    new_filter_count = filter_count + sum(1 for n in combo if n in FILTER_NUMBERS)
-                    if new_filter_count <= 1:
-                        backtrack(col_idx + 1, 
-                                current_combo + list(combo), 
-                                used_numbers | set(combo),
-                                new_filter_count)
-    
-    backtrack(0, [], set(), 0)
-    return results
 
 def main():
     if not check_password():
         return
     
+    ui.start_metrics("app2")
+    
     st.title("로또 조합 생성기 (52,55,61,67,73,79,91 필터링)")
     
     if 'filtered_selections' not in st.session_state:
-        st.session_state.filtered_selections = []
+        st.session_state.filtered_selections = ComboArray()
     if 'unfiltered_selections' not in st.session_state:
-        st.session_state.unfiltered_selections = []
+        st.session_state.unfiltered_selections = ComboArray()
     
     cols = []
     for i in range(6):
@@ -136,44 +52,130 @@ def main():
             if x.isdigit():
                 nums.add(int(x))
         inputs.append(sorted(nums))
+    # 생성 도중이 아니라 입력 단계에서 범위를 벗어난 숫자를 거름
+    inputs = ui.check_inputs(inputs)
     
     st.write("입력 숫자:", inputs)
     
     if st.button("조합 개수 계산"):
-        count = calc_unique_combinations(inputs)
+        with metrics.stage("count"):
+            count = cached("app2.count", inputs, lambda: calc_unique_combinations(inputs))
         st.write(f"생성 가능한 조합 수: {count}")
     
-    tab1, tab2 = st.tabs(["필터링 조합", "일반 조합"])
+    use_parallel = st.checkbox(f"멀티코어 병렬 실행 ({parallel.PROCESSES}개 프로세스)", key="app2_parallel")
+    search = iter_search_blocks_parallel if use_parallel else iter_search_blocks
+    constraints = ui.render_constraints("app2")
+    
+    tab1, tab2, tab3 = st.tabs(["필터링 조합", "일반 조합", "📊 분석"])
     
     with tab1:
+        filtered_key = make_key("app2.filtered", inputs, constraints=constraints)
+        filtered_estimate = cached(
+            "app2.estimate", inputs, lambda: budget.estimate_pick(inputs, 1, constraints),
+            max_filter=1, constraints=constraints,
+        )
+        # 요청 예산을 넘으면 전체 생성 대신 제한 생성이나 무작위 추출
+        plan = ui.render_estimate(filtered_estimate, key="app2_filtered")
         if st.button("필터링 조합 생성", key="filter_gen"):
-            with st.spinner("조합 생성 중..."):
-                filtered_combos = generate_filtered_combinations(inputs)
-                st.session_state.filtered_selections = filtered_combos
+            # 작업 풀에서 실행하고 진행 상황 영역만 주기적으로 다시 그림 (끝나면 전체를 다시 그림)
+            job = ui.submit_job(
+                plan, filtered_estimate,
+                lambda stats: search(inputs, max_filter=1, stats=stats, constraints=constraints),
+                filtered_key,
+                # 추가 조건이 있으면 개수가 추정값이므로 진행률 대신 행 수만 표시
+                total=filtered_estimate.rows if filtered_estimate.exact else None,
+                view=cached("app2.lazy", inputs, lambda: lazy_combinations(inputs, max_filter=1), max_filter=1),
+                constraints=constraints,
+            )
+            if job is not None:
+                st.session_state.app2_filtered_job = job
+        
+        filtered_job = st.session_state.get("app2_filtered_job")
+        if filtered_job is None:
+            # 새 탭이나 서버 재시작 뒤에도 같은 입력으로 저장해 둔 결과를 바로 보여 줌
+            filtered_job = st.session_state.app2_filtered_job = job_runner.restore(filtered_key)
+        if filtered_job is not None:
+            ui.render_job(filtered_job, key="app2_filtered")
+            st.session_state.filtered_selections = filtered_job.result
         
         if len(st.session_state.filtered_selections) > 0:
             st.write(f"필터링된 조합 갯수: {len(st.session_state.filtered_selections)}")
-            df = pd.DataFrame(st.session_state.filtered_selections, 
-                            columns=[f"숫자{i+1}" for i in range(6)])
-            st.dataframe(df)
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button("CSV 다운로드", csv, file_name="filtered_combinations.csv")
+            columns = [f"숫자{i+1}" for i in range(6)]
+            ui.render_pages(st.session_state.filtered_selections, columns, key="app2_filtered")
+            # 다운로드는 생성이 끝난 뒤에만 제공
+            if filtered_job is None or not filtered_job.active:
+                fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key="filtered_fmt")
+                ui.render_download(f"{fmt} 다운로드", st.session_state.filtered_selections, columns, fmt,
+                                   "filtered_combinations", key="app2_filtered")
+                ui.render_index_tools(st.session_state.filtered_selections, key="app2_filtered")
+        
+        # 생성하지 않고 순위로 바로 해당 페이지만 계산
+        if st.toggle("생성 없이 페이지로 보기", key="app2_filtered_lazy", disabled=constraints is not None,
+                     help="추가 조건이 있으면 순위 계산을 쓸 수 없습니다.") and constraints is None:
+            view = cached("app2.lazy", inputs, lambda: lazy_combinations(inputs, max_filter=1), max_filter=1)
+            st.write(f"전체 조합 수: {len(view):,}")
+            ui.render_pages(view, [f"숫자{i+1}" for i in range(6)], key="app2_filtered_lazy")
     
     with tab2:
+        unfiltered_key = make_key("app2.unfiltered", inputs, constraints=constraints)
+        unfiltered_estimate = cached(
+            "app2.estimate", inputs, lambda: budget.estimate_pick(inputs, 6, constraints),
+            max_filter=6, constraints=constraints,
+        )
+        plan = ui.render_estimate(unfiltered_estimate, key="app2_unfiltered")
         if st.button("일반 조합 생성", key="unfilter_gen"):
-            with st.spinner("조합 생성 중..."):
-                unfiltered_combos = generate_unfiltered_combinations(inputs)
-                st.session_state.unfiltered_selections = unfiltered_combos
+            # 작업 풀에서 실행하고 진행 상황 영역만 주기적으로 다시 그림 (끝나면 전체를 다시 그림)
+            job = ui.submit_job(
+                plan, unfiltered_estimate,
+                lambda stats: search(inputs, stats=stats, constraints=constraints),
+                unfiltered_key,
+                total=unfiltered_estimate.rows if unfiltered_estimate.exact else None,
+                view=cached("app2.lazy", inputs, lambda: lazy_combinations(inputs), max_filter=6),
+                constraints=constraints,
+            )
+            if job is not None:
+                st.session_state.app2_unfiltered_job = job
+        
+        unfiltered_job = st.session_state.get("app2_unfiltered_job")
+        if unfiltered_job is None:
+            unfiltered_job = st.session_state.app2_unfiltered_job = job_runner.restore(unfiltered_key)
+        if unfiltered_job is not None:
+            ui.render_job(unfiltered_job, key="app2_unfiltered")
+            st.session_state.unfiltered_selections = unfiltered_job.result
         
         if len(st.session_state.unfiltered_selections) > 0:
             st.write(f"일반 조합 갯수: {len(st.session_state.unfiltered_selections)}")
-            df = pd.DataFrame(st.session_state.unfiltered_selections, 
-                            columns=[f"숫자{i+1}" for i in range(6)])
-            st.dataframe(df)
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button("CSV 다운로드", csv, file_name="unfiltered_combinations.csv")
+            columns = [f"숫자{i+1}" for i in range(6)]
+            ui.render_pages(st.session_state.unfiltered_selections, columns, key="app2_unfiltered")
+            # 다운로드는 생성이 끝난 뒤에만 제공
+            if unfiltered_job is None or not unfiltered_job.active:
+                fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key="unfiltered_fmt")
+                ui.render_download(f"{fmt} 다운로드", st.session_state.unfiltered_selections, columns, fmt,
+                                   "unfiltered_combinations", key="app2_unfiltered")
+                ui.render_index_tools(st.session_state.unfiltered_selections, key="app2_unfiltered")
+        
+        # 생성하지 않고 순위로 바로 해당 페이지만 계산
+        if st.toggle("생성 없이 페이지로 보기", key="app2_unfiltered_lazy", disabled=constraints is not None,
+                     help="추가 조건이 있으면 순위 계산을 쓸 수 없습니다.") and constraints is None:
+            view = cached("app2.lazy", inputs, lambda: lazy_combinations(inputs), max_filter=6)
+            st.write(f"전체 조합 수: {len(view):,}")
+            ui.render_pages(view, [f"숫자{i+1}" for i in range(6)], key="app2_unfiltered_lazy")
+    
+    with tab3:
+        # 생성이 끝난 결과만 분석
+        filtered_done = filtered_job is None or not filtered_job.active
+        unfiltered_done = unfiltered_job is None or not unfiltered_job.active
+        ui.render_analytics({
+            "필터링 조합": st.session_state.filtered_selections if filtered_done else None,
+            "일반 조합": st.session_state.unfiltered_selections if unfiltered_done else None,
+        }, key="app2")
+    
+    metrics.finish()
     
     if st.button("로그아웃"):
+        for job in (filtered_job, unfiltered_job):
+            if job is not None:
+                job.cancel()
         st.session_state.authenticated = False
         st.rerun()
 
@@ -1,8 +1,11 @@
 import streamlit as st
-import pandas as pd
-import itertools
 
-FILTER_NUMBERS = {52, 55, 61, 67, 73, 79, 91}
+import ui
+from lotto import budget, export, metrics, parallel
+from lotto.cache import cached, make_key
+from lotto.jobs import job_runner
+from lotto.maxtwo import IncrementalCounter, iter_valid_blocks, iter_valid_blocks_parallel, lazy_combinations
+
 
 def check_password():
     if 'authenticated' not in st.session_state:
@@ -22,78 +25,13 @@ def check_password():
         return False
     return True
 
-def calc_unique_combinations(inputs):
-    all_numbers = set()
-    for col in inputs:
-        all_numbers.update(col)
-    all_numbers = sorted(all_numbers)
-
-    unique_count = 0
-    input_sets = [set(col) for col in inputs]
-
-    for combo in itertools.combinations(all_numbers, 6):
-        valid = True
-        for s in input_sets:
-            count = sum(1 for x in combo if x in s)
-            if count > 2:
-                valid = False
-                break
-        if valid:
-            unique_count += 1
-    return unique_count
-
-def generate_filtered_combinations(inputs, sort_each):
-    all_numbers = set()
-    for col in inputs:
-        all_numbers.update(col)
-    all_numbers = sorted(all_numbers)
-
-    input_sets = [set(col) for col in inputs]
-    results = []
-
-    for combo in itertools.combinations(all_numbers, 6):
-        valid = True
-        for s in input_sets:
-            count = sum(1 for x in combo if x in s)
-            if count > 2:
-                valid = False
-                break
-        if valid:
-            fixed_count = sum(num in FILTER_NUMBERS for num in combo)
-            if fixed_count <= 1:
-                if sort_each:
-                    results.append(tuple(sorted(combo)))
-                else:
-                    results.append(combo)
-    return results
-
-def generate_unfiltered_combinations(inputs, sort_each):
-    all_numbers = set()
-    for col in inputs:
-        all_numbers.update(col)
-    all_numbers = sorted(all_numbers)
-
-    input_sets = [set(col) for col in inputs]
-    results = []
-
-    for combo in itertools.combinations(all_numbers, 6):
-        valid = True
-        for s in input_sets:
-            count = sum(1 for x in combo if x in s)
-            if count > 2:
-                valid = False
-                break
-        if valid:
-            if sort_each:
-                results.append(tuple(sorted(combo)))
-            else:
-                results.append(combo)
-    return results
 
 def main():
     if not check_password():
         return
 
+    ui.start_metrics("app3")
+
     st.title("로또 조합 생성기 (수정)")
 
     cols = []
@@ -108,36 +46,99 @@ def main():
             if x.isdigit():
                 nums.add(int(x))
         inputs.append(sorted(nums))
+    inputs = ui.check_inputs(inputs)
 
     st.write("입력 숫자:", inputs)
 
+    # 세션별 계산기가 바뀐 칸의 숫자만 다시 반영
+    if 'app3_counter' not in st.session_state:
+        st.session_state.app3_counter = IncrementalCounter()
+    counter = st.session_state.app3_counter
+    with metrics.stage("count") as stage:
+        stage.set(changed=counter.update(inputs))
+
     sort_each = st.checkbox("조합 내 숫자 오름차순 정렬", value=True)
+    use_parallel = st.checkbox(f"멀티코어 병렬 실행 ({parallel.PROCESSES}개 프로세스)", key="app3_parallel")
+    scan = iter_valid_blocks_parallel if use_parallel else iter_valid_blocks
+    constraints = ui.render_constraints("app3")
 
     if st.button("조합 개수 계산"):
-        count = calc_unique_combinations(inputs)
-        st.write(f"생성 가능한 조합 수: {count}")
+        per_filter = counter.count(by_filter=True)
+        st.write(f"생성 가능한 조합 수: {sum(per_filter.values())}")
+        st.write(f"필터링 조합 수: {per_filter.get(0, 0) + per_filter.get(1, 0)}")
 
     tab1, tab2 = st.tabs(["필터링 조합", "일반 조합"])
 
-    if tab1.button("필터링 조합 생성"):
-        filtered_combos = generate_filtered_combinations(inputs, sort_each)
-        st.write(f"필터링된 조합 갯수: {len(filtered_combos)}")
-        if len(filtered_combos) > 0:
-            df = pd.DataFrame(filtered_combos, columns=[f"숫자{i+1}" for i in range(6)])
-            st.dataframe(df)
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button("CSV 다운로드", csv, file_name="filtered_combinations.csv")
-
-    if tab2.button("일반 조합 생성"):
-        unfiltered_combos = generate_unfiltered_combinations(inputs, sort_each)
-        st.write(f"일반 조합 갯수: {len(unfiltered_combos)}")
-        if len(unfiltered_combos) > 0:
-            df = pd.DataFrame(unfiltered_combos, columns=[f"숫자{i+1}" for i in range(6)])
-            st.dataframe(df)
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button("CSV 다운로드", csv, file_name="unfiltered_combinations.csv")
+    jobs = {}
+    for tab, kind, label, max_filter in [
+        (tab1, "filtered", "필터링", 1),
+        (tab2, "unfiltered", "일반", 6),
+    ]:
+        cache_key = make_key(f"app3.{kind}", inputs, sort_each=sort_each, constraints=constraints)
+        estimate = cached(
+            "app3.estimate", inputs,
+            lambda max_filter=max_filter: budget.estimate_maxtwo(inputs, max_filter, constraints),
+            max_filter=max_filter, constraints=constraints,
+        )
+        with tab:
+            # 합집합 숫자가 많으면 결과가 적어도 검사할 인덱스가 C(n, 6)개라 예산을 넘을 수 있음
+            plan = ui.render_estimate(estimate, key=f"app3_{kind}")
+        if tab.button(f"{label} 조합 생성"):
+            # 작업 풀에서 실행하고 진행 상황 영역만 주기적으로 다시 그림 (끝나면 전체를 다시 그림)
+            per_filter = counter.count(by_filter=True)
+            job = ui.submit_job(
+                plan, estimate,
+                lambda stats, max_filter=max_filter: scan(inputs, max_filter, stats=stats, constraints=constraints),
+                cache_key,
+                # 추가 조건이 있으면 개수를 미리 알 수 없으므로 진행률 대신 행 수만 표시
+                total=None if constraints else sum(n for f, n in per_filter.items() if f <= max_filter),
+                view=cached(
+                    "app3.lazy", inputs, lambda max_filter=max_filter: lazy_combinations(inputs, max_filter),
+                    max_filter=max_filter,
+                ),
+                constraints=constraints,
+            )
+            if job is not None:
+                st.session_state[f"app3_{kind}_job"] = job
+
+        # 생성하지 않고 사전순 순위로 바로 해당 페이지만 계산
+        if tab.toggle("생성 없이 페이지로 보기", key=f"app3_{kind}_lazy", disabled=constraints is not None,
+                      help="추가 조건이 있으면 순위 계산을 쓸 수 없습니다.") and constraints is None:
+            with tab:
+                view = cached(
+                    "app3.lazy", inputs, lambda max_filter=max_filter: lazy_combinations(inputs, max_filter),
+                    max_filter=max_filter,
+                )
+                st.write(f"전체 조합 수: {len(view):,}")
+                ui.render_pages(view, [f"숫자{i+1}" for i in range(6)], key=f"app3_{kind}_lazy")
+
+        job = st.session_state.get(f"app3_{kind}_job")
+        if job is None:
+            # 세션에 작업이 없으면 디스크 저장소에서 같은 입력의 결과를 찾음
+            job = st.session_state[f"app3_{kind}_job"] = job_runner.restore(cache_key)
+        jobs[kind] = job
+        if job is None:
+            continue
+        with tab:
+            ui.render_job(job, key=f"app3_{kind}")
+            combos = job.result
+            st.write(f"{'필터링된' if kind == 'filtered' else '일반'} 조합 갯수: {len(combos)}")
+            if len(combos) > 0:
+                columns = [f"숫자{i+1}" for i in range(6)]
+                ui.render_pages(combos, columns, key=f"app3_{kind}")
+                # 다운로드는 생성이 끝난 뒤에만 제공
+                if not job.active:
+                    fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key=f"{kind}_fmt")
+                    ui.render_download(f"{fmt} 다운로드", combos, columns, fmt, f"{kind}_combinations",
+                                       key=f"app3_{kind}")
+                    ui.render_index_tools(combos, key=f"app3_{kind}")
+
+    metrics.finish()
 
     if st.button("로그아웃"):
+        for job in jobs.values():
+            if job is not None:
+                job.cancel()
         st.session_state.authenticated = False
         st.rerun()
 
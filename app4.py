@@ -1,12 +1,14 @@
+import uuid
+
 import streamlit as st
-import numpy as np
-from functools import reduce
-from operator import mul
-import pandas as pd
-import itertools
 
-# 필터링할 고정 숫자 집합 (52,55,61,67,73,79,91)
-FILTER_NUMBERS = {52, 55, 61, 67, 73, 79, 91}
+import ui
+from lotto import budget, export, metrics, parallel
+from lotto.cache import cached, make_key
+from lotto.product import IncrementalCounter, calc_distinct_combinations, iter_valid_blocks, sample_combinations
+from lotto.results import ComboArray
+from lotto.store import result_store
+
 
 def check_password():
     if 'authenticated' not in st.session_state:
@@ -18,39 +20,27 @@ def check_password():
         if st.button("로그인", use_container_width=True):
             if password == 1234:
                 st.session_state.authenticated = True
-                st.session_state.filtered_selections = []
-                st.session_state.unfiltered_selections = []
+                st.session_state.filtered_selections = ComboArray()
+                st.session_state.unfiltered_selections = ComboArray()
                 st.rerun()
             else:
                 st.error("❌ 잘못된 비밀번호입니다. 다시 시도해주세요.")
         return False
     return True
 
-def calc_unique_combinations(inputs):
-    """중복 없는 조합 수 계산 함수"""
-    if not all(len(col) > 0 for col in inputs):
-        return 0
-    all_combos = itertools.product(*inputs)
-    unique_count = 0
-    for combo in all_combos:
-        if len(set(combo)) == 6:
-            unique_count += 1
-    return unique_count
-
-def calc_max_combinations(inputs):
-    """기존 곱셈 법칙 계산 함수"""
-    return reduce(mul, [len(col) for col in inputs if len(col) > 0], 1) if all(len(col) > 0 for col in inputs) else 0
 
 def main():
     if not check_password():
         return
 
+    ui.start_metrics("app4")
+
     # 반드시 세션 상태 변수 초기화!
     if 'filtered_selections' not in st.session_state:
-        st.session_state.filtered_selections = []
+        st.session_state.filtered_selections = ComboArray()
 
     if 'unfiltered_selections' not in st.session_state:
-        st.session_state.unfiltered_selections = []
+        st.session_state.unfiltered_selections = ComboArray()
 
     st.title("🎲 로또 조합 생성기")
 
@@ -70,24 +60,82 @@ def main():
             except:
                 numbers = []
             inputs.append(numbers)
+    inputs = ui.check_inputs(inputs)
+
+    # 계산 실행 (세션별 계산기가 바뀐 칸만 다시 계산)
+    if 'app4_counter' not in st.session_state:
+        st.session_state.app4_counter = IncrementalCounter()
+    counter = st.session_state.app4_counter
+    with metrics.stage("count") as stage:
+        stage.set(changed=counter.update(inputs))
+        total_combinations = counter.max_count()
+        unique_combinations = counter.unique_count()
+
+    use_parallel = st.checkbox(f"멀티코어 병렬 실행 ({parallel.PROCESSES}개 프로세스)", key="app4_parallel")
+    constraints = ui.render_constraints("app4")
+    # 칸끼리 숫자를 공유하면 같은 6개 숫자가 여러 칸 배치에서 나오므로 번호 조합 기준으로 셈/추출
+    distinct = st.checkbox("같은 번호 조합은 한 번만 (서로 다른 번호 조합에서 균등 추출)", key="app4_distinct")
+
+    def population(filtered):
+        """추가 조건/서로 다른 번호 조합 기준 추출 대상 수 (조합 수, 추정했으면 그 추정치)
+
+        닫힌 식이 있으면 그 값을, 없으면 열거해서 센다. 열거 비용이 요청 시간 예산을
+        넘으면 세지 않고 표본 추정값을 쓴다.
+        """
+        estimate = cached(
+            "app4.estimate", inputs, lambda: budget.estimate_product(inputs, filtered, constraints, distinct),
+            filtered=filtered, constraints=constraints, distinct=distinct,
+        )
+        if estimate.exact:
+            return estimate.rows, None
+        if estimate.over(max_rows=0) is not None:
+            return estimate.rows, estimate
+        if not distinct:
+            with metrics.stage("valid_count", filtered=filtered):
+                return cached(
+                    "app4.valid", inputs,
+                    lambda: sum(len(block) for block in iter_valid_blocks(inputs, filtered, use_parallel,
+                                                                          constraints=constraints)),
+                    filtered=filtered, constraints=constraints,
+                ), None
+        with metrics.stage("distinct_count", filtered=filtered):
+            return cached(
+                "app4.distinct", inputs,
+                lambda: calc_distinct_combinations(inputs, filtered, use_parallel, constraints),
+                filtered=filtered, constraints=constraints,
+            ), None
 
-    # 계산 실행
-    total_combinations = calc_max_combinations(inputs)
-    unique_combinations = calc_unique_combinations(inputs)
+    def render_population(valid, estimate):
+        """추출 대상 수 표시, 추출할 수 있는 최대 개수를 돌려줌"""
+        label = "서로 다른 번호 조합 수" if distinct else "조건을 만족하는 조합 수"
+        if estimate is None:
+            st.info(f"🎲 {label}: **{valid:,}개**")
+            return valid
+        st.info(f"🎲 {label}: **약 {valid:,}개** (추정)")
+        st.warning(
+            f"⚠️ 정확히 세면 {estimate.over(max_rows=0)} 표본 추정값({estimate.describe()})을 쓰고, "
+            "전체 열거로 넘어가지 않도록 추정 하한의 절반까지만 추출합니다."
+        )
+        return max(estimate.low // 2, 1)
 
     # 탭 생성
-    tab1, tab2 = st.tabs(["🔍 필터 적용 버전", "🎲 일반 버전"])
+    tab1, tab2, tab3 = st.tabs(["🔍 필터 적용 버전", "🎲 일반 버전", "📊 분석"])
 
     # 필터 적용 탭
     with tab1:
         st.info(f"🎲 총 조합 수 (중복 허용): **{total_combinations:,}개**")
-        st.info(f"🎲 중복 없는 조합 수: **{unique_combinations:,}개**")
+        st.info(f"🎲 중복 없는 조합 수 (칸 배치별): **{unique_combinations:,}개**")
+        limit = unique_combinations
+        valid = counter.filtered_count()
+        if (distinct or constraints) and unique_combinations:
+            valid, estimate = population(True)
+            limit = render_population(valid, estimate)
 
         count_filtered = st.number_input(
             "생성할 조합 수 (필터)",
             min_value=1,
-            max_value=unique_combinations if unique_combinations else 1,
-            value=min(10, unique_combinations) if unique_combinations else 1,
+            max_value=limit if limit else 1,
+            value=min(10, limit) if limit else 1,
             key="count_filtered"
         )
 
@@ -95,53 +143,63 @@ def main():
             if unique_combinations == 0:
                 st.error("❗모든 칸에 숫자를 입력해주세요!")
             else:
-                # 모든 조합 생성
-                all_combos = [tuple(sorted(combo)) for combo in itertools.product(*inputs) if len(set(combo)) == 6]
-                # 필터 적용
-                filtered_combos = [combo for combo in all_combos if sum(1 for num in combo if num in FILTER_NUMBERS) <= 1]
-                # 무작위 셔플
-                np.random.shuffle(filtered_combos)
-                # 요청 개수만큼 저장
-                st.session_state.filtered_selections = filtered_combos[:count_filtered]
+                # 필터를 통과하는 조합을 요청 개수만큼 무작위 추출
+                previous = st.session_state.filtered_selections
+                with metrics.stage("sample", filtered=True) as stage:
+                    st.session_state.filtered_selections = sample_combinations(
+                        inputs, count_filtered, filtered=True, use_parallel=use_parallel,
+                        valid=valid,
+                        constraints=constraints, distinct=distinct,
+                    )
+                    stage.set(rows=len(st.session_state.filtered_selections))
+                # 세션에는 디스크 결과 핸들만 남김 (추출마다 새 키)
+                st.session_state.filtered_selections = result_store.put(
+                    make_key("app4.sample", inputs, filtered=True, draw=uuid.uuid4().hex),
+                    st.session_state.filtered_selections,
+                )
+                # 이전 추출 결과는 다시 쓰지 않으므로 파일을 바로 지움
+                result_store.discard(previous)
                 st.success(f"✅ {len(st.session_state.filtered_selections)}개 유효 조합 생성")
 
         if st.session_state.filtered_selections:
-            df_filtered = pd.DataFrame(
-                st.session_state.filtered_selections,
-                columns=[f"row{i+1}" for i in range(6)]
-            )
+            selections = st.session_state.filtered_selections
+            columns = [f"row{i+1}" for i in range(6)]
             # 페이지네이션 (10,000개씩)
             page_size = 10000
-            total_pages = (len(df_filtered) - 1) // page_size + 1
+            total_pages = (len(selections) - 1) // page_size + 1
             page = st.number_input("페이지 번호", 1, total_pages, 1, key="page_filtered")
             # 현재 페이지 데이터 추출
             start_idx = (page - 1) * page_size
             end_idx = start_idx + page_size
-            current_page_df = df_filtered.iloc[start_idx:end_idx]
-            # 2자리 포맷팅
-            for col in current_page_df.columns:
-                current_page_df[col] = current_page_df[col].apply(lambda x: f"{x:02d}")
+            # 2자리 포맷팅 (결과나 페이지가 바뀔 때만 다시 만듦)
+            current_page_df = ui.memo(
+                selections, "app4_filtered_page", "format",
+                lambda: ui.two_digit_frame(selections, columns, start_idx, end_idx), start_idx,
+            )
             st.dataframe(current_page_df, height=400)
-            # 전체 데이터 다운로드
-            csv_filtered = df_filtered.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 필터 데이터 전체 다운로드",
-                data=csv_filtered,
-                file_name="filtered_lotto.csv",
-                mime="text/csv",
-                use_container_width=True
+            # 전체 데이터 다운로드 (버튼을 누를 때 청크 단위로 내보냄)
+            fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key="fmt_filtered")
+            ui.render_download(
+                "📥 필터 데이터 전체 다운로드", selections, columns, fmt, "filtered_lotto",
+                key="app4_filtered", encoding='utf-8', use_container_width=True,
             )
+            ui.render_index_tools(selections, key="app4_filtered")
 
     # 일반 버전 탭
     with tab2:
         st.info(f"🎲 총 조합 수 (중복 허용): **{total_combinations:,}개**")
-        st.info(f"🎲 중복 없는 조합 수: **{unique_combinations:,}개**")
+        st.info(f"🎲 중복 없는 조합 수 (칸 배치별): **{unique_combinations:,}개**")
+        limit = unique_combinations
+        valid = unique_combinations
+        if (distinct or constraints) and unique_combinations:
+            valid, estimate = population(False)
+            limit = render_population(valid, estimate)
 
         count_unfiltered = st.number_input(
             "생성할 조합 수 (일반)",
             min_value=1,
-            max_value=unique_combinations if unique_combinations else 1,
-            value=min(10, unique_combinations) if unique_combinations else 1,
+            max_value=limit if limit else 1,
+            value=min(10, limit) if limit else 1,
             key="count_unfiltered"
         )
 
@@ -149,40 +207,55 @@ def main():
             if unique_combinations == 0:
                 st.error("❗모든 칸에 숫자를 입력해주세요!")
             else:
-                # 모든 조합 생성
-                all_combos = [tuple(sorted(combo)) for combo in itertools.product(*inputs) if len(set(combo)) == 6]
-                # 무작위 셔플
-                np.random.shuffle(all_combos)
-                # 요청 개수만큼 저장
-                st.session_state.unfiltered_selections = all_combos[:count_unfiltered]
+                # 요청 개수만큼 무작위 추출
+                previous = st.session_state.unfiltered_selections
+                with metrics.stage("sample", filtered=False) as stage:
+                    st.session_state.unfiltered_selections = sample_combinations(
+                        inputs, count_unfiltered, use_parallel=use_parallel,
+                        valid=valid,
+                        constraints=constraints, distinct=distinct,
+                    )
+                    stage.set(rows=len(st.session_state.unfiltered_selections))
+                st.session_state.unfiltered_selections = result_store.put(
+                    make_key("app4.sample", inputs, filtered=False, draw=uuid.uuid4().hex),
+                    st.session_state.unfiltered_selections,
+                )
+                # 이전 추출 결과는 다시 쓰지 않으므로 파일을 바로 지움
+                result_store.discard(previous)
                 st.success(f"✅ {len(st.session_state.unfiltered_selections)}개 조합 생성")
 
         if st.session_state.unfiltered_selections:
-            df_unfiltered = pd.DataFrame(
-                st.session_state.unfiltered_selections,
-                columns=[f"row {i+1}" for i in range(6)]
-            )
+            selections = st.session_state.unfiltered_selections
+            columns = [f"row {i+1}" for i in range(6)]
             # 페이지네이션 (10,000개씩)
             page_size = 10000
-            total_pages = (len(df_unfiltered) - 1) // page_size + 1
+            total_pages = (len(selections) - 1) // page_size + 1
             page = st.number_input("페이지 번호", 1, total_pages, 1, key="page_unfiltered")
             # 현재 페이지 데이터 추출
             start_idx = (page - 1) * page_size
             end_idx = start_idx + page_size
-            current_page_df = df_unfiltered.iloc[start_idx:end_idx]
             # 2자리 포맷팅
-            for col in current_page_df.columns:
-                current_page_df[col] = current_page_df[col].apply(lambda x: f"{x:02d}")
+            current_page_df = ui.memo(
+                selections, "app4_unfiltered_page", "format",
+                lambda: ui.two_digit_frame(selections, columns, start_idx, end_idx), start_idx,
+            )
             st.dataframe(current_page_df, height=400)
-            # 전체 데이터 다운로드
-            csv_unfiltered = df_unfiltered.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 일반 데이터 전체 다운로드",
-                data=csv_unfiltered,
-                file_name="unfiltered_lotto.csv",
-                mime="text/csv",
-                use_container_width=True
+            # 전체 데이터 다운로드 (버튼을 누를 때 청크 단위로 내보냄)
+            fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key="fmt_unfiltered")
+            ui.render_download(
+                "📥 일반 데이터 전체 다운로드", selections, columns, fmt, "unfiltered_lotto",
+                key="app4_unfiltered", encoding='utf-8', use_container_width=True,
             )
+            ui.render_index_tools(selections, key="app4_unfiltered")
+
+    # 분석 탭
+    with tab3:
+        ui.render_analytics({
+            "필터 적용 결과": st.session_state.filtered_selections,
+            "일반 결과": st.session_state.unfiltered_selections,
+        }, key="app4")
+
+    metrics.finish()
 
     # 로그아웃 버튼 (공통)
     if st.button("🚪 로그아웃", use_container_width=True, type="secondary"):
@@ -1,39 +1,32 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import itertools
-from collections import Counter
 
+import ui
+from lotto import analytics, budget, export, metrics
+from lotto.cache import cached, make_key
+from lotto.jobs import job_runner
+from lotto.overlap import (
+    RESULT_COLUMNS, count_combinations_per_column, iter_combination_blocks, iter_duplicate_blocks,
+    summarize_combinations,
+)
 
-def make_combinations_per_column(inputs):
-    """각 칸(6개)의 숫자들로 각각 6개 조합을 만들고 모두 합침"""
-    if len(inputs) != 6:
-        return []
-    
-    all_combos = []
-    
-    # 각 칸마다 독립적으로 6개 조합 생성
-    for col_idx, numbers in enumerate(inputs):
-        if len(numbers) < 6:
-            continue  # 6개 미만이면 해당 칸 스킵
-        
-        # 해당 칸의 숫자들로 C(n,6) 조합 생성
-        combos_from_col = [tuple(sorted(combo)) for combo in itertools.combinations(numbers, 6)]
-        all_combos.extend(combos_from_col)
-    
-    return all_combos
 
+def summarize_duplicates(job, inputs, dup_rows):
+    """중복 조합을 등장 횟수만큼 센 분석
 
-def find_duplicates(combos):
-    """조합 리스트에서 중복된 조합 찾기"""
-    counter = Counter(combos)
-    
-    # 2개 이상 등장한 조합만 필터링
-    duplicates = [(combo, count) for combo, count in counter.items() if count >= 2]
-    
-    return duplicates, counter
+    끝까지 생성한 결과만 입력 키로 전역 캐시에 넣는다. 취소했거나 상한에 걸린 작업의
+    부분 결과를 캐시하면 같은 입력으로 끝까지 돌린 다음 작업에 그 요약이 나오기 때문이다.
+    """
+    compute = lambda: analytics.summarize(dup_rows[:, :6], weights=dup_rows[:, 6])
+    if not job.complete:
+        return compute()
+    return cached("app5.analytics", inputs, compute, source="duplicates")
 
 
 def main():
+    ui.start_metrics("app5")
+
     st.title('🔍 6개 칸 조합 중복 분석기')
     
     # 입력 가이드
@@ -51,8 +44,6 @@ def main():
     st.write("### 📝 숫자 입력")
     cols = st.columns(6)
     inputs = []
-    valid_cols = 0
-    total_expected_combos = 0
     
     for i in range(6):
         input_str = cols[i].text_area(
@@ -61,13 +52,13 @@ def main():
             key=f'col{i}',
             height=150
         )
-        numbers = [int(x.strip()) for x in input_str.split() if x.strip().isdigit()]
+        numbers = sorted({int(x.strip()) for x in input_str.split() if x.strip().isdigit()})
         inputs.append(numbers)
-        
-        if len(numbers) >= 6:
-            valid_cols += 1
-            combo_count = len(list(itertools.combinations(numbers, 6)))
-            total_expected_combos += combo_count
+    inputs = ui.check_inputs(inputs)
+    
+    combo_counts = count_combinations_per_column(inputs)
+    valid_cols = sum(1 for n in combo_counts if n > 0)
+    total_expected_combos = sum(combo_counts)
     
     # 상태 표시
     if total_expected_combos > 0:
@@ -75,121 +66,115 @@ def main():
     else:
         st.warning(f"⚠️ 유효한 칸이 없습니다")
     
+    fmt = st.radio("다운로드 형식", export.available_formats(), horizontal=True, key="download_fmt")
+    
+    cache_key = make_key("app5.duplicates", inputs)
+    # 중복 조합 수는 칸 교집합 크기로 정확히 셈 (예산을 넘으면 한도까지의 부분 결과만 냄)
+    estimate = budget.estimate_overlap(inputs)
+    plan = ui.render_estimate(estimate, key="app5", sampling=False) if total_expected_combos > 0 else None
+    
     # 분석 버튼
     if st.button('🚀 조합 생성 및 중복 분석 시작', type='primary'):
+        if total_expected_combos > 0:
+            # 작업 풀에서 실행하고 진행 상황 영역만 주기적으로 다시 그림 (끝나면 전체를 다시 그림)
+            job = ui.submit_job(
+                plan, estimate, lambda stats: iter_duplicate_blocks(inputs, stats=stats), cache_key,
+                total=estimate.rows, width=7,
+            )
+            if job is not None:
+                st.session_state.app5_inputs = inputs
+                st.session_state.app5_job = job
+        else:
+            st.session_state.app5_job = None
+            st.error("❌ 조합 생성에 실패했습니다. 각 칸에 최소 6개 숫자를 입력해주세요.")
+    
+    job = st.session_state.get("app5_job")
+    if job is None and total_expected_combos > 0:
+        # 서버를 다시 시작해도 저장해 둔 분석 결과가 있으면 다시 계산하지 않음
+        job = st.session_state.app5_job = job_runner.restore(cache_key, width=7)
+        st.session_state.app5_inputs = inputs
+    if job is not None:
+        job_inputs = st.session_state.app5_inputs
+        job_counts = count_combinations_per_column(job_inputs)
+        job_total = sum(job_counts)
         
         st.write("### 📊 조합 생성 결과")
         
-        # 조합 생성
-        combos = make_combinations_per_column(inputs)
+        # 칸별 상세 정보
+        col_details = []
+        for col_idx, numbers in enumerate(job_inputs):
+            if job_counts[col_idx] > 0:
+                col_details.append(f"칸{col_idx+1}({len(numbers)}개→{job_counts[col_idx]:,}개)")
         
-        if len(combos) > 0:
-            # 칸별 상세 정보
-            col_details = []
-            for col_idx, numbers in enumerate(inputs):
-                if len(numbers) >= 6:
-                    col_combo_count = len(list(itertools.combinations(numbers, 6)))
-                    col_details.append(f"칸{col_idx+1}({len(numbers)}개→{col_combo_count:,}개)")
-            
-            st.write(f"**총 {len(combos):,}개 조합 생성 ✅**")
-            st.caption(f"  ↳ {', '.join(col_details)}")
-            
-            # 중복 분석
-            duplicates, counter = find_duplicates(combos)
+        st.write(f"**총 {job_total:,}개 조합 생성 ✅**")
+        st.caption(f"  ↳ {', '.join(col_details)}")
+        
+        st.write("### 🎯 중복 조합 분석 결과")
+        ui.render_job(job, key="app5")
+        
+        # 중복 조합 (번호 6개 + 등장횟수, 행당 7바이트), 등장횟수 내림차순
+        # 정렬은 결과가 바뀌거나 행이 늘었을 때만 다시 함
+        result = job.result
+        dup_rows = ui.memo(
+            result, "app5_sorted", "sort",
+            lambda: result.data[np.argsort(-result.data[:, 6].astype(np.int64), kind='stable')],
+        )
+        
+        if len(dup_rows):
+            counts = dup_rows[:, 6]
+            three_or_more = int((counts >= 3).sum())
+            st.success(f"✅ **중복 조합 발견!** 총 {len(dup_rows):,}개 (3회 이상: {three_or_more:,}개)")
             
-            st.write("### 🎯 중복 조합 분석 결과")
+            with metrics.stage("dataframe") as stage:
+                df_duplicates = pd.DataFrame(dup_rows, columns=RESULT_COLUMNS, copy=False)
+                stage.set(rows=len(df_duplicates))
+            st.dataframe(df_duplicates, use_container_width=True, height=400)
             
-            if duplicates:
-                three_or_more = len([d for d in duplicates if d[1] >= 3])
-                st.success(f"✅ **중복 조합 발견!** 총 {len(duplicates):,}개 (3회 이상: {three_or_more:,}개)")
-                
-                # 중복 조합 테이블
-                combo_list = []
-                for combo, count in sorted(duplicates, key=lambda x: x[1], reverse=True):
-                    row = {
-                        '번호1': combo[0],
-                        '번호2': combo[1],
-                        '번호3': combo[2],
-                        '번호4': combo[3],
-                        '번호5': combo[4],
-                        '번호6': combo[5],
-                        '등장횟수': count
-                    }
-                    combo_list.append(row)
-                
-                df_duplicates = pd.DataFrame(combo_list)
-                st.dataframe(df_duplicates, use_container_width=True, height=400)
-                
-                # 통계 요약
-                max_dup = max(duplicates, key=lambda x: x[1])[1]
-                st.metric("최대 중복 횟수", max_dup)
-                
-                # CSV 다운로드
-                col1, col2 = st.columns(2)
+            # 통계 요약
+            st.metric("최대 중복 횟수", int(counts.max()))
+        elif not job.active:
+            st.info("ℹ️ **중복 조합이 없습니다.** 모든 조합이 고유합니다.")
+        
+        # 다운로드는 분석이 끝난 뒤에만 제공
+        if not job.active:
+            col1, col2 = st.columns(2)
+            if len(dup_rows):
                 with col1:
-                    # 중복 조합 CSV
-                    csv_duplicates = df_duplicates.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label='💾 중복 조합 CSV 다운로드', 
-                        data=csv_duplicates, 
-                        file_name=f'duplicate_combinations_{len(duplicates)}items.csv', 
-                        mime='text/csv',
-                        use_container_width=True
-                    )
-                
-                with col2:
-                    # 전체 조합 CSV
-                    all_combo_list = []
-                    for combo in combos:
-                        row = {
-                            '번호1': combo[0],
-                            '번호2': combo[1],
-                            '번호3': combo[2],
-                            '번호4': combo[3],
-                            '번호5': combo[4],
-                            '번호6': combo[5],
-                            '등장횟수': counter[combo]
-                        }
-                        all_combo_list.append(row)
-                    
-                    df_all = pd.DataFrame(all_combo_list)
-                    csv_all = df_all.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label='💾 전체 조합 CSV 다운로드', 
-                        data=csv_all, 
-                        file_name=f'all_combinations_{len(combos)}.csv', 
-                        mime='text/csv',
-                        use_container_width=True
+                    # 중복 조합
+                    ui.render_download(
+                        f'💾 중복 조합 {fmt} 다운로드', dup_rows, RESULT_COLUMNS, fmt,
+                        f'duplicate_combinations_{len(dup_rows)}items', key="app5_duplicates",
+                        use_container_width=True,
                     )
-                        
-            else:
-                st.info("ℹ️ **중복 조합이 없습니다.** 모든 조합이 고유합니다.")
-                
-                # 중복이 없어도 전체 조합 다운로드 제공
-                all_combo_list = []
-                for combo in combos:
-                    row = {
-                        '번호1': combo[0],
-                        '번호2': combo[1],
-                        '번호3': combo[2],
-                        '번호4': combo[3],
-                        '번호5': combo[4],
-                        '번호6': combo[5],
-                        '등장횟수': 1
-                    }
-                    all_combo_list.append(row)
-                
-                df_all = pd.DataFrame(all_combo_list)
-                csv_all = df_all.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label='💾 전체 조합 CSV 다운로드', 
-                    data=csv_all, 
-                    file_name=f'all_combinations_{len(combos)}.csv', 
-                    mime='text/csv',
-                    use_container_width=True
+            
+            with col2:
+                # 전체 조합 (버튼을 누를 때 칸별 조합을 블록 단위로 스트리밍)
+                ui.render_download(
+                    f'💾 전체 조합 {fmt} 다운로드', lambda: iter_combination_blocks(job_inputs), RESULT_COLUMNS, fmt,
+                    f'all_combinations_{job_total}', key="app5_all", source=job, use_container_width=True,
                 )
-        else:
-            st.error("❌ 조합 생성에 실패했습니다. 각 칸에 최소 6개 숫자를 입력해주세요.")
+            
+            # 번호 분석 (전체 조합은 칸별 조합 블록을 모두 흘려보내며 세므로 버튼을 눌렀을 때만)
+            st.write("### 📈 번호 분석")
+            source = st.radio(
+                "분석 대상", ["중복 조합 (등장 횟수만큼)", "전체 조합"], horizontal=True, key="app5_analytics_source"
+            )
+            summary = None
+            if source == "전체 조합":
+                summary = ui.memo_on_click(
+                    result, "app5_analytics_all", "analytics",
+                    lambda: cached("app5.analytics", job_inputs, lambda: summarize_combinations(job_inputs)),
+                    f"📈 전체 조합 {job_total:,}개 분석",
+                )
+            elif len(dup_rows):
+                summary = ui.memo(
+                    result, "app5_analytics_duplicates", "analytics",
+                    lambda: summarize_duplicates(job, job_inputs, dup_rows),
+                )
+            if summary is not None:
+                ui.render_summary(summary, key="app5")
+    
+    metrics.finish()
 
 
 if __name__ == "__main__":
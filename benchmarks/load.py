@@ -0,0 +1,454 @@
+"""동시 세션 부하 테스트
+
+Streamlit의 헤드리스 AppTest로 app.py 세션 N개를 스레드에서 동시에 띄운다. 각 세션은
+사이드바에서 앱(app4/app2/app3/app5)을 고르고 로그인한 뒤, 합성 입력(칸 크기와 칸 사이
+겹침 비율을 무작위로 고름)으로 입력 → 개수 계산 → 생성 → 페이지 이동 → 다시 그리기
+시나리오를 반복한다. 상호작용 하나는 위젯 조작 뒤 스크립트 실행 한 번이며, 작업 풀에서
+도는 생성은 작업이 끝나 화면 전체를 다시 그릴 때까지 포함해 잰다.
+
+세션들은 실제 서버처럼 한 프로세스의 결과 캐시, 작업 풀과 예산, 디스크 저장소를 함께
+쓴다. 동시 세션 수마다 캐시와 저장소를 비우고 시작하며, 상호작용별 지연 시간 백분위수와
+오류/거절(서버 예산 초과) 횟수, 세션을 모두 살려 둔 상태의 프로세스 RSS 증가를 세션 수로
+나눈 세션당 메모리를 보고한다. 기준값(load_baseline.json)보다 세션당 메모리가 크게
+늘거나 오류가 나면 실패(종료 코드 1)로 끝난다.
+
+지연 시간은 코어 수와 같은 기계의 다른 부하에 크게 좌우되므로 기준값과의 비교는
+참고용 경고로만 보여 준다 (--strict-latency면 실패로 셈). 비교할 때는 동시 세션
+수마다 시작 전에 잰 보정 작업 시간(run.calibrate)의 비율로 기준값을 환산한다.
+
+    python benchmarks/load.py                          # 세션 1, 4, 8개로 기준값과 비교
+    python benchmarks/load.py --sessions 1,8,32 --iterations 3
+    python benchmarks/load.py --apps app4,app2 --mix heavy --think 1
+    python benchmarks/load.py --json load.json         # 결과를 JSON으로 저장
+    python benchmarks/load.py --strict-latency         # p95 지연 회귀도 실패로
+    python benchmarks/load.py --update-baseline        # 현재 결과를 기준값으로 저장
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lotto.cache import result_cache  # noqa: E402
+from lotto.jobs import Job  # noqa: E402
+from lotto.store import result_store  # noqa: E402
+from run import _reset_caches, calibrate, make_inputs  # noqa: E402
+from ui import POLL_SECONDS  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "load_baseline.json"
+
+APPS = ["app4", "app2", "app3", "app5"]
+# 입력 규모별 앱마다 고를 칸 크기 (heavy는 생성에 수 초가 걸리는 입력 포함)
+MIXES = {
+    "light": {"app4": [6, 8, 10], "app2": [6, 7], "app3": [6, 7], "app5": [8, 10, 12]},
+    "heavy": {"app4": [10, 14, 20], "app2": [8, 9], "app3": [8, 10], "app5": [14, 20]},
+}
+# 칸 사이 겹침 비율
+OVERLAPS = [0.0, 0.5]
+# app4에서 추출할 조합 수 (페이지가 여러 쪽이 되는 경우 포함)
+SAMPLE_COUNTS = [10, 1000, 20000]
+PASSWORD = 1234
+BUSY_MESSAGE = "서버가 바쁩니다"
+
+# 기준값 대비 허용 배수와, 그 아래로는 비교하지 않는 절대 차이
+LATENCY_TOLERANCE = 2.0
+RSS_TOLERANCE = 1.5
+MIN_LATENCY_DELTA = 0.5
+# RSS는 할당자/GC 상태에 따라 흔들리므로 세션 수를 곱한 전체 증가로 따짐
+MIN_RSS_DELTA = 64 << 20
+
+
+def rss_bytes():
+    """현재 프로세스 RSS (/proc이 없으면 최대 RSS로 대신함)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def concurrent_apptest():
+    """AppTest 여러 개를 스레드에서 동시에 실행할 수 있게 함
+
+    AppTest는 실행마다 프로세스 전역인 Runtime._instance를 모의 런타임으로 바꿨다가 끝나면
+    None으로 되돌리고, global.appTest 설정도 실행 동안만 덮어쓴다. 그래서 한 세션의 실행이
+    끝나면 아직 도는 다른 세션의 스크립트에서 런타임이 사라진다. 실제 서버처럼 런타임 하나를
+    계속 쓰도록, 마지막으로 만들어진 모의 런타임을 기억해 두고 None일 때 그것을 돌려준다.
+    스크립트도 실행마다 새 ScriptCache로 다시 컴파일하는데, Python 3.11의 ast.parse는 여러
+    스레드에서 동시에 부르면 가끔 실패하므로 서버처럼 캐시 하나를 함께 쓴다.
+    """
+    last = []
+    shared_cache = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or bool(last)
+
+    with patch_config_options({"global.appTest": True}), \
+            patch.object(Runtime, "instance", classmethod(instance)), \
+            patch.object(Runtime, "exists", classmethod(exists)), \
+            patch.object(ScriptCache, "get_bytecode", lambda self, path: get_bytecode(shared_cache, path)):
+        yield
+
+
+def _find(widgets, key=None, label=None):
+    """key가 같거나 label로 시작하는 위젯 (없으면 None)"""
+    for widget in widgets:
+        if (key is not None and widget.key == key) or (label is not None and widget.label.startswith(label)):
+            return widget
+    return None
+
+
+def _fill(widgets, inputs, key_format):
+    for i, numbers in enumerate(inputs):
+        _find(widgets, key=key_format.format(i)).set_value(" ".join(map(str, numbers)))
+
+
+def _prefer_sampling(at, key):
+    """요청 예산을 넘어 실행 방식을 고르게 되면 마지막 방식(무작위 추출 또는 제한 생성)을 고름"""
+    mode = _find(at.radio, key=f"{key}_budget_mode")
+    if mode is not None:
+        mode.set_value(mode.options[-1])
+
+
+def _click(at, key=None, label=None, plan_key=None):
+    button = _find(at.button, key=key, label=label)
+    if button is None:
+        return False
+    if plan_key is not None:
+        _prefer_sampling(at, plan_key)
+    button.click()
+    return True
+
+
+def _last_page(at, key):
+    page = _find(at.number_input, key=key)
+    if page is None or page.max is None or page.max <= 1:
+        return False
+    page.set_value(page.max)
+    return True
+
+
+def _set_count(at, key, count):
+    number = _find(at.number_input, key=key)
+    if number is None:
+        return False
+    number.set_value(max(min(count, number.max or count), number.min or 1))
+    return True
+
+
+def _login(at):
+    at.number_input[0].set_value(PASSWORD)
+    return _click(at, label="로그인")
+
+
+def make_steps(app, inputs, rng):
+    """앱 하나의 시나리오: (상호작용 이름, 위젯 조작) 목록
+
+    위젯 조작은 직전 실행 결과를 보고 실행할 때 부르며, False를 돌려주면 (예: 결과가 한
+    쪽뿐이라 페이지 이동이 없음) 그 상호작용은 건너뛴다.
+    """
+    if app == "app4":
+        count = rng.choice(SAMPLE_COUNTS)
+        return [
+            ("입력", lambda at: _fill(at.text_input, inputs, "col_{}")),
+            ("필터 생성", lambda at: _set_count(at, "count_filtered", count) and _click(at, key="btn_filtered")),
+            ("일반 생성", lambda at: _set_count(at, "count_unfiltered", count) and _click(at, key="btn_unfiltered")),
+            ("페이지 이동", lambda at: _last_page(at, "page_filtered")),
+            ("다시 그리기", lambda at: True),
+        ]
+    if app == "app5":
+        return [
+            ("입력", lambda at: _fill(at.text_area, inputs, "col{}")),
+            ("중복 분석", lambda at: _click(at, label="🚀", plan_key="app5")),
+            ("다시 그리기", lambda at: True),
+        ]
+    return [
+        ("입력", lambda at: _fill(at.text_input, inputs, "col{}")),
+        ("개수 계산", lambda at: _click(at, label="조합 개수 계산")),
+        ("필터링 생성", lambda at: _click(at, label="필터링 조합 생성", plan_key=f"{app}_filtered")),
+        ("일반 생성", lambda at: _click(at, label="일반 조합 생성", plan_key=f"{app}_unfiltered")),
+        ("페이지 이동", lambda at: _last_page(at, f"{app}_unfiltered_page")),
+        ("다시 그리기", lambda at: True),
+    ]
+
+
+class Session:
+    """가상 사용자 한 명 (AppTest 하나와 그 상호작용 기록)
+
+    samples에는 (상호작용 이름, 걸린 시간, 상태)를 쌓는다. 상태는 "ok", "오류"(스크립트
+    예외나 시간 초과), "거절"(서버 작업 예산 초과) 중 하나다. 시간 초과가 나면 스크립트가
+    아직 돌고 있을 수 있으므로 그 세션은 멈춘다.
+    """
+
+    def __init__(self, index, app, args):
+        self.index = index
+        self.app = app
+        self.args = args
+        self.rng = random.Random(f"{args.seed}-{index}")
+        self.at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=args.timeout)
+        self.samples = []
+        self.failed = None
+
+    def interact(self, name, action=None):
+        if self.failed:
+            return
+        if action is not None and action(self.at) is False:
+            return
+        start = time.perf_counter()
+        try:
+            self.at.run()
+            # AppTest는 run_every 프래그먼트를 돌리지 않으므로 진행 상황 영역처럼 작업이 끝나기를
+            # 기다렸다가 앱 전체를 다시 실행함
+            if self._wait_for_jobs(start + self.args.timeout):
+                self.at.run()
+        except Exception as exc:  # AppTest는 시간 초과를 RuntimeError로 알림
+            self.samples.append((name, time.perf_counter() - start, "오류"))
+            self.failed = f"{name}: {exc}"
+            return
+        seconds = time.perf_counter() - start
+        if self.at.exception:
+            self.samples.append((name, seconds, "오류"))
+            self.failed = f"{name}: {self.at.exception[0].message}"
+        elif any(BUSY_MESSAGE in error.value for error in self.at.error):
+            self.samples.append((name, seconds, "거절"))
+        else:
+            self.samples.append((name, seconds, "ok"))
+
+    def _wait_for_jobs(self, deadline):
+        """세션의 실행 중인 작업이 끝날 때까지 기다림 (기다린 작업이 있었으면 True)"""
+        jobs = [value for value in self.at.session_state.values() if isinstance(value, Job) and value.active]
+        while any(job.active for job in jobs):
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"작업이 {self.args.timeout:.0f}초 안에 끝나지 않았습니다")
+            time.sleep(POLL_SECONDS)
+        return bool(jobs)
+
+    def run(self, start_barrier):
+        start_barrier.wait()
+        self.interact("열기")
+        self.interact("앱 선택", lambda at: at.sidebar.radio[0].set_value(f"{self.app}.py"))
+        if self.app != "app5":
+            self.interact("로그인", _login)
+        sizes = MIXES[self.args.mix][self.app]
+        for iteration in range(self.args.iterations):
+            inputs = make_inputs(self.rng.choice(sizes), self.rng.choice(OVERLAPS),
+                                 seed=f"{self.args.seed}-{self.index}-{iteration}")
+            for name, action in make_steps(self.app, inputs, self.rng):
+                self.interact(name, action)
+                if self.args.think:
+                    time.sleep(self.rng.uniform(0, 2 * self.args.think))
+
+
+def reset_shared_state(store_root):
+    """프로세스 공유 캐시를 비우고 디스크 저장소를 새 디렉터리로 바꿈"""
+    result_cache.clear()
+    _reset_caches()
+    result_store.root = str(store_root)
+    gc.collect()
+
+
+def run_level(n, args, store_root):
+    """동시 세션 n개를 끝까지 돌리고 (상호작용별 결과, 요약) 반환"""
+    reset_shared_state(store_root)
+    calibration = calibrate()
+    rss_before = rss_bytes()
+    sessions = [Session(i, args.apps[i % len(args.apps)], args) for i in range(n)]
+    barrier = threading.Barrier(n)
+    threads = [threading.Thread(target=session.run, args=(barrier,), daemon=True) for session in sessions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    # 세션 상태(결과 핸들, 페이지 프레임 등)를 모두 살려 둔 채로 잼
+    rss_after = rss_bytes()
+
+    grouped = {}
+    for session in sessions:
+        for name, seconds, status in session.samples:
+            entry = grouped.setdefault(f"{session.app}.{name}", {"seconds": [], "오류": 0, "거절": 0})
+            entry["seconds"].append(seconds)
+            if status != "ok":
+                entry[status] += 1
+    results = {}
+    for name, entry in sorted(grouped.items()):
+        seconds = np.array(entry["seconds"])
+        p50, p90, p95, p99 = np.percentile(seconds, [50, 90, 95, 99])
+        results[name] = {
+            "count": len(seconds),
+            "errors": entry["오류"],
+            "rejected": entry["거절"],
+            "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(seconds.max()), 4),
+        }
+    interactions = sum(result["count"] for result in results.values())
+    summary = {
+        "sessions": n,
+        "interactions": interactions,
+        "throughput": round(interactions / wall, 3) if wall > 0 else None,
+        "wall_seconds": round(wall, 3),
+        "calibration": round(calibration, 6),
+        "rss_bytes": rss_after,
+        "rss_per_session": max(rss_after - rss_before, 0) // n,
+        "failures": [f"세션 {session.index} ({session.app}) {session.failed}" for session in sessions
+                     if session.failed],
+    }
+    del sessions, threads
+    gc.collect()
+    return results, summary
+
+
+def warm_up(args, store_root):
+    """앱마다 세션 하나씩 한 번 돌려 모듈 import와 첫 렌더링 비용을 측정에서 뺌"""
+    run_level(len(args.apps), argparse.Namespace(**{**vars(args), "iterations": 1, "think": 0.0}), store_root)
+
+
+def speed_scale(summary, base_summary):
+    """기준값을 잰 때보다 지금 기계가 느린 배수 (보정값이 없으면 1)"""
+    if not base_summary or "calibration" not in base_summary:
+        return 1.0
+    return summary["calibration"] / base_summary["calibration"]
+
+
+def compare(result, base, scale=1.0):
+    """기준값과 비교한 (문제 목록, 참고용 지연 경고 목록)
+
+    기준값의 p95에 scale(speed_scale)을 곱해 지금 기계 속도로 환산해 비교한다.
+    """
+    problems = []
+    if result["errors"]:
+        problems.append(f"오류 {result['errors']}회")
+    warnings = []
+    expected = base["p95"] * scale
+    if result["p95"] > expected * LATENCY_TOLERANCE and result["p95"] - expected > MIN_LATENCY_DELTA:
+        warnings.append(f"p95 {expected:.3f}s(보정) → {result['p95']:.3f}s")
+    return problems, warnings
+
+
+def compare_summary(summary, base):
+    if (summary["rss_per_session"] > base["rss_per_session"] * RSS_TOLERANCE
+            and (summary["rss_per_session"] - base["rss_per_session"]) * summary["sessions"] > MIN_RSS_DELTA):
+        return [f"세션당 RSS {base['rss_per_session'] / 2 ** 20:,.1f}MB → {summary['rss_per_session'] / 2 ** 20:,.1f}MB"]
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,8", help="동시 세션 수 (쉼표로 구분하면 차례로 늘려 가며 실행)")
+    parser.add_argument("--iterations", type=int, default=3, help="세션마다 시나리오를 반복할 횟수 (매번 새 입력)")
+    parser.add_argument("--apps", default=",".join(APPS), help="세션에 차례로 나눠 줄 앱")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="light", help="입력 규모")
+    parser.add_argument("--think", type=float, default=0.0, help="상호작용 사이 평균 대기 시간(초)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="상호작용 하나의 최대 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--strict-latency", action="store_true", help="p95 지연 회귀도 실패로 셈 (기본은 경고만)")
+    parser.add_argument("--json", type=Path, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+    args.apps = [app.strip() for app in args.apps.split(",") if app.strip()]
+    unknown = sorted(set(args.apps) - set(APPS))
+    if unknown:
+        parser.error(f"알 수 없는 앱: {', '.join(unknown)}")
+    levels = [int(n) for n in args.sessions.split(",")]
+
+    # 스레드에서 도는 AppTest의 ScriptRunContext/사용 중단 경고는 결과와 상관없음
+    logging.disable(logging.WARNING)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = {}
+    failures = []
+    slow = []
+    store_dir = Path(tempfile.mkdtemp(prefix="lotto-load-"))
+    try:
+        with concurrent_apptest():
+            warm_up(args, store_dir / "warm-up")
+        for n in levels:
+            with concurrent_apptest():
+                level, summary = run_level(n, args, store_dir / f"sessions-{n}")
+            print(f"\n동시 세션 {n}개: 상호작용 {summary['interactions']:,}회, {summary['wall_seconds']:.1f}초 "
+                  f"({summary['throughput']:.2f}회/초), RSS {summary['rss_bytes'] / 2 ** 20:,.1f}MB "
+                  f"(세션당 {summary['rss_per_session'] / 2 ** 20:,.1f}MB)")
+            print(f"{'상호작용':<24} {'횟수':>6} {'p50(s)':>8} {'p90(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'최대(s)':>8} "
+                  f"{'거절':>5}  상태")
+            scale = speed_scale(summary, baseline.get(f"summary[sessions={n}]"))
+            for name, result in level.items():
+                key = f"{name}[sessions={n}]"
+                results[key] = result
+                if key not in baseline:
+                    status = "새 경우"
+                else:
+                    problems, warnings = compare(result, baseline[key], scale)
+                    status = "; ".join(problems + [f"주의: {w}" for w in warnings]) or "ok"
+                    if problems or (warnings and args.strict_latency):
+                        failures.append(key)
+                    elif warnings:
+                        slow.append(key)
+                print(f"{name:<24} {result['count']:>6,} {result['p50']:>8.3f} {result['p90']:>8.3f} "
+                      f"{result['p95']:>8.3f} {result['p99']:>8.3f} {result['max']:>8.3f} "
+                      f"{result['rejected']:>5,}  {status}")
+            key = f"summary[sessions={n}]"
+            results[key] = {name: value for name, value in summary.items() if name != "failures"}
+            problems = compare_summary(summary, baseline[key]) if key in baseline else []
+            for failure in summary["failures"]:
+                print(f"  중단: {failure}")
+            if problems:
+                print(f"  {'; '.join(problems)}")
+                failures.append(key)
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.update_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+        print(f"기준값 저장: {args.baseline} ({len(results)}개 경우)")
+        return 0
+    if slow:
+        print(f"\n기준값보다 느린 상호작용 {len(slow)}건 (참고용, --strict-latency면 실패):")
+        for name in slow:
+            print(f"  {name}")
+    if failures:
+        print(f"\n기준값 대비 회귀 {len(failures)}건:")
+        for name in failures:
+            print(f"  {name}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""생성기/계산기 벤치마크
+
+각 엔진(lotto.pick, maxtwo, product, overlap)의 공개 함수를 칸 크기와 칸 사이 겹침
+비율을 바꿔 가며 만든 합성 입력으로 실행하고, 실행 시간(반복의 중앙값), 최대
+메모리(tracemalloc), 행 수와 초당 행 수를 기록한다. 저장된 기준값(baseline.json)보다 느려지거나 메모리를 더 쓰거나 행 수가
+달라지면 실패(종료 코드 1)로 끝난다.
+
+실행 시간은 초 단위 그대로 비교하지 않는다. 경우마다 바로 앞에서 고정된 보정 작업
+(calibrate)을 재고 그 배수(relative)로 기준값과 비교하므로, 기준값을 만든 기계보다
+느린 기계나 다른 작업으로 바쁜 CI에서도 같은 기준값을 쓸 수 있다.
+
+    python benchmarks/run.py                      # 기준값과 비교
+    python benchmarks/run.py --scale large        # 더 큰 입력까지
+    python benchmarks/run.py --only maxtwo        # 이름에 maxtwo가 들어간 경우만
+    python benchmarks/run.py --parallel           # 멀티코어 병렬 실행 경우 추가
+    python benchmarks/run.py --update-baseline    # 현재 결과를 기준값으로 저장
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lotto import maxtwo, overlap, pick, product  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# 규모별 칸 크기
+SCALES = {
+    "small": [6, 8, 10],
+    "medium": [6, 8, 10, 12, 14],
+    "large": [6, 8, 10, 12, 14, 16, 20],
+}
+# 칸 사이 겹침 비율 (0이면 칸마다 따로 뽑고, 1이면 모든 칸이 같음)
+OVERLAPS = [0.0, 0.5, 1.0]
+# product 표본 추출 개수
+SAMPLE_SIZE = 10000
+
+# 기준값 대비 허용 배수와, 그 아래로는 비교하지 않는 절대 차이
+TIME_TOLERANCE = 2.0
+MEMORY_TOLERANCE = 1.25
+MIN_TIME_DELTA = 0.01
+MIN_MEMORY_DELTA = 1 << 16
+# 보정 작업 크기와 반복 횟수 (중앙값 사용)
+CALIBRATION_SIZE = 200_000
+CALIBRATION_REPEAT = 5
+
+
+class Case:
+    """벤치마크 대상 함수 하나
+
+    run(args)는 측정할 호출, prepare(inputs)는 측정 밖에서 인자를 만드는 함수,
+    rows(result)는 결과 행 수, work(inputs)는 대략적인 작업량(너무 크면 건너뜀)이다.
+    sizes/overlaps를 주면 규모와 관계없이 그 칸 크기와 겹침 비율로만 실행한다.
+    """
+
+    def __init__(self, name, run, prepare=None, rows=len, work=None, sizes=None, overlaps=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare or (lambda inputs: inputs)
+        self.rows = rows
+        self.work = work or (lambda inputs: 0)
+        self.sizes = sizes
+        self.overlaps = overlaps
+
+
+def _product(inputs):
+    return math.prod(len(col) for col in inputs)
+
+
+def _union_scan(inputs):
+    return math.comb(len(set().union(*inputs)), 6)
+
+
+def _per_column(inputs):
+    return sum(overlap.count_combinations_per_column(inputs))
+
+
+def make_cases(parallel=False):
+    cases = [
+        Case("pick.calc_unique_combinations", pick.calc_unique_combinations, rows=int),
+        Case("pick.generate_filtered_combinations", pick.generate_filtered_combinations,
+             work=lambda inputs: pick.calc_unique_combinations(inputs, max_filter=1)),
+        Case("pick.generate_unfiltered_combinations", pick.generate_unfiltered_combinations,
+             work=pick.calc_unique_combinations),
+        Case("maxtwo.calc_unique_combinations", maxtwo.calc_unique_combinations, rows=int),
+        Case("maxtwo.generate_filtered_combinations", lambda inputs: maxtwo.generate_filtered_combinations(inputs, True),
+             work=_union_scan),
+        Case("maxtwo.generate_unfiltered_combinations", lambda inputs: maxtwo.generate_unfiltered_combinations(inputs, True),
+             work=_union_scan),
+        Case("product.calc_unique_combinations", product.calc_unique_combinations, rows=int),
+        Case("product.calc_filtered_combinations", product.calc_filtered_combinations, rows=int),
+        Case("product.sample_combinations", lambda inputs: product.sample_combinations(inputs, SAMPLE_SIZE)),
+        Case("product.enumerate_valid_combinations", product.enumerate_valid_combinations, work=_product),
+        Case("overlap.make_combinations_per_column", overlap.make_combinations_per_column, work=_per_column),
+        Case("overlap.find_duplicates", lambda combos: overlap.find_duplicates(combos),
+             prepare=overlap.make_combinations_per_column, rows=lambda result: len(result[0]), work=_per_column),
+        Case("overlap.analyze_duplicates", overlap.analyze_duplicates, work=_per_column),
+        # 칸끼리 많이 겹치면 중복 조합이 칸별 조합 수만큼 나오므로 큰 칸으로 항상 확인
+        Case("overlap.iter_duplicate_blocks[large]",
+             lambda inputs: [block for block in overlap.iter_duplicate_blocks(inputs)],
+             rows=lambda blocks: sum(len(block) for block in blocks), sizes=[20, 22], overlaps=[0.5, 1.0]),
+    ]
+    if parallel:
+        cases += [
+            Case("pick.generate_unfiltered_combinations[parallel]",
+                 lambda inputs: pick.generate_unfiltered_combinations(inputs, use_parallel=True),
+                 work=pick.calc_unique_combinations),
+            Case("maxtwo.generate_unfiltered_combinations[parallel]",
+                 lambda inputs: maxtwo.generate_unfiltered_combinations(inputs, True, use_parallel=True),
+                 work=_union_scan),
+            Case("product.enumerate_valid_combinations[parallel]",
+                 lambda inputs: product.enumerate_valid_combinations(inputs, use_parallel=True), work=_product),
+        ]
+    return cases
+
+
+def make_inputs(size, ratio, seed=0):
+    """1~99에서 칸 크기 size, 공통 숫자 비율 ratio인 6칸 입력 (같은 인자면 같은 입력)"""
+    rng = random.Random(f"{seed}-{size}-{ratio}")
+    pool = list(range(1, 100))
+    shared = rng.sample(pool, size)
+    others = [num for num in pool if num not in shared]
+    n_shared = round(ratio * size)
+    return [sorted(rng.sample(shared, n_shared) + rng.sample(others, size - n_shared)) for _ in range(6)]
+
+
+def _reset_caches():
+    """모듈 안의 lru_cache를 비워 매 실행이 처음부터 계산하도록 함"""
+    for module in (pick, maxtwo, product, overlap):
+        for value in vars(module).values():
+            if hasattr(value, "cache_clear"):
+                value.cache_clear()
+
+
+def calibrate(repeat=CALIBRATION_REPEAT):
+    """기계 속도 보정용 고정 작업(파이썬 루프 + NumPy 정렬)의 실행 시간 중앙값 (초)
+
+    엔진들처럼 파이썬 루프와 NumPy 연산을 섞어 두어, 인터프리터와 메모리 대역폭이
+    함께 느려지는 경우(다른 기계, 바쁜 CI)를 같은 비율로 반영한다.
+    """
+    data = np.random.default_rng(0).integers(0, 1 << 30, CALIBRATION_SIZE)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = 0
+        for i in range(CALIBRATION_SIZE):
+            total += i & 7
+        np.sort(data)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(case, inputs, repeat):
+    args = case.prepare(inputs)
+    _reset_caches()
+    np.random.seed(0)
+    tracemalloc.start()
+    result = case.run(args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = case.rows(result)
+    del result
+
+    calibration = calibrate()
+    times = []
+    for _ in range(repeat):
+        _reset_caches()
+        np.random.seed(0)
+        start = time.perf_counter()
+        case.run(args)
+        times.append(time.perf_counter() - start)
+    seconds = statistics.median(times)
+    return {
+        "seconds": round(seconds, 6),
+        "calibration": round(calibration, 6),
+        "relative": round(seconds / calibration, 4),
+        "peak_bytes": peak,
+        "rows": rows,
+        "rows_per_sec": round(rows / seconds) if seconds > 0 else None,
+    }
+
+
+def expected_seconds(result, base):
+    """기준값을 지금 기계 속도로 환산한 실행 시간 (보정값이 없는 옛 기준값은 초 그대로)"""
+    if "relative" in base and "calibration" in result:
+        return base["relative"] * result["calibration"]
+    return base["seconds"]
+
+
+def compare(result, base):
+    """기준값과 비교한 문제 목록 (없으면 빈 목록)"""
+    problems = []
+    if result["rows"] != base["rows"]:
+        problems.append(f"행 수 {base['rows']} → {result['rows']}")
+    expected = expected_seconds(result, base)
+    if result["seconds"] > expected * TIME_TOLERANCE and result["seconds"] - expected > MIN_TIME_DELTA:
+        problems.append(f"시간 {expected:.4f}s(보정) → {result['seconds']:.4f}s ({result['seconds'] / expected:.1f}배)")
+    if (result["peak_bytes"] > base["peak_bytes"] * MEMORY_TOLERANCE
+            and result["peak_bytes"] - base["peak_bytes"] > MIN_MEMORY_DELTA):
+        problems.append(f"메모리 {base['peak_bytes']:,}B → {result['peak_bytes']:,}B")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", default="", help="이름에 이 문자열이 들어간 경우만 실행")
+    parser.add_argument("--repeat", type=int, default=5, help="시간 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--max-work", type=float, default=5e6, help="작업량이 이보다 큰 경우는 건너뜀")
+    parser.add_argument("--parallel", action="store_true", help="멀티코어 병렬 실행 경우 추가")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--json", type=Path, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = {}
+    failures = []
+
+    print(f"{'경우':<72} {'시간(s)':>9} {'최대메모리(KB)':>14} {'행':>10} {'행/초':>12}  상태")
+    for case in make_cases(args.parallel):
+        if args.only not in case.name:
+            continue
+        for size in case.sizes or SCALES[args.scale]:
+            for ratio in case.overlaps or OVERLAPS:
+                name = f"{case.name}[size={size},overlap={ratio}]"
+                inputs = make_inputs(size, ratio)
+                if case.work(inputs) > args.max_work:
+                    print(f"{name:<72} {'':>9} {'':>14} {'':>10} {'':>12}  건너뜀 (작업량)")
+                    continue
+                result = results[name] = measure(case, inputs, args.repeat)
+                if name not in baseline:
+                    status = "새 경우"
+                else:
+                    problems = compare(result, baseline[name])
+                    status = "; ".join(problems) if problems else "ok"
+                    if problems:
+                        failures.append(name)
+                print(f"{name:<72} {result['seconds']:>9.4f} {result['peak_bytes'] / 1024:>14,.1f} "
+                      f"{result['rows']:>10,} {result['rows_per_sec'] or 0:>12,}  {status}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.update_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+        print(f"기준값 저장: {args.baseline} ({len(results)}개 경우)")
+        return 0
+    if failures:
+        print(f"\n기준값 대비 회귀 {len(failures)}건:")
+        for name in failures:
+            print(f"  {name}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
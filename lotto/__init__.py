@@ -0,0 +1,8 @@
+"""로또 조합 생성기 공용 모듈 (Streamlit 비의존)
+
+엔진(pick, maxtwo, product, overlap)은 Streamlit 없이 가져다 쓸 수 있고,
+`python -m lotto`로 명령줄에서 여러 입력을 한 번에 처리할 수 있다.
+"""
+
+# 필터링할 고정 숫자 집합 (52,55,61,67,73,79,91)
+FILTER_NUMBERS = {52, 55, 61, 67, 73, 79, 91}
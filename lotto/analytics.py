@@ -0,0 +1,147 @@
+"""생성 결과 분석 (번호 빈도, 쌍/세 숫자 동시 출현, 합계·홀짝·필터 숫자 분포)
+
+(N, 6) 결과 배열을 CHUNK_ROWS행씩 잘라 np.bincount로 한꺼번에 센다. 가장 큰 숫자가
+M-1이면 쌍은 a*M+b, 세 숫자는 (a*M+b)*M+c 한 정수가 되므로 15개 쌍, 20개 세 숫자
+조합을 각각 bincount 한 번으로 센다. 파이썬 루프는 청크 수만큼만 돌고, 추가 메모리는
+청크 크기와 M^3에 묶인다.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from lotto import FILTER_NUMBERS
+
+# 한 번에 셀 행 수
+CHUNK_ROWS = 1 << 16
+# 세 숫자 동시 출현 표 크기 상한 (M^3 칸, 가장 큰 숫자가 127을 넘으면 세 숫자는 세지 않음)
+TRIPLE_BINS_LIMIT = 1 << 21
+
+_PAIRS = list(combinations(range(6), 2))
+_TRIPLES = list(combinations(range(6), 3))
+_PAIR_INDEX = {pair: p for p, pair in enumerate(_PAIRS)}
+
+
+def _top(counts, top):
+    """횟수가 큰 순서로 0이 아닌 칸 번호 top개 (전체 정렬 없이 argpartition으로 후보만 정렬)"""
+    if top < len(counts):
+        candidates = np.argpartition(-counts, top)[:top]
+    else:
+        candidates = np.arange(len(counts))
+    order = candidates[np.lexsort((candidates, -counts[candidates]))]
+    return order[counts[order] > 0]
+
+
+class Summary:
+    """결과 블록을 차례로 더해 가는 분석 누적기
+
+    numbers는 결과에 나올 수 있는 숫자 전체(보통 입력 숫자의 합집합)다. add()에
+    weights(행마다 등장 횟수)를 주면 그만큼 센다.
+    """
+
+    def __init__(self, numbers):
+        self.numbers = np.array(sorted(set(numbers)), dtype=np.int64)
+        # 키는 숫자 그대로 쓰므로 표 한 변의 길이는 가장 큰 숫자 + 1
+        self.size = m = int(self.numbers[-1]) + 1 if len(self.numbers) else 1
+        self._filter = np.isin(np.arange(m), sorted(FILTER_NUMBERS)).astype(np.int64)
+        self.rows = 0
+        self.frequency = np.zeros(m, dtype=np.int64)
+        self.pairs = np.zeros((m, m), dtype=np.int64)
+        self.triples = np.zeros(m ** 3, dtype=np.int64) if m ** 3 <= TRIPLE_BINS_LIMIT else None
+        self.sums = np.zeros(6 * (m - 1) + 1, dtype=np.int64)
+        self.odd = np.zeros(7, dtype=np.int64)
+        self.filter_hits = np.zeros(7, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        arrays = [self.frequency, self.pairs, self.sums, self.odd, self.filter_hits]
+        return sum(a.nbytes for a in arrays) + (0 if self.triples is None else self.triples.nbytes)
+
+    def add(self, rows, weights=None):
+        rows = np.asarray(rows)
+        for start in range(0, len(rows), CHUNK_ROWS):
+            chunk = rows[start:start + CHUNK_ROWS, :6]
+            w = None if weights is None else np.asarray(weights[start:start + CHUNK_ROWS], dtype=np.int64)
+            self._add_chunk(chunk, w)
+        return self
+
+    def _count(self, values, weights, size):
+        if weights is None:
+            return np.bincount(values.ravel(), minlength=size)
+        return np.bincount(values.ravel(), np.tile(weights, len(values)), minlength=size).astype(np.int64)
+
+    def _add_chunk(self, chunk, weights):
+        m = self.size
+        n = len(chunk)
+        # 자리별로 연속된 (6, 행 수) 배열로 두고 계산 (엔진 결과는 이미 행마다 오름차순)
+        cols = np.ascontiguousarray(chunk.T, dtype=np.int64)
+        if not (cols[1:] > cols[:-1]).all():
+            cols = np.ascontiguousarray(np.sort(chunk, axis=1).T, dtype=np.int64)
+        # 오름차순이므로 쌍은 a < b, 세 숫자는 a < b < c 키로만 나오고, 쌍 키를 세 숫자 키에 다시 씀
+        pairs = np.empty((len(_PAIRS), n), dtype=np.int64)
+        for p, (i, j) in enumerate(_PAIRS):
+            np.multiply(cols[i], m, out=pairs[p])
+            pairs[p] += cols[j]
+        self.rows += n if weights is None else int(weights.sum())
+        self.frequency += self._count(cols, weights, m)
+        self.pairs += self._count(pairs, weights, m * m).reshape(m, m)
+        if self.triples is not None:
+            triples = np.empty((len(_TRIPLES), n), dtype=np.int64)
+            for t, (i, j, k) in enumerate(_TRIPLES):
+                np.multiply(pairs[_PAIR_INDEX[i, j]], m, out=triples[t])
+                triples[t] += cols[k]
+            self.triples += self._count(triples, weights, m ** 3)
+        self.sums += self._count(cols.sum(axis=0, keepdims=True), weights, len(self.sums))
+        self.odd += self._count((cols & 1).sum(axis=0, keepdims=True), weights, 7)
+        self.filter_hits += self._count(self._filter[cols].sum(axis=0, keepdims=True), weights, 7)
+
+    def frequency_frame(self):
+        counts = self.frequency[self.numbers]
+        return pd.DataFrame({"번호": self.numbers, "횟수": counts, "비율": counts / max(self.rows, 1)})
+
+    def pair_frame(self, top=20):
+        """가장 자주 함께 나온 쌍 top개"""
+        flat = self.pairs.ravel()
+        order = _top(flat, top)
+        a, b = np.divmod(order, self.size)
+        return pd.DataFrame({"번호1": a, "번호2": b, "횟수": flat[order]})
+
+    def pair_matrix_frame(self):
+        """번호 × 번호 동시 출현 횟수 표 (대칭)"""
+        matrix = (self.pairs + self.pairs.T)[np.ix_(self.numbers, self.numbers)]
+        return pd.DataFrame(matrix, index=self.numbers, columns=self.numbers)
+
+    def triple_frame(self, top=20):
+        """가장 자주 함께 나온 세 숫자 top개 (세지 않았으면 None)"""
+        if self.triples is None:
+            return None
+        order = _top(self.triples, top)
+        m = self.size
+        return pd.DataFrame({
+            "번호1": order // (m * m),
+            "번호2": order // m % m,
+            "번호3": order % m,
+            "횟수": self.triples[order],
+        })
+
+    def sum_frame(self):
+        """합계별 횟수 (나온 합계의 최소~최대 구간)"""
+        hit = np.flatnonzero(self.sums)
+        if not len(hit):
+            return pd.DataFrame({"합계": [], "횟수": []})
+        span = np.arange(hit[0], hit[-1] + 1)
+        return pd.DataFrame({"합계": span, "횟수": self.sums[span]})
+
+    def odd_frame(self):
+        return pd.DataFrame({"홀수 개수": np.arange(7), "짝수 개수": 6 - np.arange(7), "횟수": self.odd})
+
+    def filter_frame(self):
+        return pd.DataFrame({"필터 숫자 개수": np.arange(7), "횟수": self.filter_hits})
+
+
+def summarize(rows, weights=None, numbers=None):
+    """결과 배열 하나를 분석 (numbers를 주지 않으면 결과에 나온 숫자로 정함)"""
+    rows = np.asarray(rows)
+    if numbers is None:
+        numbers = np.flatnonzero(np.bincount(rows[:, :6].ravel(), minlength=256)) if len(rows) else []
+    return Summary(numbers).add(rows, weights)
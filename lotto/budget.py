@@ -0,0 +1,251 @@
+"""생성 전 작업량 추정과 작업 예산
+
+생성 버튼을 누르기 전에 결과 행 수, 걸릴 CPU 시간, 결과 배열 크기를 어림하고,
+요청 하나나 서버 전체의 예산을 넘는 작업은 그대로 시작하지 않는다.
+
+행 수는 닫힌 식(칸별 개수 DP, 곱/포함-배제)이 있으면 그 값을 그대로 쓴다. 추가
+조건이 있거나 서로 다른 번호 조합 수처럼 열거해야만 알 수 있는 값은 조건 없는 결과
+(또는 곱 위치)에서 균등하게 뽑은 표본으로 추정하고 95% 구간을 붙인다. 표본 추출은
+ESTIMATE_SECONDS 안에서 끝낸다.
+
+시간은 엔진이 실제로 도는 작업 단위 수를 측정한 처리량(RATES, 단일 코어)으로 나눈
+값이다. pick은 백트래킹이 조건 없이 검사하는 후보 수(조건이 있으면 가지치기로 더
+적음), maxtwo는 입력 숫자 합집합의 C(n, 6) 인덱스, product는 곱 위치, overlap은 중복
+조합 행이 단위다.
+
+예산 (환경 변수, 0이면 제한 없음):
+    LOTTO_MAX_ROWS        요청 하나의 최대 결과 행 수 (기본 2천만 행, 약 120MB)
+    LOTTO_MAX_SECONDS     요청 하나의 최대 예상 CPU 시간 (기본 120초)
+    LOTTO_SERVER_SECONDS  서버에서 대기/실행 중인 작업의 예상 CPU 시간 합 (기본 600초)
+"""
+import itertools
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from lotto import maxtwo, pick, product
+
+MAX_ROWS = int(os.environ.get("LOTTO_MAX_ROWS", 20_000_000))
+MAX_SECONDS = float(os.environ.get("LOTTO_MAX_SECONDS", 120))
+SERVER_SECONDS = float(os.environ.get("LOTTO_SERVER_SECONDS", 600))
+
+# 엔진별 초당 작업 단위 수 (단일 코어 측정값을 조금 낮춰 잡음)
+RATES = {
+    "pick": 2e6,
+    "maxtwo": 1e7,
+    "product": 2.5e6,
+    "overlap": 1e6,
+}
+# 표본 추정에 쓰는 시간과 표본 수 상한
+ESTIMATE_SECONDS = 0.5
+LAZY_SAMPLES = 2000
+PRODUCT_SAMPLES = 1 << 18
+PRODUCT_BATCH = 1 << 14
+# 95% 구간
+Z = 1.96
+
+
+class BudgetExceeded(RuntimeError):
+    """서버 작업 예산이 모자라 작업을 받지 않음"""
+
+
+class Estimate:
+    """생성 전 추정치
+
+    rows는 예상 결과 행 수, low/high는 95% 구간이다 (정확한 값이면 셋이 같다).
+    work는 엔진이 돌 작업 단위 수, seconds는 예상 CPU 시간, result_bytes는 결과 배열 크기
+    (high 기준)이다. draw_seconds는 표본 하나를 뽑는 데 든 평균 시간이다.
+    """
+
+    def __init__(self, rows, low=None, high=None, work=0, rate=1.0, width=6, samples=0, draw_seconds=0.0):
+        self.rows = int(rows)
+        self.low = self.rows if low is None else int(low)
+        self.high = self.rows if high is None else int(high)
+        self.work = int(work)
+        self.seconds = work / rate
+        self.result_bytes = self.high * width
+        self.samples = samples
+        self.draw_seconds = draw_seconds
+
+    @property
+    def exact(self):
+        return self.low == self.high
+
+    def over(self, max_rows=MAX_ROWS, max_seconds=MAX_SECONDS):
+        """요청 예산을 넘는 이유 (넘지 않으면 None)"""
+        if max_rows and self.high > max_rows:
+            return f"예상 결과가 최대 {self.high:,}행으로 한도 {max_rows:,}행을 넘습니다."
+        if max_seconds and self.seconds > max_seconds:
+            return f"예상 시간이 약 {self.seconds:,.0f}초로 한도 {max_seconds:,.0f}초를 넘습니다."
+        return None
+
+    def describe(self):
+        if self.exact:
+            rows = f"{self.rows:,}행"
+        elif not self.samples:
+            rows = f"최대 {self.high:,}행"
+        else:
+            rows = f"약 {self.rows:,}행 (95% 구간 {self.low:,}~{self.high:,}, 표본 {self.samples:,}개)"
+        return f"예상 결과 {rows}, 약 {self.seconds:,.1f}초, 최대 {self.result_bytes / 2 ** 20:,.1f}MB"
+
+    def __repr__(self):
+        return f"Estimate(rows={self.rows}, low={self.low}, high={self.high}, seconds={self.seconds:.3g})"
+
+
+def _wilson(hits, n):
+    """성공 hits번 / n번 비율의 95% Wilson 구간"""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    center = (p + Z * Z / (2 * n)) / (1 + Z * Z / n)
+    half = Z * math.sqrt(p * (1 - p) / n + Z * Z / (4 * n * n)) / (1 + Z * Z / n)
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def _from_rate(total, hits, n, **kwargs):
+    """전체 total개 중 조건을 통과하는 비율 표본(hits / n)으로 만든 추정치"""
+    low, high = _wilson(hits, n)
+    rows = total if n == 0 else round(total * hits / n)
+    return Estimate(rows, math.floor(total * low), min(math.ceil(total * high), total), **kwargs)
+
+
+def _lazy_estimate(view, constraints, work, rate, seed=None):
+    """LazyCombos(조건 없는 결과)에서 균등 표본을 뽑아 조건 통과 비율로 행 수 추정"""
+    total = len(view)
+    if constraints is None or total == 0:
+        return Estimate(total, work=work, rate=rate)
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + ESTIMATE_SECONDS
+    start = time.perf_counter()
+    rows = []
+    while len(rows) < LAZY_SAMPLES and (len(rows) < 32 or time.perf_counter() < deadline):
+        rows.append(view.unrank(int(rng.integers(total))))
+    hits = int(constraints.mask(rows).sum())
+    return _from_rate(total, hits, len(rows), work=work, rate=rate, samples=len(rows),
+                      draw_seconds=(time.perf_counter() - start) / len(rows))
+
+
+def estimate_pick(inputs, max_filter=6, constraints=None, seed=None):
+    """app2(pick) 생성 추정 (조건이 없으면 개수는 정확)"""
+    if constraints is not None:
+        max_filter, constraints = constraints.fold_filter(max_filter)
+    view = pick.lazy_combinations(inputs, max_filter)
+    # 백트래킹은 결과 행이 아니라 검사하는 후보 수에 비례한다 (조건이 있으면 가지치기로 더 적음)
+    return _lazy_estimate(view, constraints, pick.count_search_work(inputs, max_filter), RATES["pick"], seed)
+
+
+def estimate_maxtwo(inputs, max_filter=6, constraints=None, seed=None):
+    """app3(maxtwo) 생성 추정 (조건이 없으면 개수는 정확)"""
+    if constraints is not None:
+        max_filter, constraints = constraints.fold_filter(max_filter)
+    view = maxtwo.lazy_combinations(inputs, max_filter)
+    # 결과 수와 관계없이 합집합의 C(n, 6) 인덱스를 모두 검사한다
+    work = math.comb(len(set().union(*inputs)), 6)
+    return _lazy_estimate(view, constraints, work, RATES["maxtwo"], seed)
+
+
+def estimate_product(inputs, filtered=False, constraints=None, distinct=False, seed=None):
+    """app4(product) 유효 조합 수와 그 열거 비용 추정
+
+    조건이 없으면 칸 배치별 개수는 닫힌 식으로 정확하다. 조건이 있거나 칸끼리 겹치는데
+    서로 다른 번호 조합 수를 원하면 곱 위치 표본의 기여도(position_weights) 평균으로
+    추정한다. 시간은 곱 위치를 모두 열거해 셀 때의 비용이다.
+    """
+    total = product.calc_max_combinations(inputs)
+    rate = RATES["product"]
+    if total == 0:
+        return Estimate(0)
+    # 칸끼리 겹치는 숫자가 없으면 칸 배치와 번호 조합이 일대일
+    distinct = distinct and len(set().union(*inputs)) < sum(len(set(col)) for col in inputs)
+    if constraints is None and not distinct:
+        rows = product.calc_filtered_combinations(inputs) if filtered else product.calc_unique_combinations(inputs)
+        return Estimate(rows, work=total, rate=rate)
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + ESTIMATE_SECONDS
+    start = time.perf_counter()
+    parts = []
+    n = 0
+    while n < PRODUCT_SAMPLES and (not parts or time.perf_counter() < deadline):
+        parts.append(product.position_weights(inputs, PRODUCT_BATCH, filtered, constraints, distinct, rng))
+        n += PRODUCT_BATCH
+    weights = np.concatenate(parts)
+    kwargs = dict(work=total, rate=rate, samples=n, draw_seconds=(time.perf_counter() - start) / n)
+    if not distinct:
+        return _from_rate(total, int(weights.sum()), n, **kwargs)
+    # 1/m 기여도의 평균은 비율이 아니므로 정규 근사 구간 (0개 관측이면 비율 구간으로 대신함)
+    mean = weights.mean()
+    if mean == 0:
+        return _from_rate(total, 0, n, **kwargs)
+    half = Z * weights.std(ddof=1) / math.sqrt(n)
+    return Estimate(round(total * mean), max(math.floor(total * (mean - half)), 1), math.ceil(total * (mean + half)),
+                    **kwargs)
+
+
+def estimate_overlap(inputs):
+    """app5(overlap) 중복 분석 추정 (행 수는 정확)
+
+    두 칸 이상에 나오는 6개 조합 수는 칸 부분집합 T(2칸 이상)의 교집합 크기로
+    Σ (-1)^|T| (|T| - 1) C(|∩T|, 6) 이다 (m칸에 나오는 조합은 m >= 2일 때만 1번 세어짐).
+    엔진은 서명 그룹에서 중복 조합만 만들므로 작업량도 결과 행 수에 비례한다.
+    """
+    columns = [set(col) for col in inputs]
+    rows = 0
+    for size in range(2, len(columns) + 1):
+        for subset in itertools.combinations(columns, size):
+            rows += (-1) ** size * (size - 1) * math.comb(len(set.intersection(*subset)), 6)
+    return Estimate(rows, work=rows, rate=RATES["overlap"], width=7)
+
+
+class WorkBudget:
+    """서버 전체 작업 예산 (받아 둔 작업들의 예상 CPU 시간 합)
+
+    작업 풀에 넣을 때 acquire(), 작업이 끝나면 release() 한다. 받아 둔 작업이 없으면
+    한도보다 큰 작업도 하나는 받는다 (요청 예산은 화면에서 먼저 확인함).
+    """
+
+    def __init__(self, seconds=SERVER_SECONDS):
+        self.seconds = seconds
+        self.reserved = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, cost):
+        with self._lock:
+            if self.seconds and self.reserved and self.reserved + cost > self.seconds:
+                raise BudgetExceeded(
+                    f"서버가 바쁩니다 (실행 중인 작업의 예상 시간 {self.reserved:,.0f}초 + 이 작업 {cost:,.0f}초 > "
+                    f"한도 {self.seconds:,.0f}초). 잠시 뒤 다시 시도하거나 제한/추출 방식으로 실행하세요."
+                )
+            self.reserved += cost
+
+    def release(self, cost):
+        with self._lock:
+            self.reserved = max(self.reserved - cost, 0.0)
+
+
+def iter_sample_blocks(view, k, constraints=None, stats=None, seed=None, batch=256):
+    """LazyCombos에서 서로 다른 순위를 균등하게 뽑아 조건을 통과한 행 k개를 블록으로 생성
+
+    조건이 있으면 통과하지 못한 행은 버린다 (거절 추출). 모든 순위를 다 뽑았으면 k개보다
+    적어도 끝난다. stats["nodes"]에는 뽑은 순위 수를 누적한다.
+    """
+    total = len(view)
+    rng = np.random.default_rng(seed)
+    seen = set()
+    left = min(k, total)
+    while left > 0 and len(seen) < total:
+        rows = []
+        while len(rows) < batch and len(seen) < total:
+            i = int(rng.integers(total))
+            if i not in seen:
+                seen.add(i)
+                rows.append(view.unrank(i))
+        if stats is not None:
+            stats["nodes"] += len(rows)
+        if constraints is not None:
+            rows = [row for row, ok in zip(rows, constraints.mask(rows)) if ok]
+        rows = rows[:left]
+        left -= len(rows)
+        yield rows
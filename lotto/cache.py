@@ -0,0 +1,101 @@
+"""프로세스 전역 결과 캐시
+
+같은 입력(칸 구성), 같은 모드, 같은 생성기로 계산한 개수와 결과 배열을 세션과
+관계없이 공유한다. Streamlit은 한 프로세스에서 모든 세션을 실행하므로 모듈 전역
+캐시 하나로 로그아웃/재로그인이나 다른 사용자의 같은 요청도 재계산 없이 응답한다.
+메모리 예산(LOTTO_CACHE_BYTES, 기본 512MB)을 넘으면 가장 오래 쓰지 않은 항목부터 버린다.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from lotto.results import ComboArray, StoredResult
+
+DEFAULT_BUDGET_BYTES = int(os.environ.get("LOTTO_CACHE_BYTES", 512 * 1024 * 1024))
+
+
+def canonical_inputs(inputs):
+    """칸 순서는 유지하고 칸 안의 숫자만 정렬·중복 제거한 튜플"""
+    return tuple(tuple(sorted(set(col))) for col in inputs)
+
+
+def make_key(variant, inputs, **options):
+    """(생성기 이름, 정규화된 입력, 옵션) 캐시 키"""
+    return variant, canonical_inputs(inputs), tuple(sorted(options.items()))
+
+
+def _sizeof(value):
+    if isinstance(value, ComboArray):
+        return value.capacity_bytes
+    if isinstance(value, StoredResult):
+        return 64  # 행은 디스크(메모리 맵)에 있고 핸들만 캐시에 둠
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return 64 + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 64 + sum(_sizeof(item) for item in value)
+    return 64
+
+
+class ResultCache:
+    """메모리 예산 기반 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key][0]
+
+    def put(self, key, value):
+        if isinstance(value, ComboArray):
+            # 공유 결과는 여유 용량을 잘라내고 더 이상 붙일 수 없게 고정
+            value.freeze()
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            if size > self.budget_bytes:
+                return value
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.budget_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+result_cache = ResultCache()
+
+
+def cached(variant, inputs, compute, **options):
+    """전역 캐시에서 찾고, 없으면 compute()로 계산해 저장"""
+    return result_cache.get_or_compute(make_key(variant, inputs, **options), compute)
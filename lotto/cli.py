@@ -0,0 +1,218 @@
+"""명령줄에서 여러 입력을 한 번에 처리
+
+입력 파일의 한 줄이 입력 세트 하나(6칸)이다. 줄은 한 번에 하나씩 읽고 결과는 블록
+단위로 바로 출력하므로, 입력 세트 수나 결과 행 수와 관계없이 메모리는 블록 크기로
+묶인다.
+
+입력 줄 형식 (빈 줄과 #으로 시작하는 줄은 무시):
+
+    {"name": "1회차", "columns": [[1, 2, 3], [4, 5], ...]}    JSON 객체
+    [[1, 2, 3], [4, 5], ...]                                  JSON 배열
+    1 2 3 | 4 5 | 6 7 | 8 9 | 10 11 | 12 13                   칸을 |로 구분한 숫자
+
+    python -m lotto count --engine maxtwo inputs.txt          세트마다 JSON 한 줄
+    python -m lotto generate --engine pick --filtered inputs.txt > out.csv
+    python -m lotto generate --engine product --out-dir out --format NPY inputs.txt
+    python -m lotto sample -k 1000 inputs.txt                 product 균등 추출
+    python -m lotto sample -k 1000 --distinct inputs.txt      서로 다른 번호 조합에서 균등 추출
+    python -m lotto generate --engine pick --rules "sum=100-160, odd=2-4" inputs.txt
+    python -m lotto duplicates inputs.txt                     overlap 중복 조합
+
+표준 출력으로 내보내면 모든 세트를 CSV 하나로 이어 쓰고 첫 열에 세트 번호(입력
+순서, 0부터)를 붙인다. --out-dir를 주면 세트마다 "이름.확장자" 파일을 따로 쓰고
+세트별 요약을 JSON 한 줄씩 표준 출력에 남긴다.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from lotto import export, maxtwo, overlap, pick, product
+from lotto.constraints import Constraints
+from lotto.results import check_numbers
+
+COLUMNS = ['번호1', '번호2', '번호3', '번호4', '번호5', '번호6']
+
+
+def _pick_blocks(inputs, filtered, use_parallel, constraints=None):
+    search = pick.iter_search_blocks_parallel if use_parallel else pick.iter_search_blocks
+    return search(inputs, 1 if filtered else 6, constraints=constraints)
+
+
+def _maxtwo_blocks(inputs, filtered, use_parallel, constraints=None):
+    scan = maxtwo.iter_valid_blocks_parallel if use_parallel else maxtwo.iter_valid_blocks
+    return scan(inputs, 1 if filtered else 6, constraints=constraints)
+
+
+def _maxtwo_count(inputs, filtered):
+    by_filter = maxtwo.calc_unique_combinations(inputs, by_filter=True)
+    return sum(n for f, n in by_filter.items() if not filtered or f <= 1)
+
+
+def _product_count(inputs, filtered):
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    return product.calc_filtered_combinations(inputs) if filtered else product.calc_unique_combinations(inputs)
+
+
+# 엔진 이름 → (개수 함수(inputs, filtered), 블록 생성 함수(inputs, filtered, use_parallel, constraints=None))
+ENGINES = {
+    "pick": (lambda inputs, filtered: pick.calc_unique_combinations(inputs, 1 if filtered else 6), _pick_blocks),
+    "maxtwo": (_maxtwo_count, _maxtwo_blocks),
+    "product": (_product_count, product.iter_valid_blocks),
+}
+
+
+def parse_line(line):
+    """입력 줄 하나를 (이름, 6칸 숫자 목록)으로 변환 (빈 줄/주석이면 None)"""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    name = None
+    if line[0] in "[{":
+        data = json.loads(line)
+        if isinstance(data, dict):
+            name = data.get("name")
+            data = data["columns"]
+        columns = [[int(x) for x in col] for col in data]
+    else:
+        columns = [[int(x) for x in col.split()] for col in line.split("|")]
+    if len(columns) != 6:
+        raise ValueError(f"칸이 6개가 아닙니다 ({len(columns)}개)")
+    check_numbers(columns)
+    return name, [sorted(set(col)) for col in columns]
+
+
+def iter_input_sets(f):
+    """파일에서 (번호, 이름, 입력)을 한 줄씩 읽어 생성 (번호는 0부터, 이름이 없으면 줄 번호)"""
+    index = 0
+    for lineno, line in enumerate(f, 1):
+        try:
+            parsed = parse_line(line)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"{getattr(f, 'name', '입력')}:{lineno}: {e}") from None
+        if parsed is None:
+            continue
+        name, inputs = parsed
+        yield index, name or f"line{lineno}", inputs
+        index += 1
+
+
+def _with_index(index, blocks):
+    for block in blocks:
+        block = np.asarray(block, dtype=np.int64)
+        if len(block):
+            yield np.column_stack([np.full(len(block), index, dtype=np.int64), block])
+
+
+def _write_sets(args, sets, blocks_fn, columns):
+    """세트별 결과 블록을 표준 출력(CSV 하나) 또는 세트별 파일로 기록"""
+    if args.out_dir is None:
+        if args.format != "CSV":
+            raise SystemExit("표준 출력은 CSV 형식만 지원합니다. 다른 형식은 --out-dir를 지정하세요.")
+        rows = (block for index, _, inputs in sets for block in _with_index(index, blocks_fn(inputs)))
+        export.write_rows(sys.stdout.buffer, rows, ["세트"] + columns, "CSV", args.encoding)
+        sys.stdout.buffer.flush()
+        return
+    os.makedirs(args.out_dir, exist_ok=True)
+    ext = export.FORMATS[args.format][0]
+    for index, name, inputs in sets:
+        path = os.path.join(args.out_dir, f"{name}.{ext}")
+        stats = {"rows": 0}
+        with open(path, "wb") as f:
+            export.write_rows(f, _counted(blocks_fn(inputs), stats), columns, args.format, args.encoding)
+        _emit({"index": index, "name": name, "rows": stats["rows"], "path": path})
+
+
+def _counted(blocks, stats):
+    for block in blocks:
+        stats["rows"] += len(block)
+        yield block
+
+
+def _emit(record):
+    print(json.dumps(record, ensure_ascii=False), flush=True)
+
+
+def cmd_count(args, sets):
+    count_fn, blocks_fn = ENGINES[args.engine]
+    for index, name, inputs in sets:
+        if args.rules:
+            # 추가 조건은 개수 공식이 없으므로 가지치기 열거로 셈 (결과는 쌓지 않음)
+            count = sum(len(block) for block in blocks_fn(inputs, args.filtered, False, constraints=args.rules))
+        else:
+            count = count_fn(inputs, args.filtered)
+        _emit({"index": index, "name": name, "count": count})
+
+
+def cmd_generate(args, sets):
+    blocks_fn = ENGINES[args.engine][1]
+    _write_sets(args, sets, lambda inputs: blocks_fn(inputs, args.filtered, args.parallel, constraints=args.rules),
+                COLUMNS)
+
+
+def cmd_sample(args, sets):
+    def blocks(inputs):
+        yield product.sample_combinations(inputs, args.k, args.filtered, args.parallel, constraints=args.rules,
+                                          distinct=args.distinct).data
+
+    _write_sets(args, sets, blocks, COLUMNS)
+
+
+def cmd_duplicates(args, sets):
+    _write_sets(args, sets, overlap.iter_duplicate_blocks, overlap.RESULT_COLUMNS)
+
+
+def _parse_rules(text):
+    try:
+        return Constraints.parse(text) or None
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m lotto", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, func, summary, engine=False, output=True):
+        p = sub.add_parser(name, help=summary)
+        p.add_argument("input", help="입력 파일 (- 이면 표준 입력)")
+        if engine:
+            p.add_argument("--engine", choices=sorted(ENGINES), required=True)
+        if name != "duplicates":
+            p.add_argument("--filtered", action="store_true", help="필터 숫자를 최대 1개만 사용")
+            p.add_argument("--rules", type=_parse_rules, help='추가 조건 (예: "sum=100-160, odd=2-4, group=2")')
+        if output:
+            p.add_argument("--out-dir", help="세트마다 파일을 따로 쓸 디렉터리 (없으면 표준 출력에 CSV)")
+            p.add_argument("--format", choices=list(export.FORMATS), default="CSV")
+            p.add_argument("--encoding", default="utf-8", help="CSV 인코딩 (엑셀용은 utf-8-sig)")
+            p.add_argument("--parallel", action="store_true", help="멀티코어 병렬 실행")
+        p.set_defaults(func=func)
+        return p
+
+    add("count", cmd_count, "세트별 조합 수", engine=True, output=False)
+    add("generate", cmd_generate, "세트별 전체 조합 생성", engine=True)
+    sample = add("sample", cmd_sample, "product 조합 균등 추출")
+    sample.add_argument("-k", type=int, required=True, help="세트당 추출 개수")
+    sample.add_argument("--distinct", action="store_true", help="같은 번호 조합은 한 번만 (번호 조합 기준 균등 추출)")
+    add("duplicates", cmd_duplicates, "overlap 중복 조합과 등장 횟수")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    f = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        args.func(args, iter_input_sets(f))
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:  # head 등으로 출력을 일찍 닫은 경우
+        sys.stderr.close()
+        return 0
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return 0
@@ -0,0 +1,332 @@
+"""조합 제약 조건
+
+규칙을 선언해 Constraints로 묶으면 두 가지 형태로 검사한다.
+
+- 점진 검사: compile(numbers)가 규칙들을 정수 하나짜리 상태와 경계 검사표로 묶은
+  Checker를 만들고, 탐색이 숫자를 고를 때마다 push()로 상태를 갱신한다. 남은 자리를
+  어떻게 채워도 만족할 수 없는 가지는 그 자리에서 잘라낸다 (pick 백트래킹,
+  maxtwo/product의 앞자리 접두사).
+- 벡터 검사: mask(rows)가 (행 수, 6) 배열의 행마다 만족 여부를 한 번에 계산한다.
+
+FILTER_NUMBERS에 대한 MaxFrom은 엔진의 필터 숫자 개수 한도(max_filter)로 접어 넣어
+(fold_filter) 개수 계산과 순위 접근이 쓰는 기존 경로를 그대로 탄다.
+
+    Constraints.parse("filter=1, sum=100-160, odd=2-4, consecutive=2, group=2")
+"""
+import numpy as np
+
+from lotto import FILTER_NUMBERS
+
+
+class Bound:
+    """규칙 하나가 쓰는 덧셈형 계수기 (규칙의 bounds(numbers, pool)가 만듦)
+
+    숫자마다 weight(num)을 더해 가며, 아직 remaining자리가 남았을 때 값이
+    low[remaining] 이상 high[remaining] 이하여야 끝까지 만족할 가능성이 있다
+    (None이면 그쪽 경계 없음). peak는 숫자 하나의 weight 최댓값이다.
+    """
+
+    def __init__(self, weight, peak=1, low=None, high=None):
+        self.weight = weight
+        self.peak = peak
+        self.low = low or [None] * 7
+        self.high = high or [None] * 7
+
+
+class MaxFrom:
+    """numbers 중 최대 limit개"""
+
+    # 벡터 검사 비용 순위 (작을수록 먼저 적용)
+    COST = 1
+
+    def __init__(self, numbers, limit):
+        self.numbers = frozenset(numbers)
+        self.limit = limit
+
+    def key(self):
+        return "from", tuple(sorted(self.numbers)), self.limit
+
+    def bounds(self, numbers, pool):
+        members = self.numbers
+        return [Bound(lambda num: int(num in members), high=[self.limit] * 7)]
+
+    def mask(self, rows):
+        return np.isin(rows, sorted(self.numbers)).sum(axis=1) <= self.limit
+
+
+class SumRange:
+    """여섯 숫자의 합이 low 이상 high 이하"""
+
+    COST = 0
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def key(self):
+        return "sum", self.low, self.high
+
+    def bounds(self, numbers, pool):
+        # 남은 r자리를 pool의 가장 작은/큰 숫자로 채웠을 때의 합 (사용한 숫자는 무시한 완화된 경계)
+        ordered = sorted(pool)
+        smallest = [sum(ordered[:r]) for r in range(7)]
+        largest = [sum(ordered[len(ordered) - r:]) if r else 0 for r in range(7)]
+        return [Bound(lambda num: num, max(numbers, default=0),
+                      low=[self.low - largest[r] for r in range(7)],
+                      high=[self.high - smallest[r] for r in range(7)])]
+
+    def mask(self, rows):
+        sums = rows.sum(axis=1)
+        return (sums >= self.low) & (sums <= self.high)
+
+
+class OddEven:
+    """홀수가 min_odd개 이상 max_odd개 이하 (짝수 개수는 6에서 뺀 값)"""
+
+    COST = 0
+
+    def __init__(self, min_odd, max_odd):
+        self.min_odd = min_odd
+        self.max_odd = max_odd
+
+    def key(self):
+        return "odd", self.min_odd, self.max_odd
+
+    def bounds(self, numbers, pool):
+        return [Bound(lambda num: num & 1,
+                      low=[self.min_odd - r for r in range(7)],
+                      high=[self.max_odd] * 7)]
+
+    def mask(self, rows):
+        odd = (rows & 1).sum(axis=1)
+        return (odd >= self.min_odd) & (odd <= self.max_odd)
+
+
+class MaxConsecutive:
+    """연속된 숫자(예: 7 8 9)가 최대 length개"""
+
+    COST = 2
+
+    def __init__(self, length):
+        self.length = length
+
+    def key(self):
+        return "consecutive", self.length
+
+    def bounds(self, numbers, pool):
+        # 덧셈형 계수기가 아니라 Checker가 고른 숫자 비트마스크로 따로 검사
+        return []
+
+    def mask(self, rows):
+        # 정렬된 서로 다른 숫자에서 k번째와 k+length번째의 차가 length이면 그 사이가 모두 연속
+        ok = np.ones(len(rows), dtype=bool)
+        for k in range(6 - self.length):
+            ok &= rows[:, k + self.length] - rows[:, k] != self.length
+        return ok
+
+
+class GroupMax:
+    """width 단위 구간(1~10, 11~20, ...)마다 최대 limit개"""
+
+    COST = 2
+
+    def __init__(self, limit, width=10):
+        self.limit = limit
+        self.width = width
+
+    def key(self):
+        return "group", self.limit, self.width
+
+    def _group(self, num):
+        return max(num - 1, 0) // self.width
+
+    def bounds(self, numbers, pool):
+        groups = sorted({self._group(num) for num in numbers})
+        return [Bound(lambda num, g=g: int(self._group(num) == g), high=[self.limit] * 7) for g in groups]
+
+    def mask(self, rows):
+        # 정렬된 행의 구간 번호도 정렬되어 있으므로 limit칸 떨어진 두 자리가 같으면 초과
+        groups = np.maximum(rows - 1, 0) // self.width
+        ok = np.ones(len(rows), dtype=bool)
+        for k in range(6 - self.limit):
+            ok &= groups[:, k + self.limit] != groups[:, k]
+        return ok
+
+
+class Checker:
+    """입력 숫자에 맞춰 컴파일된 점진 검사기
+
+    모든 규칙의 계수기를 정수 하나의 비트 필드로 묶는다. 맨 아래 3비트는 고른 개수,
+    그 위로 경계마다 값 w비트와 넘침 표시 1비트, 맨 위는 고른 숫자의 비트마스크
+    (연속 숫자 검사용)다. 조합 안의 숫자는 서로 다르므로 상태 갱신은 숫자들의
+    기여분(delta)을 한 번 더하는 것으로 끝난다. 경계 검사는 남은 자리 수마다 미리
+    계산한 오프셋을 더해 넘침 비트가 기대값과 같은지 보는 AND 한 번이다
+    (상한 v <= U: v + 2^w-1-U의 넘침 비트가 0, 하한 v >= L: v + 2^w-L의 넘침 비트가 1).
+    """
+
+    def __init__(self, rules, numbers, pool=None):
+        numbers = sorted(set(numbers))
+        pool = numbers if pool is None else sorted(set(pool))
+        self._weights = []
+        self._impossible = [False] * 7
+        self._offsets = [0] * 7
+        self._checks = [0] * 7
+        self._expects = [0] * 7
+        shift = 3
+        for rule in rules:
+            for bound in rule.bounds(numbers, pool):
+                top = 6 * max(bound.peak, 1)
+                width = top.bit_length()
+                flag = 1 << (shift + width)
+                for limits, upper in ((bound.high, True), (bound.low, False)):
+                    if all(limit is None for limit in limits):
+                        continue
+                    self._weights.append((shift, bound.weight))
+                    for r, limit in enumerate(limits):
+                        if limit is None:
+                            continue
+                        if upper and limit < 0 or not upper and limit > top:
+                            self._impossible[r] = True
+                        elif upper and limit < top:
+                            self._offsets[r] += ((1 << width) - 1 - limit) << shift
+                            self._checks[r] |= flag
+                        elif not upper and limit > 0:
+                            self._offsets[r] += ((1 << width) - limit) << shift
+                            self._checks[r] |= flag
+                            self._expects[r] |= flag
+                    shift += width + 1
+                    flag = 1 << (shift + width)
+        runs = [rule.length for rule in rules if isinstance(rule, MaxConsecutive)]
+        self.run_length = min(runs) if runs else None
+        self._run_shift = shift
+        self.start = 0
+
+    def delta(self, nums):
+        """숫자들을 고를 때 상태에 더할 값"""
+        delta = len(nums)
+        for shift, weight in self._weights:
+            delta += sum(weight(num) for num in nums) << shift
+        if self.run_length is not None:
+            for num in nums:
+                delta += 1 << (self._run_shift + num)
+        return delta
+
+    def push(self, state, delta):
+        """delta만큼 고른 새 상태 (남은 자리를 어떻게 채워도 만족할 수 없으면 None)"""
+        state += delta
+        remaining = 6 - (state & 7)
+        if self._impossible[remaining] or (state + self._offsets[remaining]) & self._checks[remaining] \
+                != self._expects[remaining]:
+            return None
+        if self.run_length is not None:
+            run = state >> self._run_shift
+            for _ in range(self.run_length):
+                run &= run >> 1
+            if run:
+                return None
+        return state
+
+
+class Constraints:
+    """제약 규칙 묶음 (모든 규칙을 만족해야 통과)"""
+
+    PARSERS = {
+        "filter": lambda lo, hi: MaxFrom(FILTER_NUMBERS, hi),
+        "sum": lambda lo, hi: SumRange(lo, hi),
+        "odd": lambda lo, hi: OddEven(lo, hi),
+        "consecutive": lambda lo, hi: MaxConsecutive(hi),
+        "group": lambda lo, hi: GroupMax(hi),
+    }
+    # 규칙별로 쓸 수 있는 값 범위 (None이면 위쪽 제한 없음)
+    LIMITS = {
+        "filter": (0, 6),
+        "sum": (0, None),
+        "odd": (0, 6),
+        "consecutive": (1, 6),
+        "group": (1, 6),
+    }
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+
+    @classmethod
+    def parse(cls, text):
+        """"이름=값" 또는 "이름=최소-최대"를 쉼표로 나열한 문자열 (filter, sum, odd, consecutive, group)
+
+        값이 정수가 아니거나, 최소가 최대보다 크거나, 규칙이 쓸 수 있는 범위(LIMITS)를
+        벗어나면 ValueError를 낸다.
+        """
+        rules = []
+        for part in text.split(","):
+            if not part.strip():
+                continue
+            name, _, value = part.partition("=")
+            name = name.strip()
+            if name not in cls.PARSERS or not value.strip():
+                raise ValueError(f"알 수 없는 조건입니다: {part.strip()}")
+            lo, dash, hi = (token.strip() for token in value.partition("-"))
+            if not lo.isdecimal() or dash and not hi.isdecimal():
+                raise ValueError(f"조건 값은 0 이상의 정수여야 합니다: {part.strip()}")
+            lo = int(lo)
+            hi = int(hi) if dash else lo
+            if lo > hi:
+                raise ValueError(f"조건 범위의 최솟값이 최댓값보다 큽니다: {part.strip()}")
+            low, high = cls.LIMITS[name]
+            if lo < low or high is not None and hi > high:
+                allowed = f"{low}~{high}" if high is not None else f"{low} 이상"
+                raise ValueError(f"{name} 값은 {allowed}이어야 합니다: {part.strip()}")
+            rules.append(cls.PARSERS[name](lo, hi))
+        return cls(rules)
+
+    def key(self):
+        return tuple(rule.key() for rule in self.rules)
+
+    def __eq__(self, other):
+        return isinstance(other, Constraints) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def __repr__(self):
+        return f"Constraints({list(self.key())})"
+
+    def fold_filter(self, max_filter):
+        """FILTER_NUMBERS에 대한 MaxFrom을 max_filter로 접고 (max_filter, 나머지 규칙 또는 None)"""
+        rest = []
+        for rule in self.rules:
+            if isinstance(rule, MaxFrom) and rule.numbers == FILTER_NUMBERS:
+                max_filter = min(max_filter, rule.limit)
+            else:
+                rest.append(rule)
+        return max_filter, Constraints(rest) if rest else None
+
+    def compile(self, numbers, pool=None):
+        """numbers(입력 숫자 전체)에 맞춘 Checker
+
+        pool을 주면 앞으로 고를 숫자가 그 안에서만 나온다고 보고 경계를 좁힌다.
+        상태 배치는 numbers로만 정해지므로 pool이 다른 Checker끼리 상태와 delta를 섞어 쓸 수 있다.
+        """
+        return Checker(self.rules, numbers, pool)
+
+    def mask(self, rows, ordered=False):
+        """행마다 모든 규칙을 만족하는지 (rows: 서로 다른 숫자 6개씩인 (행 수, 6) 정수 배열)
+
+        규칙은 행이 오름차순이라고 보고 검사하므로 ordered가 아니면 먼저 정렬한다.
+        규칙을 하나 적용할 때마다 통과한 행만 남겨 다음 규칙은 남은 행만 검사한다.
+        """
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, 6)
+        if not ordered:
+            rows = np.sort(rows, axis=1)
+        ok = np.zeros(len(rows), dtype=bool)
+        alive = np.arange(len(rows))
+        for rule in sorted(self.rules, key=lambda rule: rule.COST):
+            keep = rule.mask(rows)
+            rows, alive = rows[keep], alive[keep]
+        ok[alive] = True
+        return ok
+
+    def accepts(self, combo):
+        return bool(self.mask([combo])[0])
@@ -0,0 +1,139 @@
+"""조합 결과 내보내기
+
+결과를 CHUNK_ROWS행씩 잘라 임시 파일(SpooledTemporaryFile)에 차례로 기록한다.
+전체 DataFrame, 전체 CSV 문자열, 인코딩된 전체 bytes를 동시에 만들지 않으므로
+내보내기 중 메모리 사용량은 행 수와 관계없이 청크 크기로 묶인다.
+"""
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow가 없으면 Parquet 형식만 비활성화
+    pa = None
+    pq = None
+
+from lotto import metrics
+from lotto.results import ComboArray, StoredResult
+
+# 한 번에 변환/기록할 행 수
+CHUNK_ROWS = 100_000
+# 이 크기를 넘으면 임시 파일이 메모리에서 디스크로 넘어감
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# 형식 이름 → (확장자, MIME)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "NPY": ("npy", "application/octet-stream"),
+}
+
+
+def available_formats():
+    """현재 환경에서 사용할 수 있는 내보내기 형식 이름 목록"""
+    return [name for name in FORMATS if name != "Parquet" or pq is not None]
+
+
+def iter_chunks(rows, chunk_rows=CHUNK_ROWS):
+    """결과를 (행 수, 열 수) 배열 청크로 순회
+
+    rows가 리스트/배열/ComboArray/StoredResult이면 chunk_rows행씩 잘라서(배열과 메모리
+    맵은 복사 없는 뷰로) 내보내고, 그 밖의 이터러블은 이미 블록을 생성하는 제너레이터로
+    보고 그대로 넘긴다.
+    """
+    if isinstance(rows, (ComboArray, StoredResult)):
+        rows = rows.data
+    if isinstance(rows, (list, tuple, np.ndarray)):
+        for start in range(0, len(rows), chunk_rows):
+            yield np.asarray(rows[start:start + chunk_rows])
+    else:
+        for block in rows:
+            block = np.asarray(block)
+            if len(block):
+                yield block
+
+
+def _as_uint8(block):
+    if block.size and (block.min() < 0 or block.max() > 255):
+        raise ValueError("이진 형식은 0~255 범위의 숫자만 저장할 수 있습니다.")
+    return block.astype(np.uint8, copy=False)
+
+
+def _write_csv(f, chunks, columns, encoding):
+    f.write(pd.DataFrame(columns=columns).to_csv(index=False).encode(encoding))
+    for block in chunks:
+        # 헤더(BOM 포함)는 한 번만 쓰고 본문은 BOM 없이 이어 붙임
+        body = pd.DataFrame(block, columns=columns).to_csv(index=False, header=False)
+        f.write(body.encode(encoding.replace("-sig", "")))
+
+
+def _write_parquet(f, chunks, columns):
+    if pq is None:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다.")
+    schema = pa.schema([(name, pa.uint8()) for name in columns])
+    with pq.ParquetWriter(f, schema) as writer:
+        for block in chunks:
+            block = _as_uint8(block)
+            writer.write_table(pa.table([block[:, i] for i in range(len(columns))], schema=schema))
+
+
+def _npy_header(rows, width):
+    # 행 수 자리를 고정 폭으로 잡아 두고, 다 쓴 뒤 같은 길이의 헤더로 덮어씀
+    header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%20d, %d), }" % (rows, width)
+    prefix_len = len(np.lib.format.MAGIC_PREFIX) + 2 + 2
+    padding = 64 - (prefix_len + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    return np.lib.format.magic(1, 0) + len(header).to_bytes(2, "little") + header
+
+
+def _write_npy(f, chunks, columns):
+    width = len(columns)
+    f.write(_npy_header(0, width))
+    rows = 0
+    for block in chunks:
+        block = _as_uint8(block).reshape(-1, width)
+        f.write(np.ascontiguousarray(block).tobytes())
+        rows += len(block)
+    end = f.tell()
+    f.seek(0)
+    f.write(_npy_header(rows, width))
+    f.seek(end)
+
+
+def write_rows(f, rows, columns, fmt="CSV", encoding="utf-8-sig", chunk_rows=CHUNK_ROWS):
+    """결과를 지정한 형식으로 바이너리 파일 객체 f에 청크 단위로 기록
+
+    NPY는 다 쓴 뒤 헤더의 행 수를 고쳐 쓰므로 f가 seek를 지원해야 한다.
+    """
+    chunks = iter_chunks(rows, chunk_rows)
+    with metrics.stage("export", fmt=fmt) as stage:
+        if fmt == "CSV":
+            _write_csv(f, chunks, columns, encoding)
+        elif fmt == "Parquet":
+            _write_parquet(f, chunks, columns)
+        elif fmt == "NPY":
+            _write_npy(f, chunks, columns)
+        else:
+            raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+        if f.seekable():  # 파이프(표준 출력)는 위치를 알 수 없음
+            stage.set(bytes=f.tell())
+
+
+def export_rows(rows, columns, fmt="CSV", encoding="utf-8-sig", chunk_rows=CHUNK_ROWS):
+    """결과를 지정한 형식으로 임시 파일에 청크 단위로 기록해 돌려줌
+
+    반환값은 처음 위치로 되감긴 SpooledTemporaryFile이다.
+    """
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_rows(f, rows, columns, fmt, encoding, chunk_rows)
+    f.seek(0)
+    return f
+
+
+def file_info(fmt, base_name):
+    """형식에 맞는 (파일 이름, MIME)"""
+    ext, mime = FORMATS[fmt]
+    return f"{base_name}.{ext}", mime
@@ -0,0 +1,178 @@
+"""백그라운드 조합 생성 작업
+
+생성기를 Streamlit 스크립트 스레드가 아닌 작업 풀에서 실행한다. 생성기는
+`stats` 딕셔너리를 받아 결과 블록을 yield 하는 함수(blocks_factory)로 넘긴다.
+작업은 블록이 나올 때마다 결과 배열에 붙이고 진행 상황(탐색 노드, 생성 행)을
+갱신하며, 블록 사이에서 취소 요청과 행 수/시간 상한을 확인한다. 화면은 다시
+실행될 때마다 지금까지 쌓인 부분 결과를 그대로 읽는다. 끝난 결과는 디스크
+저장소(lotto.store)에 옮기고 결과를 메모리 맵 핸들로 바꾼다.
+
+작업 풀에 넣을 때는 예상 CPU 시간(cost)만큼 서버 예산(lotto.budget.WorkBudget)을
+잡고 작업이 끝나면 돌려준다. 예산이 모자라면 submit이 BudgetExceeded를 낸다.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from lotto import metrics
+from lotto.budget import WorkBudget
+from lotto.cache import result_cache
+from lotto.results import ComboArray
+from lotto.store import result_store
+
+# 동시에 실행할 작업 수 (초과분은 대기열에서 기다림). 작업 스레드는 GIL을 두고
+# 화면을 그리는 스크립트 스레드와 다투므로 CPU 수가 아니라 적게 둔다. 프로세스로
+# 나눠 돌리는 병렬 생성은 lotto.parallel(LOTTO_PROCESSES)이 맡는다.
+MAX_WORKERS = int(os.environ.get("LOTTO_JOB_WORKERS", 2))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class Job:
+    """실행 중이거나 끝난 생성 작업 하나"""
+
+    def __init__(self, width=6, total=None, recorder=metrics.NULL_RECORDER, cost=0.0, limit=None, seconds=None):
+        self.id = uuid.uuid4().hex
+        self.total = total
+        self.cost = cost
+        self.limit = limit
+        self.seconds = seconds
+        self.capped = False
+        self.result = ComboArray(width)
+        self.stats = {"nodes": 0}
+        self.status = PENDING
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.metrics = recorder
+        self._cancel = threading.Event()
+
+    @property
+    def rows(self):
+        return len(self.result)
+
+    @property
+    def nodes(self):
+        return self.stats["nodes"]
+
+    @property
+    def active(self):
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def complete(self):
+        """취소·실패·상한 없이 끝까지 생성했는지 (입력 키로 캐시해도 되는 결과인지)"""
+        return self.status == DONE and not self.capped
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self, blocks_factory, cache_key):
+        if self._cancel.is_set():
+            self.status = CANCELLED
+            return
+        self.status = RUNNING
+        self.started = time.perf_counter()
+        try:
+            with self.metrics.stage("enumerate") as stage:
+                for block in blocks_factory(self.stats):
+                    # 정확히 limit행이면 다음 블록이 더 있을 때만 상한에 걸린 것으로 봄
+                    if self.limit is not None and self.rows + len(block) > self.limit:
+                        self.result.append(block[:self.limit - self.rows])
+                        self.capped = True
+                    else:
+                        self.result.append(block)
+                    if self._cancel.is_set():
+                        self.status = CANCELLED
+                        break
+                    # 상한에 걸리면 거기까지를 결과로 마침
+                    if self.seconds is not None and self.elapsed > self.seconds:
+                        self.capped = True
+                    if self.capped:
+                        self.status = DONE
+                        break
+                else:
+                    self.status = DONE
+                stage.set(rows=self.rows, nodes=self.nodes, capped=self.capped)
+            if self.status == DONE and cache_key is not None:
+                with self.metrics.stage("store") as stage:
+                    self.result = result_store.put(cache_key, self.result, self.result.width)
+                    stage.set(rows=self.rows, on_disk=not isinstance(self.result, ComboArray))
+                result_cache.put(cache_key, self.result)
+        except Exception as e:  # 작업 스레드의 예외는 화면에서 보여줌
+            self.error = e
+            self.status = FAILED
+        finally:
+            self.finished = time.perf_counter()
+            self.metrics.finish(status=self.status, error=self.error and repr(self.error))
+
+
+class JobRunner:
+    """고정 크기 스레드 풀에서 작업 실행"""
+
+    def __init__(self, max_workers=MAX_WORKERS, budget=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lotto-job")
+        self.budget = WorkBudget() if budget is None else budget
+
+    def submit(self, blocks_factory, width=6, cache_key=None, total=None, cost=0.0, limit=None, seconds=None):
+        """작업을 등록하고 Job을 바로 돌려줌
+
+        total은 예상 결과 행 수(진행률 표시용)이다. cache_key의 결과가 전역 캐시나
+        디스크 저장소에 있으면 실행하지 않고 완료된 작업을 돌려준다. 측정 기록 이름은
+        cache_key의 생성기 이름이다. cost는 예상 CPU 시간으로, 서버 예산이 모자라면
+        BudgetExceeded를 낸다. limit(행 수)이나 seconds(실행 시간)를 주면 거기서 멈추고
+        그때까지의 결과로 끝낸다 (job.capped).
+        """
+        name = cache_key[0] if cache_key is not None else "job"
+        job = Job(width, total, metrics.recorder(name, total=total), cost, limit, seconds)
+        if cache_key is not None and self._load(job, cache_key):
+            return job
+        self.budget.acquire(cost)
+        self._pool.submit(self._run, job, blocks_factory, cache_key)
+        return job
+
+    def _run(self, job, blocks_factory, cache_key):
+        try:
+            job._run(blocks_factory, cache_key)
+        finally:
+            self.budget.release(job.cost)
+
+    def restore(self, cache_key, width=6):
+        """이미 끝난 결과가 캐시나 저장소에 있으면 완료된 Job으로 (없으면 None)
+
+        세션에 작업이 없을 때(새 탭, 서버 재시작) 같은 입력의 결과를 다시 보여 줄 때 쓴다.
+        """
+        job = Job(width, recorder=metrics.NULL_RECORDER)
+        return job if self._load(job, cache_key) else None
+
+    def _load(self, job, cache_key):
+        with job.metrics.stage("cache") as stage:
+            hit = result_cache.get(cache_key)
+            stage.set(hit=hit is not None)
+            if hit is None:
+                hit = result_store.get(cache_key)
+                stage.set(stored=hit is not None)
+                if hit is not None:
+                    result_cache.put(cache_key, hit)
+        if hit is None:
+            return False
+        job.result = hit
+        job.status = DONE
+        job.started = job.finished = time.perf_counter()
+        job.metrics.finish(status=DONE, rows=len(hit))
+        return True
+
+
+job_runner = JobRunner()
@@ -0,0 +1,304 @@
+"""칸마다 최대 2개씩 써서 6개 조합을 만드는 엔진 (app3)
+
+입력 숫자 전체에서 6개를 고르되, 각 칸의 숫자는 최대 2개까지만 쓰는 조합을 찾는다.
+조합 번호 블록을 numpy로 한꺼번에 검사하고, 다항식 곱으로 개수를 세며, 칸 하나가
+바뀌면 그 칸의 인수만 다시 계산한다.
+"""
+import itertools
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from lotto import FILTER_NUMBERS, parallel
+from lotto.results import ComboArray, LazyCombos
+
+# 한 번에 검사할 조합 수 (블록 메모리 상한)
+BLOCK_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=4)
+def _tail_table(n):
+    """range(n)에서 뽑은 4개 조합 전체 (사전순, 첫 원소 기준 시작 위치 포함)"""
+    flat = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(n), 4)), dtype=np.uint8)
+    table = flat.reshape(-1, 4)
+    starts = np.searchsorted(table[:, 0], np.arange(n + 1))
+    return table, starts
+
+
+def _prefixes(n):
+    """앞 두 자리 (a, b) 목록 (사전순)"""
+    return [(a, b) for a in range(n - 5) for b in range(a + 1, n - 4)]
+
+
+def _iter_index_blocks(n, block_size=BLOCK_SIZE, prefixes=None):
+    """C(n,6) 조합 인덱스를 사전순으로, 최대 block_size행 블록으로 생성
+
+    앞 두 자리 (a, b)만 파이썬에서 돌고, 나머지 네 자리는 b보다 큰 원소로
+    시작하는 4개 조합 테이블 구간을 그대로 붙인다.
+    prefixes가 주어지면 그 (a, b) 접두사들만 생성한다.
+    """
+    if n < 6:
+        return
+    table, starts = _tail_table(n)
+    for a, b in (_prefixes(n) if prefixes is None else prefixes):
+        rest = table[starts[b + 1]:]
+        for offset in range(0, len(rest), block_size):
+            chunk = rest[offset:offset + block_size]
+            idx = np.empty((len(chunk), 6), dtype=np.intp)
+            idx[:, 0] = a
+            idx[:, 1] = b
+            idx[:, 2:] = chunk
+            yield idx
+
+
+def _live_prefixes(numbers, prefixes, constraints):
+    """제약을 만족할 수 없는 앞 두 자리 (a, b) 접두사를 걸러냄 (numbers는 정렬된 입력 숫자)
+
+    나머지 네 자리는 b 뒤의 숫자에서만 나오므로 b마다 그 숫자들을 pool로 검사기를
+    컴파일해 합계 같은 경계를 좁힌다.
+    """
+    checkers = {}
+    live = []
+    for a, b in prefixes:
+        if b not in checkers:
+            checkers[b] = constraints.compile(numbers, pool=numbers[b + 1:])
+        checker = checkers[b]
+        if checker.push(checker.start, checker.delta((numbers[a], numbers[b]))) is not None:
+            live.append((a, b))
+    return live
+
+
+def iter_valid_blocks(inputs, max_filter=6, block_size=BLOCK_SIZE, stats=None, prefixes=None, constraints=None):
+    """칸별 최대 2개 조건을 만족하는 조합을 NumPy 블록 단위로 생성
+
+    숫자×칸 멤버십 행렬을 한 번 만들고 각 칸을 int64의 바이트 필드 하나로 묶는다
+    (7번째 바이트는 FILTER_NUMBERS 여부). 조합 인덱스 블록과 이 행렬의 곱, 즉 행마다
+    여섯 숫자의 코드를 더하면 칸별 개수가 한 번에 나온다. 필드 값이 한도를 넘으면
+    바이트의 최상위 비트가 서도록 오프셋을 더해 두 제한을 하나의 마스크로 검사한다.
+    조합은 정렬된 숫자에서 사전순으로 나오므로 각 행은 이미 오름차순이다.
+    stats가 주어지면 stats["nodes"]에 검사한 조합 수를 누적한다.
+    prefixes는 _iter_index_blocks와 같다 (병렬 샤드용).
+    constraints(Constraints)가 주어지면 만족할 수 없는 접두사는 통째로 건너뛰고,
+    남은 블록은 벡터 검사(mask)로 거른다. 필터 숫자 규칙은 max_filter로 접어 넣는다.
+    """
+    all_numbers = sorted(set().union(*inputs))
+    if constraints is not None:
+        max_filter, constraints = constraints.fold_filter(max_filter)
+    if constraints is not None:
+        prefixes = _live_prefixes(all_numbers, _prefixes(len(all_numbers)) if prefixes is None else prefixes,
+                                  constraints)
+    numbers = np.array(all_numbers, dtype=np.int64)
+    input_sets = [set(col) for col in inputs]
+    membership = np.array(
+        [[num in s for s in input_sets] + [num in FILTER_NUMBERS] for num in all_numbers],
+        dtype=np.int64,
+    ).reshape(-1, 7)
+    shifts = np.arange(7, dtype=np.int64) * 8
+    codes = membership @ (1 << shifts)
+    # 필드 값 v가 한도 limit를 넘으면 v + (127 - limit) >= 128
+    limits = np.array([2] * 6 + [max_filter], dtype=np.int64)
+    offset = int(((127 - limits) << shifts).sum())
+    overflow = int((np.int64(0x80) << shifts).sum())
+
+    for idx in _iter_index_blocks(len(all_numbers), block_size, prefixes):
+        totals = codes[idx].sum(axis=1)
+        valid = ((totals + offset) & overflow) == 0
+        if stats is not None:
+            stats["nodes"] += len(idx)
+        rows = numbers[idx[valid]]
+        if constraints is not None:
+            rows = rows[constraints.mask(rows, ordered=True)]
+        yield rows
+
+
+def _scan_shard(inputs, max_filter, prefixes, constraints=None):
+    """접두사 묶음 하나를 검사 (작업 프로세스에서 실행)"""
+    stats = {"nodes": 0}
+    blocks = iter_valid_blocks(inputs, max_filter, stats=stats, prefixes=prefixes, constraints=constraints)
+    return ComboArray.from_blocks(blocks).data, stats["nodes"]
+
+
+def iter_valid_blocks_parallel(inputs, max_filter=6, stats=None, constraints=None):
+    """앞 두 자리 접두사 구간별로 나눠 여러 프로세스에서 검사
+
+    접두사 (a, b)마다 검사할 조합은 C(n-b-1, 4)개이므로 이 값으로 구간 크기를
+    맞춘다. 샤드 결과를 접두사 순서대로 이어 붙여 직렬 결과와 순서가 같다.
+    constraints가 있으면 만족할 수 없는 접두사를 먼저 걸러낸 뒤 나눈다.
+    """
+    all_numbers = sorted(set().union(*inputs))
+    n = len(all_numbers)
+    prefixes = _prefixes(n) if n >= 6 else []
+    if constraints is not None:
+        prefixes = _live_prefixes(all_numbers, prefixes, constraints)
+    weights = [math.comb(n - b - 1, 4) for _, b in prefixes]
+    shards = parallel.balanced_ranges(weights, parallel.shard_count())
+    yield from parallel.run_shards(
+        _scan_shard, [(inputs, max_filter, prefixes[start:stop], constraints) for start, stop in shards], stats
+    )
+
+
+def _collect(inputs, max_filter, use_parallel=False, constraints=None):
+    scan = iter_valid_blocks_parallel if use_parallel else iter_valid_blocks
+    return ComboArray.from_blocks(scan(inputs, max_filter, constraints=constraints))
+
+
+# 칸별 개수 상태 (칸마다 0~2개 → 3진수 6자리)
+_STATE_DIGITS = 3 ** np.arange(6)
+
+
+@lru_cache(maxsize=None)
+def _shift_index(sig):
+    """서명 sig인 숫자를 하나 더 고를 때의 칸별 개수 상태 이동 (src, dst)
+
+    서명에 속한 칸 중 하나라도 이미 2개인 상태는 옮겨갈 곳이 없어 빠진다.
+    """
+    states = np.arange(3 ** 6)
+    digits = (states[:, None] // _STATE_DIGITS) % 3
+    cols = np.array([sig >> c & 1 for c in range(6)])
+    src = states[(digits + cols < 3).all(axis=1)]
+    return src, src + int(cols @ _STATE_DIGITS)
+
+
+class IncrementalCounter:
+    """칸이 바뀔 때 바뀐 숫자만 다시 반영하는 조합 수 계산기
+
+    숫자마다 (1 + t·x^서명·y^필터여부) 인수를 곱한 다항식을 들고 있다. t는 고른 개수,
+    x_c는 칸 c에서 고른 개수(2를 넘는 항은 버림), y는 필터 숫자 개수를 센다.
+    t^6 항의 계수 합이 조합 수이고 y 차수별로 나누면 필터 개수별 조합 수가 된다.
+    인수의 상수항이 1이라 나눗셈도 되므로, 칸 하나가 바뀌면 그 칸의 이전/이후
+    숫자 집합의 대칭차에 속한 숫자만 옛 인수로 나누고 새 인수를 곱한다.
+    상태는 (7, 3^6, 7) 크기의 정수 배열 하나다.
+    """
+
+    def __init__(self):
+        self.columns = [()] * 6
+        self.signatures = {}
+        self.poly = np.zeros((7, 3 ** 6, 7), dtype=np.int64)
+        self.poly[0, 0, 0] = 1
+
+    def _multiply(self, num, sig):
+        f = 1 if num in FILTER_NUMBERS else 0
+        src, dst = _shift_index(sig)
+        # 우변은 갱신 전 값의 복사본
+        self.poly[1:, dst, f:] += self.poly[:-1, src, :7 - f]
+
+    def _divide(self, num, sig):
+        f = 1 if num in FILTER_NUMBERS else 0
+        src, dst = _shift_index(sig)
+        # 낮은 차수부터 풀면 poly[t-1]은 이미 나눈 결과
+        for t in range(1, 7):
+            self.poly[t, dst, f:] -= self.poly[t - 1, src, :7 - f]
+
+    def update(self, inputs):
+        """입력과 비교해 바뀐 칸만 반영하고 바뀐 칸 번호 목록을 돌려줌"""
+        changed = []
+        for j, col in enumerate(inputs):
+            col = tuple(col)
+            if col == self.columns[j]:
+                continue
+            flipped = set(self.columns[j]) ^ set(col)
+            self.columns[j] = col
+            changed.append(j)
+            for num in flipped:
+                sig = self.signatures.pop(num, 0)
+                if sig:
+                    self._divide(num, sig)
+                sig ^= 1 << j
+                if sig:
+                    self._multiply(num, sig)
+                    self.signatures[num] = sig
+        return changed
+
+    def count(self, by_filter=False):
+        per_filter = self.poly[6].sum(axis=0).tolist()
+        if by_filter:
+            return {f: n for f, n in enumerate(per_filter) if n}
+        return sum(per_filter)
+
+
+def calc_unique_combinations(inputs, by_filter=False):
+    """칸별 최대 2개 조건을 만족하는 6개 조합 수 계산 (C(n,6) 열거 없음)
+
+    조건에 영향을 주는 것은 숫자마다 "어느 칸에 들어 있는가"(서명)뿐이므로
+    IncrementalCounter의 다항식으로 센다.
+    by_filter=True이면 {사용한 FILTER_NUMBERS 개수: 조합 수}를 돌려준다.
+    """
+    counter = IncrementalCounter()
+    counter.update(inputs)
+    return counter.count(by_filter)
+
+
+def _rank_table(inputs, max_filter):
+    """사전순 순위 계산용 표
+
+    table[p, r, c, g]: 정렬된 숫자 numbers[p:]에서 r개를 더 골라, 칸별 개수 상태 c
+    (3진수)와 지금까지 쓴 필터 숫자 g개에서 출발해 조건을 만족하며 완성하는 방법 수.
+    뒤에서부터 숫자 하나씩 "안 고름 + 고름(상태 이동)"으로 채운다.
+    필터 제한이 없으면(max_filter >= 6) 필터 차원은 1칸으로 줄인다.
+    next_state[p][c]는 숫자 p를 고른 뒤의 상태 (불가능하면 -1)이다.
+    """
+    numbers = sorted(set().union(*inputs))
+    n = len(numbers)
+    width = max_filter + 1 if max_filter < 6 else 1
+    flags = [int(width > 1 and num in FILTER_NUMBERS) for num in numbers]
+    table = np.zeros((n + 1, 7, 3 ** 6, width), dtype=np.int64)
+    table[n, 0] = 1
+    next_state = []
+    for p in range(n - 1, -1, -1):
+        sig = sum(1 << col_idx for col_idx, col in enumerate(inputs) if numbers[p] in col)
+        src, dst = _shift_index(sig)
+        nxt = np.full(3 ** 6, -1, dtype=np.int64)
+        nxt[src] = dst
+        next_state.append(nxt.tolist())
+        f = flags[p]
+        table[p] = table[p + 1]
+        if f < width:
+            table[p, 1:, src, :width - f] += table[p + 1, :-1, dst, f:]
+    next_state.reverse()
+    return numbers, flags, next_state, table
+
+
+def _iter_ranked(rank_table, start):
+    """사전순으로 start번째 유효 조합부터 차례로 생성
+
+    각 자리에서 숫자를 고를 때마다 완성 방법 수를 표에서 읽어, 건너뛸 구간은
+    통째로 건너뛴다. 시작 위치를 찾는 비용은 6 × 숫자 개수이다.
+    """
+    numbers, flags, next_state, table = rank_table
+    n = len(numbers)
+    width = table.shape[3]
+
+    def walk(p, r, state, g, prefix, skip):
+        if r == 0:
+            yield prefix
+            return
+        for q in range(p, n - r + 1):
+            new_state = next_state[q][state]
+            new_g = g + flags[q]
+            if new_state < 0 or new_g >= width:
+                continue
+            count = int(table[q + 1, r - 1, new_state, new_g])
+            if skip >= count:
+                skip -= count
+                continue
+            yield from walk(q + 1, r - 1, new_state, new_g, prefix + (numbers[q],), skip)
+            skip = 0
+
+    yield from walk(0, 6, 0, 0, (), start)
+
+
+def lazy_combinations(inputs, max_filter=6):
+    """결과를 만들지 않는 페이지용 뷰 (정확한 개수 + 사전순 순위 접근)"""
+    rank_table = _rank_table(inputs, max_filter)
+    table = rank_table[3]
+    return LazyCombos(int(table[0, 6, 0, 0]), lambda start: _iter_ranked(rank_table, start), nbytes=table.nbytes)
+
+
+def generate_filtered_combinations(inputs, sort_each, use_parallel=False, constraints=None):
+    # 블록 엔진의 행은 이미 오름차순이므로 sort_each와 관계없이 결과가 같다
+    return _collect(inputs, max_filter=1, use_parallel=use_parallel, constraints=constraints)
+
+
+def generate_unfiltered_combinations(inputs, sort_each, use_parallel=False, constraints=None):
+    return _collect(inputs, max_filter=6, use_parallel=use_parallel, constraints=constraints)
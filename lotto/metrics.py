@@ -0,0 +1,180 @@
+"""단계별 시간/메모리 측정
+
+생성 요청 하나를 Recorder 하나로 기록한다. 단계(열거, DataFrame 생성, 포맷팅,
+내보내기 등)마다 걸린 시간, 최대 메모리, 행 수를 모으고, 요청이 끝나면 JSON 한 줄로
+로그를 남기며 최근 기록을 사이드바 패널에서 볼 수 있게 보관한다.
+
+Streamlit 스크립트 실행마다 start()로 현재 스레드의 기록기를 정하면, 그 안에서 부르는
+stage()는 어디서 부르든 그 기록기에 기록된다. 백그라운드 작업은 recorder()로 따로
+기록기를 만들며, 만든 스레드의 기록기와 같은 측정 여부와 보관 위치(세션별 최근 기록)를
+따른다. 측정이 꺼져 있으면 아무 일도 하지 않는 공용 기록기를 돌려주므로 비용은 함수
+호출 몇 번뿐이다.
+
+측정 여부는 기록기마다 정하므로 한 세션이 켜도 다른 세션에는 영향이 없다. 메모리
+추적(tracemalloc)은 프로세스 전체의 할당을 느리게 하고 최대 메모리에 동시에 실행 중인
+다른 요청의 할당도 섞이므로, 서버를 시작할 때 환경 변수로만 켠다.
+
+    LOTTO_METRICS=1            기록기의 기본값을 측정으로 (세션에서 따로 정하지 않을 때)
+    LOTTO_METRICS_MEMORY=1     시작할 때부터 tracemalloc으로 단계별 최대 메모리도 기록
+    LOTTO_METRICS_LOG=경로      JSON 로그를 파일에 기록 (기본은 표준 오류)
+"""
+import contextlib
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# 사이드바에 보여줄 최근 요청 수
+RECENT_LIMIT = 50
+
+logger = logging.getLogger("lotto.metrics")
+if not logger.handlers:
+    _handler = logging.FileHandler(os.environ["LOTTO_METRICS_LOG"]) if os.environ.get("LOTTO_METRICS_LOG") \
+        else logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_enabled = os.environ.get("LOTTO_METRICS", "") not in ("", "0")
+_local = threading.local()
+
+
+def enabled():
+    """기록기의 기본 측정 여부 (LOTTO_METRICS)"""
+    return _enabled
+
+
+def new_recent():
+    """세션별 최근 기록 보관함 (오래된 것부터, RECENT_LIMIT개까지)"""
+    return deque(maxlen=RECENT_LIMIT)
+
+
+class Stage:
+    """단계 하나의 측정값 (set()으로 행 수 등 추가 정보를 붙임)"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.seconds = None
+        self.peak_bytes = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def as_dict(self):
+        return {"name": self.name, "seconds": round(self.seconds, 6), "peak_bytes": self.peak_bytes, **self.fields}
+
+
+class Recorder:
+    """생성 요청 하나의 단계별 측정 기록 (recent가 있으면 끝난 기록을 거기에 보관)"""
+
+    def __init__(self, name, recent=None, **fields):
+        self.name = name
+        self.recent = recent
+        self.fields = fields
+        self.stages = []
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        stage = Stage(name, fields)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - start
+            if tracing and tracemalloc.is_tracing():
+                stage.peak_bytes = tracemalloc.get_traced_memory()[1]
+            self.stages.append(stage)
+
+    def finish(self, **fields):
+        """기록을 마치고 JSON 로그 한 줄을 남김 (단계가 없으면 남기지 않음)"""
+        if getattr(_local, "recorder", None) is self:
+            _local.recorder = None
+        if not self.stages:
+            return None
+        record = {
+            "request": self.name,
+            "at": self.started_at,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            **self.fields,
+            **fields,
+            "stages": [stage.as_dict() for stage in self.stages],
+        }
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+        if self.recent is not None:
+            self.recent.append(record)
+        return record
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def set(self, **fields):
+        pass
+
+
+class _NullRecorder:
+    """측정이 꺼져 있을 때 쓰는 기록기 (아무것도 하지 않음)"""
+
+    _context = contextlib.nullcontext(_NullStage())
+    recent = None
+
+    def stage(self, name, **fields):
+        return self._context
+
+    def finish(self, **fields):
+        return None
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def current():
+    """현재 스레드의 기록기 (없으면 None)"""
+    return getattr(_local, "recorder", None)
+
+
+def recorder(name, enabled=None, recent=None, like=None, **fields):
+    """새 기록기 (측정하지 않으면 NULL_RECORDER)
+
+    enabled/recent를 주지 않으면 like(기록기, 기본은 현재 스레드의 기록기)를 따르고,
+    like도 없으면 프로세스 기본값(LOTTO_METRICS)으로 측정하되 최근 기록은 남기지 않는다.
+    """
+    if like is None:
+        like = current()
+    if enabled is None:
+        enabled = _enabled if like is None else like is not NULL_RECORDER
+    if recent is None and like is not None:
+        recent = like.recent
+    return Recorder(name, recent, **fields) if enabled else NULL_RECORDER
+
+
+def start(name, enabled=None, recent=None, like=None, **fields):
+    """현재 스레드의 기록기를 새로 정함 (스크립트 실행 시작 시 호출, 인자는 recorder와 같음)"""
+    _local.recorder = None
+    _local.recorder = recorder(name, enabled, recent, like, **fields)
+    return _local.recorder
+
+
+def stage(name, **fields):
+    """현재 스레드 기록기의 단계 측정 컨텍스트"""
+    return (getattr(_local, "recorder", None) or NULL_RECORDER).stage(name, **fields)
+
+
+def finish(**fields):
+    """현재 스레드 기록기를 마침"""
+    return (getattr(_local, "recorder", None) or NULL_RECORDER).finish(**fields)
+
+
+if os.environ.get("LOTTO_METRICS_MEMORY", "") not in ("", "0"):
+    tracemalloc.start()
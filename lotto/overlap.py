@@ -0,0 +1,187 @@
+"""칸별 6개 조합의 중복 분석 엔진 (app5)
+
+칸마다 독립적으로 C(n,6) 조합을 만들 때 여러 칸에서 함께 나오는 조합과 등장 횟수를
+구한다. 전체 조합 목록을 만들지 않고 두 칸 이상에 속한 숫자만 서명별로 묶어 조합한다.
+"""
+import itertools
+import math
+from collections import Counter
+
+import numpy as np
+
+from lotto import analytics, export
+
+RESULT_COLUMNS = ['번호1', '번호2', '번호3', '번호4', '번호5', '번호6', '등장횟수']
+
+
+# 중복 분석에서 한 번에 검사할 부분집합 수
+DUPLICATE_BLOCK_SIZE = 1 << 16
+
+
+def make_combinations_per_column(inputs):
+    """각 칸(6개)의 숫자들로 각각 6개 조합을 만들고 모두 합침"""
+    if len(inputs) != 6:
+        return []
+    
+    all_combos = []
+    
+    # 각 칸마다 독립적으로 6개 조합 생성
+    for col_idx, numbers in enumerate(inputs):
+        if len(numbers) < 6:
+            continue  # 6개 미만이면 해당 칸 스킵
+        
+        # 해당 칸의 숫자들로 C(n,6) 조합 생성
+        combos_from_col = [tuple(sorted(combo)) for combo in itertools.combinations(numbers, 6)]
+        all_combos.extend(combos_from_col)
+    
+    return all_combos
+
+
+def find_duplicates(combos):
+    """조합 리스트에서 중복된 조합 찾기"""
+    counter = Counter(combos)
+    
+    # 2개 이상 등장한 조합만 필터링
+    duplicates = [(combo, count) for combo, count in counter.items() if count >= 2]
+    
+    return duplicates, counter
+
+
+def count_combinations_per_column(inputs):
+    """칸별 C(n,6) 조합 수 (6개 미만인 칸은 0)"""
+    return [math.comb(len(numbers), 6) if len(numbers) >= 6 else 0 for numbers in inputs]
+
+
+def _signature_groups(inputs):
+    """두 칸 이상에 속한 숫자를 속한 칸 비트마스크(서명)별로 묶음 [(서명, 정렬된 숫자 배열), ...]
+
+    6개 미만인 칸은 조합을 만들지 않으므로 서명에서 뺀다.
+    """
+    signatures = {}
+    for col_idx, numbers in enumerate(inputs):
+        if len(numbers) < 6:
+            continue
+        for num in set(numbers):
+            signatures[num] = signatures.get(num, 0) | (1 << col_idx)
+    groups = {}
+    for num, mask in signatures.items():
+        if mask.bit_count() >= 2:
+            groups.setdefault(mask, []).append(num)
+    return [(mask, np.array(sorted(nums), dtype=np.int64)) for mask, nums in sorted(groups.items())]
+
+
+def _iter_signature_picks(groups, size=6):
+    """서명 묶음마다 몇 개씩 뽑을지 [(묶음 번호, 개수), ...]와 공통 칸 마스크를 생성
+
+    뽑은 숫자들의 서명 AND가 조합을 포함하는 칸이므로, AND의 비트가 2개 미만이 되는
+    가지는 더 보지 않는다. 같은 6개 조합은 정확히 한 가지 뽑기에서만 나온다.
+    """
+    remaining = [0] * (len(groups) + 1)
+    for g in range(len(groups) - 1, -1, -1):
+        remaining[g] = remaining[g + 1] + len(groups[g][1])
+    picks = []
+
+    def visit(start, left, mask):
+        if left == 0:
+            yield list(picks), mask
+            return
+        if remaining[start] < left:
+            return
+        for g in range(start, len(groups)):
+            common = mask & groups[g][0]
+            if common.bit_count() < 2:
+                continue
+            for k in range(min(left, len(groups[g][1])), 0, -1):
+                picks.append((g, k))
+                yield from visit(g + 1, left - k, common)
+                picks.pop()
+
+    yield from visit(0, size, -1)
+
+
+def iter_duplicate_blocks(inputs, block_size=DUPLICATE_BLOCK_SIZE, stats=None):
+    """중복 조합과 등장 횟수를 (번호 6개 + 등장횟수) 배열 블록으로 생성
+
+    6개 조합은 그 조합을 포함하는 칸의 수만큼 등장하고, 그 칸들은 여섯 숫자의 서명
+    (속한 칸 비트마스크) AND다. 숫자를 서명별로 묶어 묶음마다 몇 개씩 뽑을지를 고르고
+    (공통 칸이 2개 미만이 되면 가지치기), 뽑기마다 묶음별 부분집합의 곱을 NumPy로
+    한꺼번에 만든다. 중복 조합 하나를 정확히 한 번만 만들며, 행 안의 숫자는 오름차순이다.
+    최대 block_size행씩 내보내고 stats["nodes"]에 만든 행 수를 누적한다.
+    """
+    if stats is None:
+        stats = {"nodes": 0}
+    groups = _signature_groups(inputs)
+    subsets = {}
+    pending = []
+    pending_rows = 0
+    for picks, mask in _iter_signature_picks(groups):
+        parts = []
+        for g, k in picks:
+            if (g, k) not in subsets:
+                flat = np.fromiter(itertools.chain.from_iterable(itertools.combinations(groups[g][1], k)),
+                                   dtype=np.int64)
+                subsets[g, k] = flat.reshape(-1, k)
+            parts.append(subsets[g, k])
+        shape = tuple(len(part) for part in parts)
+        total = math.prod(shape)
+        count = mask.bit_count()
+        for lo in range(0, total, block_size):
+            index = np.unravel_index(np.arange(lo, min(lo + block_size, total)), shape)
+            block = np.empty((len(index[0]), 7), dtype=np.int64)
+            block[:, :6] = np.sort(np.hstack([part[i] for part, i in zip(parts, index)]), axis=1)
+            block[:, 6] = count
+            pending.append(block)
+            pending_rows += len(block)
+            stats["nodes"] += len(block)
+            if pending_rows >= block_size:
+                yield np.concatenate(pending)
+                pending = []
+                pending_rows = 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def analyze_duplicates(inputs):
+    """중복 조합 목록 [(조합, 등장횟수), ...]"""
+    return [(tuple(row[:6].tolist()), int(row[6])) for block in iter_duplicate_blocks(inputs) for row in block]
+
+
+def iter_combination_blocks(inputs, chunk_rows=export.CHUNK_ROWS):
+    """make_combinations_per_column과 같은 순서로 (번호 6개 + 등장횟수) 블록 생성
+
+    등장횟수는 조합의 여섯 숫자가 공통으로 속한 칸 수이므로, 숫자별 칸 비트마스크를
+    블록 단위로 AND 한 뒤 비트 수를 세어 구한다. 전체 목록을 만들지 않는다.
+    """
+    col_sets = [set(numbers) if len(numbers) >= 6 else set() for numbers in inputs]
+    all_numbers = np.array(sorted(set().union(*col_sets)), dtype=np.int64)
+    if not len(all_numbers):
+        return
+    # 숫자 크기가 아니라 입력 숫자 수만큼의 표 (숫자는 정렬된 목록에서 위치로 찾음)
+    lookup = np.zeros(len(all_numbers), dtype=np.int64)
+    for col_idx, numbers in enumerate(col_sets):
+        for num in numbers:
+            lookup[np.searchsorted(all_numbers, num)] |= 1 << col_idx
+    popcount = np.array([bin(mask).count("1") for mask in range(1 << len(inputs))], dtype=np.int64)
+
+    for numbers in inputs:
+        if len(numbers) < 6:
+            continue
+        combos = itertools.combinations(sorted(numbers), 6)
+        while True:
+            flat = np.fromiter(
+                itertools.chain.from_iterable(itertools.islice(combos, chunk_rows)),
+                dtype=np.int64,
+            )
+            if flat.size == 0:
+                break
+            block = flat.reshape(-1, 6)
+            counts = popcount[np.bitwise_and.reduce(lookup[np.searchsorted(all_numbers, block)], axis=1)]
+            yield np.column_stack([block, counts])
+
+
+def summarize_combinations(inputs):
+    """칸별 조합 전체(중복 포함, find_duplicates의 counter와 같은 기준)를 블록 단위로 분석"""
+    summary = analytics.Summary(set().union(*inputs))
+    for block in iter_combination_blocks(inputs):
+        summary.add(block[:, :6])
+    return summary
@@ -0,0 +1,90 @@
+"""멀티코어 병렬 열거
+
+탐색 공간을 서로 겹치지 않는 샤드(첫 칸 후보 구간, 조합 접두사 구간, 곱의 위치
+구간 등)로 나눠 프로세스 풀에서 실행한다. 샤드 함수는 모듈 최상위 함수여야 하며
+(결과 블록, 방문 노드 수)를 돌려준다. 결과는 샤드 순서대로 내보내므로 직렬 실행과
+같은 순서, 같은 개수가 나온다. 동시에 맡기는 샤드 수를 제한해 완료됐지만 아직
+내보내지 않은 결과가 메모리에 쌓이지 않게 한다.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 병렬 실행에 쓸 프로세스 수
+PROCESSES = int(os.environ.get("LOTTO_PROCESSES", os.cpu_count() or 1))
+# 프로세스당 샤드 수 (작업량이 고르지 않은 샤드를 골고루 나누기 위함)
+SHARDS_PER_PROCESS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """프로세스 풀 (처음 사용할 때 생성, 프로세스 전역 공유)
+
+    Streamlit 서버는 여러 스레드를 쓰므로 fork 대신 spawn으로 작업 프로세스를 띄운다.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def shard_count():
+    return PROCESSES * SHARDS_PER_PROCESS
+
+
+def balanced_ranges(weights, n_shards):
+    """연속 구간 [start, stop) 목록 (구간별 가중치 합이 비슷하도록)"""
+    total = sum(weights)
+    if not weights or total == 0:
+        return [(0, len(weights))] if weights else []
+    target = total / n_shards
+    ranges = []
+    start = 0
+    acc = 0
+    for i, w in enumerate(weights):
+        acc += w
+        if acc >= target * (len(ranges) + 1) and i + 1 < len(weights):
+            ranges.append((start, i + 1))
+            start = i + 1
+    ranges.append((start, len(weights)))
+    return ranges
+
+
+def run_shards(fn, shard_args, stats=None, window=None):
+    """fn(*args)를 샤드마다 프로세스 풀에서 실행하고 결과 블록을 샤드 순서대로 yield
+
+    stats가 주어지면 샤드가 돌려준 방문 노드 수를 stats["nodes"]에 누적한다.
+    소비가 중단되면(작업 취소 등) 아직 시작하지 않은 샤드는 취소한다.
+    """
+    pool = get_pool()
+    window = window or 2 * PROCESSES
+    args_iter = iter(shard_args)
+    pending = deque(pool.submit(fn, *args) for args in itertools.islice(args_iter, window))
+    try:
+        while pending:
+            try:
+                block, nodes = pending.popleft().result()
+            except BrokenProcessPool:
+                _reset_pool()
+                raise
+            for args in itertools.islice(args_iter, 1):
+                pending.append(pool.submit(fn, *args))
+            if stats is not None:
+                stats["nodes"] += nodes
+            yield block
+    finally:
+        for future in pending:
+            future.cancel()
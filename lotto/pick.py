@@ -0,0 +1,331 @@
+"""칸마다 1~2개씩 골라 6개 조합을 만드는 엔진 (app2)
+
+칸 순서대로 각 칸에서 숫자 1개 또는 2개를 골라, 겹치는 숫자 없이 모두 6개가 되는
+조합을 찾는다. 비트마스크 백트래킹 커널로 결과를 블록 단위로 생성하고, 뒤쪽 칸
+메모이제이션으로 개수와 순위 접근(페이지)을 제공한다.
+"""
+import itertools
+import math
+from collections import Counter
+from functools import lru_cache
+
+from lotto import FILTER_NUMBERS, parallel
+from lotto.results import ComboArray, LazyCombos
+
+# 결과 배열에 한 번에 붙일 행 수
+BLOCK_SIZE = 1 << 16
+# 결과가 없어도 이 노드 수마다 블록을 내보냄 (진행 상황/취소 확인용)
+FLUSH_NODES = 1 << 15
+
+
+def _build_tables(inputs):
+    """탐색 커널용 테이블 생성
+
+    입력에 나온 숫자마다 비트 하나를 배정하고, 칸별 1개/2개 후보를
+    (비트마스크, 숫자 튜플, 필터 숫자 개수) 목록으로 한 번만 만들어 둔다.
+    """
+    numbers = sorted(set().union(*inputs))
+    bit = {num: 1 << i for i, num in enumerate(numbers)}
+    filter_mask = sum(bit[num] for num in FILTER_NUMBERS if num in bit)
+
+    candidates = []
+    for col in inputs:
+        per_size = {}
+        for size in [1, 2]:
+            per_size[size] = []
+            for combo in itertools.combinations(col, size):
+                mask = sum(bit[num] for num in combo)
+                per_size[size].append((mask, combo, (mask & filter_mask).bit_count()))
+        candidates.append(per_size)
+    return candidates
+
+
+def iter_search_blocks(inputs, max_filter=6, stats=None, first=None, constraints=None):
+    """비트마스크 백트래킹 커널
+
+    사용한 숫자를 정수 비트마스크로 들고 다니므로 충돌 검사는 AND 한 번,
+    필터 숫자 개수는 후보 테이블에 미리 계산된 값을 더하기만 하면 된다.
+    마지막 칸은 필요한 크기가 정해지므로 후보 목록을 한 번에 걸러 붙인다.
+    결과는 최대 BLOCK_SIZE행의 튜플 목록 블록으로 yield 한다. 결과가 적게 나오는
+    구간에서도 FLUSH_NODES 노드마다 한 번은 제어를 돌려줘 진행 상황 갱신과
+    취소 확인이 가능하다. stats["nodes"]에 방문한 노드 수를 누적한다.
+    first=(start, stop)이면 첫 칸 후보(1개 후보 다음 2개 후보 순) 중 그 구간만 탐색한다.
+    constraints(Constraints)가 주어지면 후보를 고를 때마다 점진 검사해 만족할 수 없는
+    가지를 잘라낸다. 필터 숫자 규칙은 max_filter로 접어 넣는다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return
+    if stats is None:
+        stats = {"nodes": 0}
+    candidates = _build_tables(inputs)
+    if first is not None:
+        chosen = _first_choices(candidates)[first[0]:first[1]]
+        candidates[0] = {size: [cand for s, cand in chosen if s == size] for size in [1, 2]}
+    if constraints is not None:
+        max_filter, constraints = constraints.fold_filter(max_filter)
+    pushes, start_state = None, None
+    # 후보마다 제약 상태에 더할 값 (제약이 없으면 None)
+    deltas = [{size: [None] * len(per_size[size]) for size in [1, 2]} for per_size in candidates]
+    if constraints is not None:
+        numbers = set().union(*inputs)
+        # 칸 c에서 고른 뒤 남은 숫자는 c+1번째 칸부터만 나오므로 칸마다 경계를 좁힌 검사기
+        pushes = [constraints.compile(numbers, set().union(*inputs[c + 1:])).push for c in range(6)]
+        checker = constraints.compile(numbers)
+        start_state = checker.start
+        deltas = [{size: [checker.delta(combo) for _, combo, _ in per_size[size]] for size in [1, 2]}
+                  for per_size in candidates]
+    pending = []
+    flushed_at = [stats["nodes"]]
+
+    def flush():
+        block = pending[:]
+        pending.clear()
+        flushed_at[0] = stats["nodes"]
+        return block
+
+    def fill_last(current_combo, used, current_size, filter_count, state):
+        stats["nodes"] += 1
+        size = 6 - current_size
+        if size not in (1, 2):
+            return
+        if pushes is None:
+            pending.extend([
+                current_combo + combo
+                for mask, combo, hits in candidates[5][size]
+                if not mask & used and filter_count + hits <= max_filter
+            ])
+            return
+        # 여섯 숫자를 다 고른 상태의 검사는 정확하므로 따로 거를 필요가 없음
+        push = pushes[5]
+        pending.extend([
+            current_combo + combo
+            for (mask, combo, hits), delta in zip(candidates[5][size], deltas[5][size])
+            if not mask & used and filter_count + hits <= max_filter and push(state, delta) is not None
+        ])
+
+    def backtrack(col_idx, current_combo, used, current_size, filter_count, state):
+        stats["nodes"] += 1
+        for size in [1, 2]:
+            new_size = current_size + size
+            # 남은 칸마다 최소 1개, 최대 2개를 더 골라야 함
+            if new_size + (5 - col_idx) > 6:
+                continue
+            if new_size + 2 * (5 - col_idx) < 6:
+                continue
+
+            for (mask, combo, hits), delta in zip(candidates[col_idx][size], deltas[col_idx][size]):
+                if mask & used or filter_count + hits > max_filter:
+                    continue
+                new_state = None
+                if pushes is not None:
+                    new_state = pushes[col_idx](state, delta)
+                    if new_state is None:
+                        continue
+                if col_idx == 4:
+                    # 마지막 칸은 제너레이터 없이 바로 채움
+                    fill_last(current_combo + combo, used | mask, new_size, filter_count + hits, new_state)
+                    if len(pending) >= BLOCK_SIZE or stats["nodes"] - flushed_at[0] >= FLUSH_NODES:
+                        yield flush()
+                else:
+                    yield from backtrack(col_idx + 1,
+                                         current_combo + combo,
+                                         used | mask,
+                                         new_size,
+                                         filter_count + hits,
+                                         new_state)
+
+    yield from backtrack(0, (), 0, 0, 0, start_state)
+    yield flush()
+
+
+def _first_choices(candidates):
+    """첫 칸 후보를 탐색 순서대로 펼친 (크기, 후보) 목록"""
+    return [(size, cand) for size in [1, 2] for cand in candidates[0][size]]
+
+
+def _search_shard(inputs, max_filter, start, stop, constraints=None):
+    """첫 칸 후보 [start, stop) 구간 탐색 (작업 프로세스에서 실행)"""
+    stats = {"nodes": 0}
+    rows = ComboArray.from_blocks(iter_search_blocks(inputs, max_filter, stats, (start, stop), constraints))
+    return rows.data, stats["nodes"]
+
+
+def iter_search_blocks_parallel(inputs, max_filter=6, stats=None, constraints=None):
+    """첫 칸 후보 구간별로 나눠 여러 프로세스에서 탐색
+
+    샤드 결과를 첫 칸 후보 순서대로 이어 붙이므로 직렬 커널과 결과 순서가 같다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return
+    n_first = len(_first_choices(_build_tables(inputs)))
+    shards = parallel.balanced_ranges([1] * n_first, parallel.shard_count())
+    yield from parallel.run_shards(
+        _search_shard, [(inputs, max_filter, start, stop, constraints) for start, stop in shards], stats
+    )
+
+
+def _search(inputs, max_filter=6, use_parallel=False, constraints=None):
+    """커널 결과 블록을 ComboArray 하나로 모음"""
+    if use_parallel:
+        return ComboArray.from_blocks(iter_search_blocks_parallel(inputs, max_filter, constraints=constraints))
+    return ComboArray.from_blocks(iter_search_blocks(inputs, max_filter, constraints=constraints))
+
+
+@lru_cache(maxsize=64)
+def _suffix_counter(suffix, max_filter=6, size=6):
+    """뒤쪽 칸들(suffix)만으로 정해지는 개수 함수 count(current_size, used, hits)
+
+    숫자는 "이후 칸 중 어디에 등장하는가"(서명)만 같으면 서로 바꿔도 결과가 같다.
+    그래서 상태를 (지금까지 고른 개수, 사용한 숫자들의 서명 목록, 필터 숫자 개수)로
+    잡고, 첫 칸에서는 서명별 남은 숫자 개수를 곱해서 센다. 서명의 비트 k+1은
+    suffix[k]에 등장한다는 뜻이고 최하위 비트는 필터 숫자 여부다(max_filter < 6일
+    때만 구분). 다음 칸으로 넘길 때 칸 비트를 한 칸씩 민다. 이후 칸에 더 이상 나오지
+    않는 숫자는 상태에서 빠지므로 리프를 하나씩 방문하지 않는다.
+    칸 튜플을 키로 캐시하므로 앞쪽 칸만 바뀌면 뒤쪽 칸들의 메모이제이션 표를 다시 쓴다.
+    size를 주면 6개 대신 size개를 고르는 방법 수를 센다 (앞쪽 칸들의 탐색 노드 수).
+    """
+    if not suffix:
+        return lambda current_size, used, hits: 1 if current_size == size else 0
+
+    next_count = _suffix_counter(suffix[1:], max_filter, size)
+    class_counts = Counter(_signature(num, suffix, max_filter) for num in suffix[0])
+    # 이 칸 뒤에 남은 칸 수
+    remaining = len(suffix) - 1
+
+    def shift(sig):
+        return (sig >> 2) << 1 | (sig & 1)
+
+    @lru_cache(maxsize=None)
+    def count(current_size, used, hits):
+        used_here = Counter(used)
+        avail = [(sig, n - used_here[sig]) for sig, n in class_counts.items() if n > used_here[sig]]
+
+        def advance(*picked):
+            return tuple(sorted(shift(sig) for sig in used + picked if sig >> 2))
+
+        total = 0
+        for picked_size in [1, 2]:
+            new_size = current_size + picked_size
+            # 남은 칸마다 최소 1개, 최대 2개를 더 골라야 함
+            if new_size + remaining > size:
+                continue
+            if new_size + 2 * remaining < size:
+                continue
+
+            for i, (sig_a, n_a) in enumerate(avail):
+                hits_a = hits + (sig_a & 1)
+                if hits_a > max_filter:
+                    continue
+                if picked_size == 1:
+                    total += n_a * next_count(new_size, advance(sig_a), hits_a)
+                    continue
+                if n_a >= 2 and hits_a + (sig_a & 1) <= max_filter:
+                    total += math.comb(n_a, 2) * next_count(new_size, advance(sig_a, sig_a), hits_a + (sig_a & 1))
+                for sig_b, n_b in avail[i + 1:]:
+                    if hits_a + (sig_b & 1) <= max_filter:
+                        total += n_a * n_b * next_count(new_size, advance(sig_a, sig_b), hits_a + (sig_b & 1))
+        return total
+
+    return count
+
+
+def _signature(num, suffix, max_filter):
+    """suffix 기준 숫자 서명 (칸 비트 << 1 | 필터 숫자 여부)"""
+    sig = sum(2 << k for k, col in enumerate(suffix) if num in col)
+    return sig | (max_filter < 6 and num in FILTER_NUMBERS)
+
+
+def calc_unique_combinations(inputs, max_filter=6):
+    """유효 조합 개수만 계산 (칸 suffix별 메모이제이션 DP)
+
+    한 칸만 바뀌면 그보다 뒤쪽 칸들의 개수 함수는 캐시에서 그대로 가져온다.
+    max_filter를 주면 FILTER_NUMBERS를 그 개수 이하로 쓰는 조합만 센다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    return _suffix_counter(tuple(tuple(col) for col in inputs), max_filter)(0, (), 0)
+
+
+def count_search_work(inputs, max_filter=6):
+    """iter_search_blocks가 조건 없이 검사할 후보 수 (결과 수가 아니라 탐색 비용)
+
+    칸 d에 도착하는 노드 수는 앞쪽 d개 칸에서 현재 개수만큼 고르는 방법 수이므로
+    _suffix_counter를 앞쪽 칸들에 써서 세고, 노드마다 그 칸의 후보 목록을 한 번씩
+    훑는다. 추가 조건이 있으면 가지치기로 이보다 적게 검사한다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    columns = tuple(tuple(col) for col in inputs)
+    work = 0
+    for col_idx, col in enumerate(columns):
+        remaining = 5 - col_idx
+        for current_size in range(col_idx, 2 * col_idx + 1):
+            nodes = _suffix_counter(columns[:col_idx], max_filter, current_size)(0, (), 0)
+            if not nodes:
+                continue
+            for size in [1, 2]:
+                new_size = current_size + size
+                if new_size + remaining <= 6 and new_size + 2 * remaining >= 6:
+                    work += nodes * math.comb(len(col), size)
+    return work
+
+
+def _iter_ranked(inputs, max_filter, start):
+    """커널과 같은 순서(백트래킹)로 start번째 조합부터 차례로 생성
+
+    후보마다 남은 칸을 채우는 방법 수를 _suffix_counter로 세어, 건너뛸 하위 트리는
+    방문하지 않고 통째로 건너뛴다. 따라서 시작 위치를 찾는 비용은 칸 수 × 후보 수이고,
+    그 뒤로는 꺼내는 조합 수에 비례한다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return
+    candidates = _build_tables(inputs)
+    suffixes = [tuple(tuple(col) for col in inputs[k:]) for k in range(7)]
+    counters = [_suffix_counter(suffix, max_filter) for suffix in suffixes]
+
+    def completions(col_idx, combo, size, hits):
+        suffix = suffixes[col_idx]
+        used = tuple(sorted(sig for sig in (_signature(num, suffix, max_filter) for num in combo) if sig >> 1))
+        return counters[col_idx](size, used, hits if max_filter < 6 else 0)
+
+    def walk(col_idx, combo, used, current_size, filter_count, skip):
+        for size in [1, 2]:
+            new_size = current_size + size
+            if new_size + (5 - col_idx) > 6:
+                continue
+            if new_size + 2 * (5 - col_idx) < 6:
+                continue
+
+            for mask, picked, hits in candidates[col_idx][size]:
+                if mask & used or filter_count + hits > max_filter:
+                    continue
+                if col_idx == 5:
+                    if skip:
+                        skip -= 1
+                        continue
+                    yield combo + picked
+                    continue
+                n = completions(col_idx + 1, combo + picked, new_size, filter_count + hits)
+                if skip >= n:
+                    skip -= n
+                    continue
+                yield from walk(col_idx + 1, combo + picked, used | mask, new_size, filter_count + hits, skip)
+                skip = 0
+
+    yield from walk(0, (), 0, 0, 0, start)
+
+
+def lazy_combinations(inputs, max_filter=6):
+    """결과를 만들지 않는 페이지용 뷰 (정확한 개수 + 커널 순서의 순위 접근)"""
+    count = calc_unique_combinations(inputs, max_filter)
+    return LazyCombos(count, lambda start: _iter_ranked(inputs, max_filter, start))
+
+
+def generate_unfiltered_combinations(inputs, use_parallel=False, constraints=None):
+    """일반 조합 생성 (비트마스크 커널)"""
+    return _search(inputs, use_parallel=use_parallel, constraints=constraints)
+
+
+def generate_filtered_combinations(inputs, use_parallel=False, constraints=None):
+    """필터 조합 생성 (비트마스크 커널, 필터 숫자 최대 1개)"""
+    return _search(inputs, max_filter=1, use_parallel=use_parallel, constraints=constraints)
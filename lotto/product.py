@@ -0,0 +1,483 @@
+"""칸마다 1개씩 골라 6개 조합을 만드는 엔진 (app4)
+
+여섯 칸에서 숫자를 하나씩 고르는 곱(product) 중 숫자가 겹치지 않는 조합을 다룬다.
+개수는 포함-배제로 세고, 열거와 추출은 곱 위치 번호를 혼합 진법으로 풀어 numpy로
+한꺼번에 검사한다.
+"""
+import math
+from functools import lru_cache, reduce
+from operator import mul
+
+import numpy as np
+
+from lotto import FILTER_NUMBERS, parallel
+from lotto.results import ComboArray
+
+# 크기 k인 블록의 뫼비우스 계수 (-1)^(k-1) * (k-1)!
+_MOBIUS_COEF = {k: (-1) ** (k - 1) * math.factorial(k - 1) for k in range(1, 7)}
+
+
+def calc_unique_combinations(inputs):
+    """중복 없는 조합 수 계산 함수
+
+    칸들을 "같은 숫자를 고른 칸끼리" 묶는 모든 분할에 대해 포함-배제를 적용한다.
+    블록 하나의 경우의 수는 블록에 속한 칸들의 교집합 크기이고, 크기 k인 블록의
+    뫼비우스 계수는 (-1)^(k-1) * (k-1)! 이다. 교집합이 비는 블록은 항이 0이므로
+    그 아래 분할은 탐색하지 않는다. 따라서 비용은 곱의 크기가 아니라 칸 사이의
+    겹침 구조(최대 Bell(6)=203개 분할)에만 좌우된다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    col_sets = [set(col) for col in inputs]
+    total = 0
+
+    def partition(idx, blocks):
+        nonlocal total
+        if idx == len(col_sets):
+            term = 1
+            for inter, size in blocks:
+                term *= len(inter) * _MOBIUS_COEF[size]
+            total += term
+            return
+        current = col_sets[idx]
+        # 기존 블록에 합치기 (교집합이 비면 항이 0이므로 생략)
+        for b, (inter, size) in enumerate(blocks):
+            merged = inter & current
+            if merged:
+                blocks[b] = (merged, size + 1)
+                partition(idx + 1, blocks)
+                blocks[b] = (inter, size)
+        # 새 블록 만들기
+        blocks.append((current, 1))
+        partition(idx + 1, blocks)
+        blocks.pop()
+
+    partition(0, [])
+    return total
+
+
+def calc_filtered_combinations(inputs):
+    """필터(FILTER_NUMBERS 최대 1개)를 만족하는 중복 없는 조합 수 계산 함수
+
+    필터 숫자를 하나도 쓰지 않는 경우와, 칸 j 하나만 필터 숫자를 쓰는 경우로 나눈다.
+    나머지 칸은 필터 숫자를 뺀 집합에서 고르므로 칸 j의 숫자와 겹칠 수 없다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    plain = [[n for n in col if n not in FILTER_NUMBERS] for col in inputs]
+    count = calc_unique_combinations(plain)
+    for j, col in enumerate(inputs):
+        hits = sum(1 for n in col if n in FILTER_NUMBERS)
+        if hits:
+            count += hits * calc_unique_combinations(plain[:j] + plain[j + 1:])
+    return count
+
+
+@lru_cache(maxsize=None)
+def _partitions(mask):
+    """칸 집합 mask의 모든 분할을 (뫼비우스 계수 곱, 블록 비트마스크 목록)으로 나열"""
+    if mask == 0:
+        return [(1, ())]
+    first = mask & -mask
+    rest = mask ^ first
+    result = []
+    # first가 속한 블록을 rest의 부분집합 sub와 합쳐 정하고 나머지를 재귀 분할
+    sub = rest
+    while True:
+        block = first | sub
+        coef = _MOBIUS_COEF[block.bit_count()]
+        for sub_coef, blocks in _partitions(rest ^ sub):
+            result.append((coef * sub_coef, (block,) + blocks))
+        if sub == 0:
+            break
+        sub = (sub - 1) & rest
+    return result
+
+
+class IncrementalCounter:
+    """칸별 중간 상태를 들고 있다가 바뀐 칸만 다시 계산하는 조합 수 계산기
+
+    칸 부분집합(64개)마다 교집합을 저장해 두고, 칸 j가 바뀌면 j를 포함하는
+    32개 부분집합만 inter[S] = inter[S - {j}] & 칸 j로 갱신한다. 개수는 미리 나열한
+    분할(최대 203개)에 대해 블록 교집합 크기의 곱을 더해 구하므로 곱의 크기와 무관하다.
+    필터 숫자를 뺀 칸들의 교집합도 같은 방식으로 따로 들고 있다.
+    """
+
+    FULL = (1 << 6) - 1
+
+    def __init__(self):
+        self.columns = [None] * 6
+        self.inter = [set() for _ in range(1 << 6)]
+        self.inter_plain = [set() for _ in range(1 << 6)]
+
+    def update(self, inputs):
+        """입력과 비교해 바뀐 칸만 반영하고 바뀐 칸 번호 목록을 돌려줌"""
+        changed = []
+        for j, col in enumerate(inputs):
+            col = tuple(col)
+            if col == self.columns[j]:
+                continue
+            self.columns[j] = col
+            changed.append(j)
+            bit = 1 << j
+            col_set = set(col)
+            plain_set = col_set - FILTER_NUMBERS
+            for mask in range(bit, 1 << 6):
+                if not mask & bit:
+                    continue
+                if mask == bit:
+                    self.inter[mask] = col_set
+                    self.inter_plain[mask] = plain_set
+                else:
+                    self.inter[mask] = self.inter[mask ^ bit] & col_set
+                    self.inter_plain[mask] = self.inter_plain[mask ^ bit] & plain_set
+        return changed
+
+    def _count(self, inter, mask):
+        total = 0
+        for coef, blocks in _partitions(mask):
+            term = coef
+            for block in blocks:
+                term *= len(inter[block])
+                if not term:
+                    break
+            total += term
+        return total
+
+    def max_count(self):
+        """곱셈 법칙 조합 수 (calc_max_combinations와 같음)"""
+        return calc_max_combinations([col or () for col in self.columns])
+
+    def unique_count(self):
+        """중복 없는 조합 수 (calc_unique_combinations와 같음)"""
+        return self._count(self.inter, self.FULL)
+
+    def filtered_count(self):
+        """필터 조합 수 (calc_filtered_combinations와 같음)"""
+        if not all(self.columns):
+            return 0
+        count = self._count(self.inter_plain, self.FULL)
+        for j, col in enumerate(self.columns):
+            hits = sum(1 for n in col if n in FILTER_NUMBERS)
+            if hits:
+                count += hits * self._count(self.inter_plain, self.FULL ^ (1 << j))
+        return count
+
+
+# 유효 조합을 열거할 때 한 번에 풀어볼 위치 수
+ENUM_BLOCK_SIZE = 1 << 16
+# 제약 조건으로 가지치기할 앞 칸 접두사 수 상한
+PREFIX_LIMIT = 1 << 12
+
+
+def _product_tables(inputs):
+    """곱 위치 ↔ 칸별 숫자 변환용 테이블 (칸별 숫자 배열, 칸 크기, 자리값, 전체 위치 수)"""
+    columns = [np.asarray(col, dtype=np.int64) for col in inputs]
+    sizes = np.array([len(col) for col in inputs], dtype=np.int64)
+    strides = np.ones(6, dtype=np.int64)
+    for c in range(4, -1, -1):
+        strides[c] = strides[c + 1] * sizes[c + 1]
+    return columns, sizes, strides, int(strides[0] * sizes[0])
+
+
+def _decode(positions, tables):
+    """위치 번호를 혼합 진법으로 풀어 정렬된 조합 행으로 변환"""
+    columns, sizes, strides, _ = tables
+    digits = (positions[:, None] // strides) % sizes
+    return np.sort(np.stack([columns[c][digits[:, c]] for c in range(6)], axis=1), axis=1)
+
+
+def _valid_mask(rows, filtered, constraints=None):
+    """숫자가 겹치지 않고 (filtered이면) 필터 숫자가 1개 이하이며 제약을 만족하는 행"""
+    ok = (np.diff(rows, axis=1) != 0).all(axis=1)
+    if filtered:
+        ok &= np.isin(rows, sorted(FILTER_NUMBERS)).sum(axis=1) <= 1
+    if constraints is not None:
+        ok &= constraints.mask(rows, ordered=True)
+    return ok
+
+
+def _iter_live_positions(start, stop, constraints, tables):
+    """곱 위치 [start, stop) 중 앞 칸 숫자들로 제약을 만족할 수 있는 위치를 블록으로 생성
+
+    앞 depth칸이 같은 위치들은 뒤 칸 자리값(strides[depth-1]) 길이의 연속 구간을
+    이루므로, 앞 칸 숫자를 깊이 우선으로 고르며 칸마다 점진 검사해 만족할 수 없는
+    접두사 구간을 통째로 건너뛴다. depth는 접두사 수가 PREFIX_LIMIT를 넘지 않는
+    가장 깊은 칸(최대 4)이다.
+    """
+    columns, sizes, strides, _ = tables
+    cols = [col.tolist() for col in columns]
+    numbers = set().union(*cols)
+    depth = 1
+    while depth < 4 and int(np.prod(sizes[:depth + 1])) <= PREFIX_LIMIT:
+        depth += 1
+    # 칸 c에서 고른 뒤 남은 숫자는 c+1번째 칸부터만 나오므로 칸마다 경계를 좁힌 검사기
+    pushes = [constraints.compile(numbers, set().union(*cols[c + 1:])).push for c in range(depth)]
+    checker = constraints.compile(numbers)
+    deltas = [[checker.delta((num,)) for num in col] for col in cols[:depth]]
+    first = range(start // int(strides[0]), -(-stop // int(strides[0])))
+    live = []
+
+    def walk(c, prefix, state, used):
+        if c == depth:
+            live.append(prefix)
+            return
+        for i in first if c == 0 else range(len(cols[c])):
+            num = cols[c][i]
+            if num in used:
+                continue
+            new_state = pushes[c](state, deltas[c][i])
+            if new_state is not None:
+                walk(c + 1, prefix * int(sizes[c]) + i, new_state, used | {num})
+
+    walk(0, 0, checker.start, frozenset())
+
+    stride = int(strides[depth - 1])
+    live = np.array(live, dtype=np.int64)
+    per_block = max(1, ENUM_BLOCK_SIZE // stride)
+    offsets = np.arange(min(stride, ENUM_BLOCK_SIZE), dtype=np.int64)
+    for i in range(0, len(live), per_block):
+        group = live[i:i + per_block, None] * stride
+        for offset in range(0, stride, len(offsets)):
+            positions = (group + offset + offsets[:stride - offset]).ravel()
+            if start % stride or stop % stride:
+                positions = positions[(positions >= start) & (positions < stop)]
+            yield positions
+
+
+def _iter_range_blocks(inputs, filtered, start, stop, stats=None, constraints=None):
+    """곱 위치 [start, stop) 중 유효한 조합을 ENUM_BLOCK_SIZE 위치씩 검사해 블록으로 생성"""
+    tables = _product_tables(inputs)
+    if constraints is None:
+        blocks = (np.arange(offset, min(offset + ENUM_BLOCK_SIZE, stop), dtype=np.int64)
+                  for offset in range(start, stop, ENUM_BLOCK_SIZE))
+    else:
+        blocks = _iter_live_positions(start, stop, constraints, tables)
+    for positions in blocks:
+        block = _decode(positions, tables)
+        if stats is not None:
+            stats["nodes"] += len(positions)
+        yield block[_valid_mask(block, filtered, constraints)]
+
+
+def _enumerate_range(inputs, filtered, start, stop, constraints=None):
+    """곱 위치 [start, stop) 중 유효한 조합 (위치 순서, 작업 프로세스에서도 실행)"""
+    stats = {"nodes": 0}
+    rows = ComboArray.from_blocks(_iter_range_blocks(inputs, filtered, start, stop, stats, constraints))
+    return rows.data, stats["nodes"]
+
+
+def iter_valid_blocks(inputs, filtered=False, use_parallel=False, stats=None, constraints=None):
+    """유효 조합을 곱(product) 순서대로 numpy 블록으로 생성
+
+    위치 번호 블록을 한꺼번에 풀어 검사하므로 파이썬 루프는 블록 수만큼만 돈다.
+    use_parallel이면 첫 칸 숫자(곱의 맨 앞 인수) 구간별로 나눠 여러 프로세스에서
+    실행하고, 구간 순서대로 내보내 직렬 결과와 같은 순서를 유지한다.
+    stats["nodes"]에 검사한 위치 수를 누적한다. constraints(Constraints)가 주어지면
+    앞 칸 숫자로 만족할 수 없는 위치 구간은 풀어보지 않고 건너뛰고, 나머지는
+    벡터 검사(mask)로 거른다.
+    """
+    if not all(len(col) > 0 for col in inputs):
+        return
+    _, sizes, strides, total = _product_tables(inputs)
+    if not use_parallel:
+        yield from _iter_range_blocks(inputs, filtered, 0, total, stats, constraints)
+        return
+    stride = int(strides[0])
+    shards = parallel.balanced_ranges([1] * int(sizes[0]), parallel.shard_count())
+    yield from parallel.run_shards(
+        _enumerate_range, [(inputs, filtered, lo * stride, hi * stride, constraints) for lo, hi in shards], stats
+    )
+
+
+def enumerate_valid_combinations(inputs, filtered=False, use_parallel=False, constraints=None):
+    """유효 조합 전체를 곱(product) 순서대로 ComboArray로 생성"""
+    return ComboArray.from_blocks(iter_valid_blocks(inputs, filtered, use_parallel, constraints=constraints))
+
+
+# 번호 조합 키: 정렬된 6개 숫자를 8비트씩 이어 붙인 48비트 정수 (키 순서 = 조합 사전순)
+_KEY_SHIFTS = np.arange(40, -1, -8, dtype=np.uint64)
+# Ryser 공식용 숫자 부분집합 표 (64개 부분집합 × 6자리)와 부호
+_SUBSETS = ((np.arange(64)[:, None] >> np.arange(6)) & 1).astype(np.int64)
+_RYSER_SIGNS = (-1) ** (6 - _SUBSETS.sum(axis=1))
+
+
+def set_keys(rows):
+    """정렬된 조합 행마다 48비트 번호 조합 키 (uint64)"""
+    return np.bitwise_or.reduce(np.asarray(rows).astype(np.uint64) << _KEY_SHIFTS, axis=1)
+
+
+def keys_to_rows(keys):
+    """set_keys의 역변환 ((N, 6) uint8 배열)"""
+    return ((np.asarray(keys, dtype=np.uint64)[:, None] >> _KEY_SHIFTS) & np.uint64(0xFF)).astype(np.uint8)
+
+
+def _contains(ordered, keys):
+    """정렬된 키 배열 ordered에 keys가 들어 있는지"""
+    if not len(ordered):
+        return np.zeros(len(keys), dtype=bool)
+    idx = np.searchsorted(ordered, keys)
+    return ordered[np.minimum(idx, len(ordered) - 1)] == keys
+
+
+class KeySet:
+    """번호 조합 키의 삽입 전용 집합 (키당 8바이트)
+
+    정렬된 본체 배열과 작은 최근분 배열로 나눠 들고, 최근분이 본체의 1/4을 넘으면
+    합친다. 블록마다 본체 전체를 다시 정렬하지 않으므로 합치는 비용이 전체 키 수에
+    대해 분할 상환된다.
+    """
+
+    def __init__(self):
+        self._main = np.empty(0, dtype=np.uint64)
+        self._recent = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._main) + len(self._recent)
+
+    def add(self, keys):
+        """keys를 넣고, 처음 보는 키가 블록 안에서 처음 나온 자리만 True인 마스크를 돌려줌"""
+        unique, first = np.unique(keys, return_index=True)
+        new = ~(_contains(self._main, unique) | _contains(self._recent, unique))
+        mask = np.zeros(len(keys), dtype=bool)
+        mask[first[new]] = True
+        self._recent = np.union1d(self._recent, unique[new])
+        if len(self._recent) > max(len(self._main) // 4, ENUM_BLOCK_SIZE):
+            self._main = np.union1d(self._main, self._recent)
+            self._recent = np.empty(0, dtype=np.uint64)
+        return mask
+
+
+def _disjoint(inputs):
+    """칸끼리 겹치는 숫자가 없는지 (그러면 칸별 조합과 번호 조합이 일대일)"""
+    return sum(len(set(col)) for col in inputs) == len(set().union(*inputs))
+
+
+def iter_distinct_blocks(inputs, filtered=False, use_parallel=False, stats=None, constraints=None):
+    """서로 다른 번호 조합을 곱(product) 순서에서 처음 나오는 자리에 한 번씩 블록으로 생성
+
+    칸끼리 숫자를 공유하면 같은 6개 숫자가 여러 칸 배치에서 나온다. 유효 조합 블록을
+    흘려보내며 번호 조합 키(48비트)를 KeySet에 넣어 처음 보는 조합만 내보내므로,
+    메모리는 서로 다른 조합 수 × 8바이트이고 중복 행은 쌓이지 않는다.
+    칸이 서로 겹치지 않으면 중복이 없으므로 그대로 내보낸다.
+    """
+    blocks = iter_valid_blocks(inputs, filtered, use_parallel, stats, constraints)
+    if _disjoint(inputs):
+        yield from blocks
+        return
+    seen = KeySet()
+    for block in blocks:
+        if len(block):
+            yield block[seen.add(set_keys(block))]
+
+
+def calc_distinct_combinations(inputs, filtered=False, use_parallel=False, constraints=None):
+    """서로 다른 번호 조합 수 (칸이 겹치면 번호 조합 키로 중복을 걸러 셈)"""
+    if not all(len(col) > 0 for col in inputs):
+        return 0
+    if _disjoint(inputs) and constraints is None:
+        return calc_filtered_combinations(inputs) if filtered else calc_unique_combinations(inputs)
+    return sum(len(block) for block in iter_distinct_blocks(inputs, filtered, use_parallel, constraints=constraints))
+
+
+def _assignment_counts(rows, tables):
+    """정렬된 조합 행마다 같은 번호 조합이 나오는 칸 배치 수
+
+    칸 × 숫자 소속 행렬의 퍼머넌트를 Ryser 공식(숫자 부분집합 64개)으로 한꺼번에 계산한다.
+    """
+    columns = tables[0]
+    member = np.zeros((6, 256), dtype=np.int64)
+    for c, col in enumerate(columns):
+        member[c, col] = 1
+    incidence = member[:, rows.astype(np.int64)].transpose(1, 0, 2)  # (행, 칸, 자리)
+    partial = incidence @ _SUBSETS.T  # (행, 칸, 부분집합)
+    return partial.prod(axis=1) @ _RYSER_SIGNS
+
+
+def position_weights(inputs, size, filtered=False, constraints=None, distinct=False, rng=None):
+    """곱(product) 위치 size개를 균등 추출해 위치마다 결과에 기여하는 몫
+
+    유효하지 않은 위치는 0, 유효한 위치는 1이고, distinct이면 같은 번호 조합이 나오는 칸
+    배치 수 m으로 나눈 1/m이다. 따라서 평균 × 곱의 크기가 (서로 다른) 유효 조합 수의
+    불편 추정값이다 (열거 없이 결과 수를 어림할 때 씀).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    tables = _product_tables(inputs)
+    rows = _decode(rng.integers(0, tables[3], size=size, dtype=np.int64), tables)
+    weights = _valid_mask(rows, filtered, constraints).astype(np.float64)
+    if distinct and not _disjoint(inputs):
+        ok = weights > 0
+        weights[ok] = 1 / _assignment_counts(rows[ok], tables)
+    return weights
+
+
+def sample_combinations(inputs, k, filtered=False, use_parallel=False, valid=None, constraints=None,
+                        distinct=False):
+    """곱(product) 위치를 균등 추출해 유효 조합 k개를 중복 위치 없이 생성
+
+    위치 번호를 혼합 진법으로 풀어(unrank) 각 칸의 숫자를 구하고, 숫자가 겹치거나
+    필터를 통과하지 못한 위치는 버린다(rejection). 전체 조합 목록을 만들지 않으므로
+    메모리와 시간이 곱의 크기가 아니라 k에 비례한다. 요청 수가 유효 조합의 절반을
+    넘으면 거절률이 커지므로 유효 조합을 모두 열거해 섞는다 (use_parallel이면 병렬 열거).
+    valid에 유효 조합 수를 이미 알고 있으면 넘겨 다시 세지 않게 한다. constraints가
+    있으면 개수 공식이 없으므로 가지치기 열거로 센다 (블록 단위, 결과는 쌓지 않음).
+
+    distinct이면 서로 다른 번호 조합 위에서 균등하게 뽑는다. 칸 배치가 m개인 조합은
+    위치로 m배 자주 뽑히므로 1/m 확률로만 받아들이고, 같은 번호 조합은 한 번만 낸다.
+    이때 valid는 서로 다른 번호 조합 수다. 결과는 ComboArray로 돌려준다.
+    """
+    picked = ComboArray()
+    if not all(len(col) > 0 for col in inputs):
+        return picked
+    distinct = distinct and not _disjoint(inputs)
+    if valid is None and distinct:
+        valid = calc_distinct_combinations(inputs, filtered, use_parallel, constraints)
+    elif valid is None and constraints is not None:
+        valid = sum(len(block) for block in iter_valid_blocks(inputs, filtered, use_parallel, constraints=constraints))
+    elif valid is None:
+        valid = calc_filtered_combinations(inputs) if filtered else calc_unique_combinations(inputs)
+    k = min(k, valid)
+    if k <= 0:
+        return picked
+
+    if 2 * k > valid:
+        if distinct:
+            combos = np.array(ComboArray.from_blocks(iter_distinct_blocks(inputs, filtered, use_parallel,
+                                                                          constraints=constraints)))
+        else:
+            combos = np.array(enumerate_valid_combinations(inputs, filtered, use_parallel, constraints))
+        np.random.shuffle(combos)
+        picked.append(combos[:k])
+        return picked
+
+    tables = _product_tables(inputs)
+    total = tables[3]
+
+    seen = set()
+    while len(picked) < k:
+        # 기대 채택률(valid/total)에 맞춰 한 번에 뽑을 위치 수를 정함
+        need = k - len(picked)
+        batch = int(min(1 << 16, max(64, 2 * need * total // valid)))
+        positions = np.random.randint(0, total, size=batch, dtype=np.int64)
+        rows = _decode(positions, tables)
+        ok = _valid_mask(rows, filtered, constraints)
+        if distinct:
+            ok[ok] = np.random.random(int(ok.sum())) * _assignment_counts(rows[ok], tables) < 1
+            ids = set_keys(rows[ok]).tolist()
+        else:
+            ids = positions[ok].tolist()
+        accepted = []
+        for i, item in zip(np.flatnonzero(ok).tolist(), ids):
+            if item in seen:
+                continue
+            seen.add(item)
+            accepted.append(i)
+            if len(picked) + len(accepted) == k:
+                break
+        picked.append(rows[accepted])
+    return picked
+
+
+def calc_max_combinations(inputs):
+    """기존 곱셈 법칙 계산 함수"""
+    return reduce(mul, [len(col) for col in inputs if len(col) > 0], 1) if all(len(col) > 0 for col in inputs) else 0
@@ -0,0 +1,116 @@
+"""조합 순위(combinadic) 색인
+
+서로 다른 숫자 6개 조합 {c0 < c1 < ... < c5}를 조합 수 체계의 순위
+C(c0, 1) + C(c1, 2) + ... + C(c5, 6)으로 바꾸면 조합마다 겹치지 않는 정수 하나가
+된다. 결과를 정렬된 uint64 순위 배열로 들고 있으면 포함 여부는 이진 탐색
+(O(log n)), 결과끼리의 교집합/합집합/차집합은 정렬 배열 병합으로 계산한다.
+행당 8바이트이고 순위에서 조합을 다시 풀 수 있으므로 원래 결과 배열 없이도 페이지를
+보여 줄 수 있다.
+"""
+import re
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+# _BINOM[k][n] = C(n, k) (숫자는 0~255, 순위는 C(256, 6) 미만이라 uint64에 들어감)
+_BINOM = np.array([[comb(n, k) for n in range(256)] for k in range(7)], dtype=np.uint64)
+
+
+def ranks(rows):
+    """조합 행(서로 다른 숫자 6개, 순서 무관)마다 조합 순위"""
+    rows = np.sort(np.asarray(rows, dtype=np.int64).reshape(-1, 6), axis=1)
+    result = np.zeros(len(rows), dtype=np.uint64)
+    for i in range(6):
+        result += _BINOM[i + 1][rows[:, i]]
+    return result
+
+
+def unrank(values):
+    """ranks의 역변환 (정렬된 (N, 6) uint8 행)"""
+    rest = np.asarray(values, dtype=np.uint64).copy()
+    rows = np.empty((len(rest), 6), dtype=np.uint8)
+    # 큰 자리부터 C(c, k) <= 남은 순위인 가장 큰 c를 고름
+    for k in range(6, 0, -1):
+        c = np.searchsorted(_BINOM[k], rest, side="right") - 1
+        rows[:, k - 1] = c
+        rest -= _BINOM[k][c]
+    return rows
+
+
+def parse_tickets(lines):
+    """한 줄에 숫자 6개씩 적힌 번호표를 (행 배열, 잘못된 줄 번호 목록)으로 변환
+
+    숫자는 공백, 쉼표, 세미콜론, |로 구분한다. 빈 줄은 건너뛰고, 숫자가 아닌 칸이 있는
+    첫 줄은 머리글(CSV 열 이름)로 보고 건너뛴다. 숫자가 6개가 아니거나 겹치거나
+    0~255 밖인 줄은 잘못된 줄로 모은다 (줄 번호는 1부터).
+    """
+    rows, bad = [], []
+    first = True
+    for lineno, line in enumerate(lines, 1):
+        tokens = [token for token in re.split(r"[\s,;|]+", line) if token]
+        if not tokens:
+            continue
+        if not all(token.isdigit() for token in tokens):
+            if not first:
+                bad.append(lineno)
+            first = False
+            continue
+        first = False
+        nums = [int(token) for token in tokens]
+        if len(nums) != 6 or len(set(nums)) != 6 or max(nums) > 255:
+            bad.append(lineno)
+            continue
+        rows.append(sorted(nums))
+    return np.array(rows, dtype=np.int64).reshape(-1, 6), bad
+
+
+class RankIndex:
+    """정렬된 조합 순위 배열 (중복 없음)"""
+
+    def __init__(self, values=None):
+        self.values = np.empty(0, dtype=np.uint64) if values is None else values
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(np.unique(ranks(rows)))
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        """조합 블록을 차례로 순위로 바꿔 색인 생성 (블록은 순위만 남기고 버림)"""
+        parts = [ranks(block) for block in blocks if len(block)]
+        return cls(np.unique(np.concatenate(parts)) if parts else None)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def contains(self, rows):
+        """행마다 색인에 들어 있는지 (이진 탐색)"""
+        keys = ranks(rows)
+        if not len(self.values):
+            return np.zeros(len(keys), dtype=bool)
+        idx = np.searchsorted(self.values, keys)
+        return self.values[np.minimum(idx, len(self.values) - 1)] == keys
+
+    def __contains__(self, combo):
+        return bool(self.contains([combo])[0])
+
+    def __and__(self, other):
+        return RankIndex(np.intersect1d(self.values, other.values, assume_unique=True))
+
+    def __or__(self, other):
+        return RankIndex(np.union1d(self.values, other.values))
+
+    def __sub__(self, other):
+        return RankIndex(np.setdiff1d(self.values, other.values, assume_unique=True))
+
+    def __getitem__(self, key):
+        return unrank(self.values[key])
+
+    def to_frame(self, columns, start=0, stop=None):
+        """[start, stop) 구간만 조합으로 풀어 DataFrame으로 변환 (순위 순서)"""
+        return pd.DataFrame(unrank(self.values[start:stop]), columns=columns)
@@ -0,0 +1,186 @@
+"""조합 결과 컨테이너
+
+결과를 (N, 6) uint8 NumPy 배열 하나에 담는다. 한 행이 6바이트이므로
+6개짜리 파이썬 튜플(행당 100바이트 이상)보다 훨씬 작다. 생성기는 블록 단위로
+append 하고, 화면 표시/페이지/내보내기는 복사 없는 뷰(data, 슬라이스)로 읽는다.
+LazyCombos는 결과를 만들지 않고 정확한 개수와 순위 기반 순회만으로 페이지를 내는 뷰다.
+StoredResult는 디스크(lotto.store)에 저장된 결과를 메모리 맵으로 읽는 핸들이다.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# 처음 확보할 행 수
+INITIAL_CAPACITY = 1024
+# uint8 결과 배열에 담을 수 있는 가장 큰 숫자
+MAX_NUMBER = 255
+
+
+def check_numbers(inputs):
+    """입력 숫자가 결과 배열에 담을 수 있는 범위(0~MAX_NUMBER)인지 확인 (벗어나면 ValueError)
+
+    생성 도중 ComboArray.append에서 실패하지 않도록 입력을 받을 때 먼저 부른다.
+    """
+    bad = sorted({num for numbers in inputs for num in numbers if not 0 <= num <= MAX_NUMBER})
+    if bad:
+        shown = ", ".join(map(str, bad[:10])) + (" ..." if len(bad) > 10 else "")
+        raise ValueError(f"숫자는 0~{MAX_NUMBER} 범위만 쓸 수 있습니다 (입력: {shown})")
+
+
+class ComboArray:
+    """(N, width) uint8 결과 배열 (블록 단위로 늘어남)"""
+
+    def __init__(self, width=6, capacity=INITIAL_CAPACITY):
+        self.width = width
+        self._buf = np.empty((capacity, width), dtype=np.uint8)
+        self._len = 0
+        self._frozen = False
+
+    @classmethod
+    def from_blocks(cls, blocks, width=6):
+        result = cls(width)
+        for block in blocks:
+            result.append(block)
+        return result
+
+    def append(self, rows):
+        """행 블록(배열 또는 튜플 목록)을 뒤에 붙임"""
+        if self._frozen:
+            raise ValueError("고정된 결과 배열에는 행을 붙일 수 없습니다.")
+        if isinstance(rows, list):
+            # 튜플 목록은 평탄화해서 한 번에 변환 (np.asarray보다 빠름)
+            block = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * self.width)
+        else:
+            block = np.asarray(rows)
+        if block.size == 0:
+            return
+        block = block.reshape(-1, self.width)
+        if block.dtype != np.uint8:
+            if block.min() < 0 or block.max() > MAX_NUMBER:
+                raise ValueError(f"결과 배열에는 0~{MAX_NUMBER} 범위의 숫자만 저장할 수 있습니다.")
+            block = block.astype(np.uint8)
+        needed = self._len + len(block)
+        if needed > len(self._buf):
+            grown = np.empty((max(needed, 2 * len(self._buf)), self.width), dtype=np.uint8)
+            grown[:self._len] = self._buf[:self._len]
+            self._buf = grown
+        self._buf[self._len:needed] = block
+        self._len = needed
+
+    @property
+    def data(self):
+        """채워진 부분의 읽기 전용 뷰 (복사 없음)"""
+        view = self._buf[:self._len]
+        view.flags.writeable = False
+        return view
+
+    def freeze(self):
+        """여유 용량을 잘라내고 이후 append를 막음 (여러 세션이 공유할 때)"""
+        if not self._frozen:
+            if len(self._buf) != self._len:
+                self._buf = self._buf[:self._len].copy()
+            self._frozen = True
+        return self
+
+    @property
+    def nbytes(self):
+        return self._len * self.width
+
+    @property
+    def capacity_bytes(self):
+        return self._buf.nbytes
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def to_frame(self, columns, start=0, stop=None):
+        """[start, stop) 구간을 DataFrame으로 (배열 복사 없음)"""
+        return pd.DataFrame(self.data[start:stop], columns=columns, copy=False)
+
+
+class LazyCombos:
+    """조합을 만들어 두지 않는 결과 뷰 (정확한 개수 + 순위 i부터의 순회)
+
+    iter_from(i)는 정해진 순서에서 i번째(0부터) 조합부터 차례로 튜플을 내는
+    제너레이터 함수다. 페이지 하나는 iter_from(start)에서 필요한 행만 꺼내므로
+    메모리와 시간이 전체 개수가 아니라 페이지 크기에 비례한다.
+    nbytes는 순위 계산용 테이블 크기 (캐시 용량 계산용)이다.
+    """
+
+    def __init__(self, count, iter_from, width=6, nbytes=0):
+        self.count = count
+        self.iter_from = iter_from
+        self.width = width
+        self.nbytes = nbytes
+
+    def __len__(self):
+        return self.count
+
+    def unrank(self, i):
+        """i번째 조합"""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return next(self.iter_from(i))
+
+    def page(self, start=0, stop=None):
+        """[start, stop) 구간 조합 (uint8 배열)"""
+        stop = self.count if stop is None else min(stop, self.count)
+        rows = ComboArray(self.width, capacity=max(stop - start, 1))
+        if start < stop:
+            rows.append(list(itertools.islice(self.iter_from(start), stop - start)))
+        return rows.data
+
+    def to_frame(self, columns, start=0, stop=None):
+        """[start, stop) 구간을 DataFrame으로 (그 구간만 생성)"""
+        return pd.DataFrame(self.page(start, stop), columns=columns, copy=False)
+
+
+class StoredResult:
+    """디스크에 .npy로 저장된 (N, width) uint8 결과의 핸들
+
+    만들 때 바로 읽기 전용 메모리 맵으로 열어 두므로, 그 뒤에 저장소가 예산 정리로 파일을
+    지워도 (POSIX에서는) 핸들은 계속 읽을 수 있다. 세션과 캐시는 이 핸들만 나눠 갖고 행은
+    운영체제 페이지 캐시에서 읽으므로 서버 힙을 쓰지 않는다. 파일이 없으면 OSError를 낸다.
+    """
+
+    def __init__(self, path, rows, width=6):
+        self.path = path
+        self.rows = rows
+        self.width = width
+        self._data = np.load(path, mmap_mode="r")
+
+    @property
+    def data(self):
+        """읽기 전용 메모리 맵 (N, width) 배열"""
+        if self._data is None:  # 다른 프로세스로 넘어온 핸들
+            self._data = np.load(self.path, mmap_mode="r")
+        return self._data
+
+    @property
+    def nbytes(self):
+        return self.rows * self.width
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __array__(self, dtype=None, copy=None):
+        data = np.asarray(self.data)
+        return data if dtype is None else data.astype(dtype)
+
+    def __getstate__(self):
+        # 메모리 맵은 넘기지 않고 경로만 (받는 쪽에서 다시 엶)
+        return {**self.__dict__, "_data": None}
+
+    def to_frame(self, columns, start=0, stop=None):
+        """[start, stop) 구간만 파일에서 읽어 DataFrame으로 변환"""
+        return pd.DataFrame(np.asarray(self.data[start:stop]), columns=columns)
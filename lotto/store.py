@@ -0,0 +1,151 @@
+"""디스크 결과 저장소
+
+끝난 생성 결과를 캐시 키마다 .npy 파일(uint8 (N, 폭) 배열)과 작은 메타데이터
+파일(.json: 키, 생성기, 입력, 옵션, 행 수, 폭)로 저장한다. 읽을 때는 StoredResult
+핸들을 돌려주고 행은 메모리 맵으로 읽으므로, 세션과 캐시는 핸들만 들고 서버를
+다시 시작하거나 새 탭을 열어도 같은 키의 결과를 다시 생성하지 않는다.
+
+저장 위치는 LOTTO_STORE_DIR(기본: 임시 디렉터리의 lotto-results), 용량 예산은
+LOTTO_STORE_BYTES(기본 4GB, 0이면 저장하지 않음)이다. 예산을 넘으면 가장 오래
+읽지 않은 결과부터 지운다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from lotto import export
+from lotto.results import StoredResult
+
+DEFAULT_DIR = os.environ.get("LOTTO_STORE_DIR", os.path.join(tempfile.gettempdir(), "lotto-results"))
+DEFAULT_BUDGET_BYTES = int(os.environ.get("LOTTO_STORE_BYTES", 4 * 1024 ** 3))
+
+
+def _digest(key):
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """캐시 키 → 디스크 결과 (프로세스와 재시작을 넘어 공유)"""
+
+    def __init__(self, root=DEFAULT_DIR, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.budget_bytes > 0
+
+    def _paths(self, key):
+        base = os.path.join(self.root, _digest(key))
+        return base + ".npy", base + ".json"
+
+    def get(self, key):
+        """저장된 결과의 StoredResult 핸들 (없으면 None)"""
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["key"] != repr(key) or os.path.getsize(data_path) < meta["bytes"]:
+                return None
+            os.utime(meta_path)  # 최근 사용 시각 (예산 정리 순서)
+            # 지금 메모리 맵을 열어 둬야 이후의 예산 정리가 파일을 지워도 읽을 수 있음
+            return StoredResult(data_path, meta["rows"], meta["width"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, rows, width=6):
+        """rows(ComboArray/배열/블록 이터러블)를 저장하고 StoredResult 핸들을 돌려줌
+
+        저장소가 꺼져 있거나, 결과가 예산보다 크거나, 쓰기에 실패하면 rows를 그대로
+        돌려준다. 임시 파일에 다 쓴 뒤 이름을 바꾸므로 같은 키를 동시에 저장해도 읽는 쪽은
+        완성된 파일만 본다.
+        """
+        if not self.enabled:
+            return rows
+        data_path, meta_path = self._paths(key)
+        tmp = f"{data_path}.{uuid.uuid4().hex}.part"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, "wb") as f:
+                export.write_rows(f, rows, list(range(width)), "NPY")
+                size = f.tell()
+            if size > self.budget_bytes:
+                os.remove(tmp)
+                return rows
+            count = len(np.load(tmp, mmap_mode="r"))
+            os.replace(tmp, data_path)
+            meta = {
+                "key": repr(key),
+                "variant": key[0],
+                "inputs": key[1],
+                "options": repr(key[2]),
+                "rows": count,
+                "width": width,
+                "bytes": size,
+                "created": time.time(),
+            }
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp, meta_path)
+            result = StoredResult(data_path, count, width)
+        except (OSError, ValueError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return rows
+        self.prune()
+        return result
+
+    def discard(self, result):
+        """put이 저장한 결과를 지움 (다시 쓰지 않는 일회성 결과를 새 결과로 바꿀 때)
+
+        StoredResult가 아니거나 이 저장소의 파일이 아니면 아무것도 하지 않는다. 이미 열린
+        핸들은 (POSIX에서는) 계속 읽을 수 있다.
+        """
+        if not isinstance(result, StoredResult) or os.path.normpath(os.path.dirname(result.path)) != os.path.normpath(self.root):
+            return
+        meta_path = result.path[:-len(".npy")] + ".json"
+        with self._lock:
+            for path in (meta_path, result.path):
+                try:
+                    os.remove(path)
+                except OSError:  # 이미 지워졌거나 (Windows) 열려 있는 파일 → 예산 정리에 맡김
+                    pass
+
+    def prune(self):
+        """용량 예산을 넘으면 가장 오래 읽지 않은 결과부터 삭제"""
+        with self._lock:
+            try:
+                names = [name for name in os.listdir(self.root) if name.endswith(".json")]
+            except OSError:
+                return
+            entries = []
+            for name in names:
+                meta_path = os.path.join(self.root, name)
+                data_path = meta_path[:-len(".json")] + ".npy"
+                try:
+                    entries.append((os.path.getmtime(meta_path), os.path.getsize(data_path), meta_path, data_path))
+                except OSError:
+                    continue
+            total = sum(size for _, size, _, _ in entries)
+            for _, size, meta_path, data_path in sorted(entries):
+                if total <= self.budget_bytes:
+                    break
+                try:
+                    # 메타데이터를 먼저 지워 읽는 쪽이 지워지는 중인 결과를 보지 않게 함
+                    os.remove(meta_path)
+                    os.remove(data_path)
+                except OSError:  # 다른 프로세스가 먼저 지웠거나 (Windows) 열려 있는 파일
+                    continue
+                total -= size
+
+
+result_store = ResultStore()
@@ -0,0 +1,42 @@
+"""테스트 공용 픽스처"""
+import pytest
+
+from lotto import FILTER_NUMBERS
+
+# 칸끼리 자주 겹치도록 필터 숫자 몇 개를 섞은 작은 숫자 풀
+POOL = list(range(1, 13)) + sorted(FILTER_NUMBERS)[:3]
+
+
+def make_random_inputs(rng, low=1, high=5, pool=POOL):
+    """pool에서 칸마다 low~high개를 뽑은 작은 무작위 6칸 입력 (칸 안은 정렬)"""
+    return [sorted(rng.sample(pool, rng.randint(low, high))) for _ in range(6)]
+
+
+def edit_inputs(rng, inputs, pool=POOL):
+    """화면에서 칸을 고치듯 한두 칸을 바꾼 새 입력 (숫자 추가/삭제, 칸 비우기, 순서만 바꾸기)"""
+    inputs = [list(col) for col in inputs]
+    for j in rng.sample(range(6), rng.randint(1, 2)):
+        col = inputs[j]
+        action = rng.random()
+        if action < 0.4:
+            col.append(rng.choice([num for num in pool if num not in col] or pool))
+        elif action < 0.75 and col:
+            col.remove(rng.choice(col))
+        elif action < 0.85:
+            col.clear()
+        else:
+            rng.shuffle(col)
+        inputs[j] = sorted(col) if action < 0.85 else col
+    return inputs
+
+
+@pytest.fixture
+def random_edits():
+    """edit_inputs (증분 계산기를 매번 전체 재계산과 비교할 때 입력을 바꾸는 함수)"""
+    return edit_inputs
+
+
+@pytest.fixture
+def random_inputs():
+    """make_random_inputs (전수 열거와 비교할 만큼 작은 입력을 만드는 함수)"""
+    return make_random_inputs
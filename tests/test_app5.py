@@ -0,0 +1,34 @@
+"""app5 중복 조합 분석이 끝까지 생성한 결과만 캐시하는지 확인"""
+import numpy as np
+import pytest
+
+import app5
+from lotto import cache, jobs, overlap
+from lotto.cache import ResultCache
+
+INPUTS = [list(range(1, 10)), list(range(2, 11)), list(range(1, 9)) + [12], list(range(3, 12)), [], []]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(cache, "result_cache", ResultCache())
+
+
+def finished_job(status, capped=False):
+    job = jobs.Job(width=7)
+    job.status = status
+    job.capped = capped
+    return job
+
+
+@pytest.mark.parametrize("status, capped", [(jobs.CANCELLED, False), (jobs.DONE, True)])
+def test_partial_summary_is_not_served_to_full_run(status, capped):
+    rows = np.concatenate(list(overlap.iter_duplicate_blocks(INPUTS)))
+    assert len(rows) > 2
+    partial = app5.summarize_duplicates(finished_job(status, capped), INPUTS, rows[:2])
+    assert partial.rows == int(rows[:2, 6].sum())
+
+    full = app5.summarize_duplicates(finished_job(jobs.DONE), INPUTS, rows)
+    assert full.rows == int(rows[:, 6].sum())
+    # 끝까지 생성한 결과의 요약은 캐시되어 다음 실행이 그대로 씀
+    assert app5.summarize_duplicates(finished_job(jobs.DONE), INPUTS, rows[:0]) is full
@@ -0,0 +1,49 @@
+"""생성 전 추정치를 엔진의 실제 작업량/결과와 비교"""
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from lotto import budget, pick
+from lotto.pick import _build_tables
+
+
+class CountingList(list):
+    """훑은 원소 수를 세는 후보 목록"""
+
+    checks = 0
+
+    def __iter__(self):
+        for item in super().__iter__():
+            CountingList.checks += 1
+            yield item
+
+
+def instrumented_tables(inputs):
+    return [{size: CountingList(cands) for size, cands in per_size.items()} for per_size in _build_tables(inputs)]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_pick_work_counts_search_checks(seed, random_inputs, monkeypatch):
+    # 실제 커널이 후보 목록에서 꺼내 검사한 후보 수와 비교
+    monkeypatch.setattr(pick, "_build_tables", instrumented_tables)
+    rng = random.Random(seed)
+    inputs = random_inputs(rng, high=6)
+    for max_filter in (1, 6):
+        CountingList.checks = 0
+        stats = {"nodes": 0}
+        rows = sum(len(block) for block in pick.iter_search_blocks(inputs, max_filter, stats))
+        assert pick.count_search_work(inputs, max_filter) == CountingList.checks
+        assert rows <= CountingList.checks and (stats["nodes"] > 0) == all(inputs)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_overlap_rows_are_exact(seed):
+    rng = random.Random(seed)
+    pool = rng.sample(range(1, 30), 11)
+    inputs = [sorted(rng.sample(pool, rng.randint(4, 10))) for _ in range(6)]
+    counts = Counter(combo for col in inputs for combo in itertools.combinations(col, 6))
+    estimate = budget.estimate_overlap(inputs)
+    assert estimate.exact
+    assert estimate.rows == sum(1 for n in counts.values() if n >= 2)
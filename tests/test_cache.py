@@ -0,0 +1,84 @@
+"""ResultCache의 LRU 순서, 메모리 예산, 키 정규화, 스레드 안전성"""
+import random
+import threading
+
+import numpy as np
+
+from lotto import cache as cache_module
+from lotto.cache import ResultCache, cached, make_key
+from lotto.results import ComboArray
+
+
+def test_bytes_count_against_budget():
+    # 내보낸 다운로드 파일(bytes)도 크기만큼 예산을 차지해 오래된 것부터 밀려남
+    cache = ResultCache(budget_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    assert cache.nbytes == 200
+    cache.put("c", b"x" * 100)
+    assert cache.get("a") is None
+    assert cache.get("b") == b"x" * 100 and cache.nbytes == 200
+
+
+def test_lru_order():
+    cache = ResultCache(budget_bytes=3 * 64)
+    for key in "abc":
+        cache.put(key, key)
+    assert cache.get("a") == "a"  # a가 가장 최근에 쓴 항목이 됨
+    cache.put("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.hits == 4 and cache.misses == 1
+
+
+def test_byte_budget_eviction():
+    cache = ResultCache(budget_bytes=1000)
+    result = ComboArray(capacity=10)
+    result.append(np.ones((10, 6), dtype=np.uint8))
+    cache.put("rows", result)
+    assert result._frozen and cache.nbytes == 60
+    cache.put("big", np.zeros(2000, dtype=np.uint8))  # 예산보다 크면 넣지 않음
+    assert cache.get("big") is None and cache.nbytes == 60
+    cache.put("half", np.zeros(600, dtype=np.uint8))
+    cache.put("more", np.zeros(600, dtype=np.uint8))
+    assert cache.get("rows") is None and cache.get("half") is None
+    assert len(cache) == 1 and cache.nbytes == 600
+    cache.put("more", np.zeros(100, dtype=np.uint8))  # 같은 키는 크기를 바꿔 다시 셈
+    assert cache.nbytes == 100
+
+
+def test_key_canonicalization():
+    a = make_key("pick", [[3, 1, 2, 2], [9, 8]], max_filter=1, sort=True)
+    b = make_key("pick", [(1, 2, 3), [8, 9]], sort=True, max_filter=1)
+    assert a == b
+    assert hash(a) == hash(b)
+    assert make_key("pick", [[8, 9], [1, 2, 3]], max_filter=1, sort=True) != a  # 칸 순서는 의미가 있음
+    assert make_key("pick", [[1, 2, 3], [8, 9]], max_filter=2, sort=True) != a
+    assert make_key("maxtwo", [[1, 2, 3], [8, 9]], max_filter=1, sort=True) != a
+
+
+def test_cached_uses_canonical_key(monkeypatch):
+    monkeypatch.setattr(cache_module, "result_cache", ResultCache())
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert cached("test", [[2, 1]], compute, mode=1) == 1
+    assert cached("test", [[1, 2, 2]], compute, mode=1) == 1
+    assert cached("test", [[1, 2]], compute, mode=2) == 2
+
+
+def test_thread_safety():
+    cache = ResultCache(budget_bytes=50 * 64)
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(2000):
+            key = rng.randrange(100)
+            assert cache.get_or_compute(key, lambda: key) == key
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 동시에 넣고 빼도 크기 합과 예산이 맞음
+    assert cache.nbytes == 64 * len(cache) <= cache.budget_bytes
+    assert cache.hits + cache.misses == 8 * 2000
@@ -0,0 +1,147 @@
+"""명령줄 하위 명령의 출력과 종료 코드"""
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from lotto import cli, maxtwo, overlap, pick, product
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETS = [
+    [[1, 2, 3], [4, 5], [6, 7, 8], [9, 10], [11, 12, 13], [14, 15]],
+    [[1, 2, 3, 4], [3, 4, 5], [5, 6, 7], [7, 8, 9], [1, 9, 10], [2, 6, 10]],
+]
+LINES = [
+    "# 주석과 빈 줄은 건너뜀",
+    json.dumps({"name": "first", "columns": SETS[0]}),
+    "",
+    " | ".join(" ".join(map(str, col)) for col in SETS[1]),
+]
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "inputs.txt"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def run(capfd, monkeypatch):
+    """cli.main을 이 프로세스에서 실행해 CompletedProcess처럼 (returncode, stdout, stderr)를 돌려줌"""
+    def run(*args, stdin=""):
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+        try:
+            code = cli.main(list(args))
+        except SystemExit as e:
+            # 인터프리터처럼 문자열 종료 사유는 표준 오류에 쓰고 1로 끝냄
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+            code = e.code if isinstance(e.code, int) else 1
+        out, err = capfd.readouterr()
+        return subprocess.CompletedProcess(args, code, out, err)
+    return run
+
+
+def test_module_entry_point():
+    out = subprocess.run([sys.executable, "-m", "lotto", "count", "--engine", "pick", "-"], cwd=ROOT,
+                         input=LINES[1], capture_output=True, text=True)
+    assert out.returncode == 0 and json.loads(out.stdout)["name"] == "first"
+    assert subprocess.run([sys.executable, "-m", "lotto"], cwd=ROOT, capture_output=True).returncode == 2
+
+
+def read_csv(text):
+    rows = list(csv.reader(io.StringIO(text)))
+    return rows[0], [list(map(int, row)) for row in rows[1:]]
+
+
+@pytest.mark.parametrize("engine, count", [
+    ("pick", lambda inputs, filtered: pick.calc_unique_combinations(inputs, 1 if filtered else 6)),
+    ("maxtwo", lambda inputs, filtered: sum(len(b) for b in maxtwo.iter_valid_blocks(inputs, 1 if filtered else 6))),
+    ("product", lambda inputs, filtered: (product.calc_filtered_combinations if filtered
+                                          else product.calc_unique_combinations)(inputs)),
+])
+@pytest.mark.parametrize("filtered", [False, True])
+def test_count(input_file, engine, count, filtered, run):
+    out = run("count", "--engine", engine, *(["--filtered"] if filtered else []), input_file)
+    assert out.returncode == 0, out.stderr
+    records = [json.loads(line) for line in out.stdout.splitlines()]
+    assert [(r["index"], r["name"]) for r in records] == [(0, "first"), (1, "line4")]
+    assert [r["count"] for r in records] == [count(inputs, filtered) for inputs in SETS]
+
+
+def test_count_with_rules_matches_generate(input_file, run):
+    rules = ["--rules", "sum=20-40, odd=2-4"]
+    counted = run("count", "--engine", "product", *rules, input_file)
+    generated = run("generate", "--engine", "product", *rules, input_file)
+    assert counted.returncode == generated.returncode == 0
+    _, rows = read_csv(generated.stdout)
+    per_set = [sum(1 for row in rows if row[0] == i) for i in range(2)]
+    assert [json.loads(line)["count"] for line in counted.stdout.splitlines()] == per_set
+    assert all(20 <= sum(row[1:]) <= 40 for row in rows)
+
+
+def test_generate_to_stdout(input_file, run):
+    out = run("generate", "--engine", "pick", input_file)
+    assert out.returncode == 0, out.stderr
+    header, rows = read_csv(out.stdout)
+    assert header[0] == "세트" and len(header) == 7
+    for i, inputs in enumerate(SETS):
+        expected = [list(row) for block in pick.iter_search_blocks(inputs) for row in np.asarray(block).tolist()]
+        assert [row[1:] for row in rows if row[0] == i] == expected
+
+
+def test_generate_out_dir(input_file, tmp_path, run):
+    out_dir = tmp_path / "out"
+    out = run("generate", "--engine", "product", "--format", "NPY", "--out-dir", str(out_dir), input_file)
+    assert out.returncode == 0, out.stderr
+    records = [json.loads(line) for line in out.stdout.splitlines()]
+    for record, inputs in zip(records, SETS):
+        data = np.load(record["path"])
+        assert os.path.basename(record["path"]) == f"{record['name']}.npy"
+        assert len(data) == record["rows"] == product.calc_unique_combinations(inputs)
+
+
+def test_sample_and_duplicates(input_file, run):
+    out = run("sample", "-k", "5", "--distinct", input_file)
+    assert out.returncode == 0, out.stderr
+    _, rows = read_csv(out.stdout)
+    assert [sum(1 for row in rows if row[0] == i) for i in range(2)] == [5, 5]
+    assert len({tuple(sorted(row[1:])) for row in rows if row[0] == 1}) == 5
+
+    out = run("duplicates", "-", stdin=json.dumps([list(range(1, 9))] * 2 + [[1, 2, 3, 4, 5, 6, 9]] + [[]] * 3))
+    assert out.returncode == 0, out.stderr
+    header, rows = read_csv(out.stdout)
+    assert header[1:] == overlap.RESULT_COLUMNS
+    assert len(rows) == 28 and all(row[-1] == (3 if row[1:7] == [1, 2, 3, 4, 5, 6] else 2) for row in rows)
+
+
+@pytest.mark.parametrize("rules", ["sum=abc", "size=3", "odd", "sum=10-", "odd=5-2", "group=0"])
+def test_bad_rules_exit_2(input_file, rules, run):
+    out = run("count", "--engine", "pick", "--rules", rules, input_file)
+    assert out.returncode == 2
+    assert "--rules" in out.stderr and out.stdout == ""
+
+
+@pytest.mark.parametrize("line, message", [
+    ("1 2 | 3 4", "칸이 6개가 아닙니다"),
+    ("1 2 | 3 | 4 | 5 | 6 | 300", "0~255"),
+    ("1 2 | x | 4 | 5 | 6 | 7", "invalid literal"),
+    ('{"name": "no columns"}', "columns"),
+])
+def test_bad_input_exit_2(line, message, run):
+    out = run("count", "--engine", "maxtwo", "-", stdin=LINES[1] + "\n" + line + "\n")
+    assert out.returncode == 2
+    assert out.stderr.startswith("오류: ") and ":2:" in out.stderr and message in out.stderr
+    assert json.loads(out.stdout)["index"] == 0  # 앞 줄의 결과는 이미 나감
+
+
+def test_usage_errors(run):
+    assert run("count", "-").returncode == 2  # --engine 누락
+    out = run("generate", "--engine", "pick", "--format", "NPY", "-", stdin=LINES[1])
+    assert out.returncode != 0 and "--out-dir" in out.stderr
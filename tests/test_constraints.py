@@ -0,0 +1,127 @@
+"""제약 조건(벡터 검사, 점진 검사기, 엔진 가지치기)을 규칙 정의 그대로의 검사와 비교"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from lotto import FILTER_NUMBERS, maxtwo, pick, product
+from lotto.constraints import Constraints
+
+# 합계/구간 규칙이 갈리도록 넓힌 숫자 풀
+NUMBERS = list(range(1, 31)) + sorted(FILTER_NUMBERS)[:3]
+
+
+def random_rules(rng):
+    parts = []
+    if rng.random() < 0.5:
+        parts.append(f"filter={rng.randint(0, 2)}")
+    if rng.random() < 0.6:
+        low = rng.randint(40, 120)
+        parts.append(f"sum={low}-{low + rng.randint(0, 80)}")
+    if rng.random() < 0.6:
+        low = rng.randint(0, 4)
+        parts.append(f"odd={low}-{rng.randint(low, 6)}")
+    if rng.random() < 0.5:
+        parts.append(f"consecutive={rng.randint(1, 3)}")
+    if rng.random() < 0.5:
+        parts.append(f"group={rng.randint(1, 3)}")
+    return ", ".join(parts) or "sum=0-1000"
+
+
+def accepts(text, combo):
+    """규칙 문자열을 정의대로 하나씩 검사"""
+    combo = sorted(combo)
+    for part in text.split(","):
+        name, _, value = part.strip().partition("=")
+        low, _, high = value.partition("-")
+        low = int(low)
+        high = int(high) if high else low
+        if name == "filter" and sum(num in FILTER_NUMBERS for num in combo) > high:
+            return False
+        if name == "sum" and not low <= sum(combo) <= high:
+            return False
+        if name == "odd" and not low <= sum(num % 2 for num in combo) <= high:
+            return False
+        if name == "consecutive":
+            run = longest = 1
+            for a, b in zip(combo, combo[1:]):
+                run = run + 1 if b == a + 1 else 1
+                longest = max(longest, run)
+            if longest > high:
+                return False
+        if name == "group":
+            groups = [max(num - 1, 0) // 10 for num in combo]
+            if max(groups.count(g) for g in groups) > high:
+                return False
+    return True
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_mask_and_checker_match_rules(seed):
+    rng = random.Random(seed)
+    text = random_rules(rng)
+    constraints = Constraints.parse(text)
+    numbers = sorted(rng.sample(NUMBERS, 11))
+    combos = list(itertools.combinations(numbers, 6))
+    expected = [accepts(text, combo) for combo in combos]
+    assert constraints.mask(combos).tolist() == expected
+
+    checker = constraints.compile(numbers)
+    for combo, ok in zip(combos, expected):
+        order = list(combo)
+        rng.shuffle(order)
+        state = checker.start
+        for num in order:
+            state = checker.push(state, checker.delta([num]))
+            if state is None:
+                break
+        # 만족하는 조합의 가지는 잘리면 안 되고, 여섯 숫자를 다 고른 뒤의 판정은 정확해야 함
+        assert (state is not None) == ok, (text, combo)
+
+
+def rows_of(blocks):
+    return sorted(tuple(sorted(row)) for block in blocks for row in np.asarray(block).tolist())
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_engines_prune_exactly(seed, random_inputs):
+    rng = random.Random(seed)
+    inputs = random_inputs(rng, pool=NUMBERS)
+    text = random_rules(rng)
+    constraints = Constraints.parse(text)
+    engines = [
+        (lambda c: pick.iter_search_blocks(inputs, constraints=c)),
+        (lambda c: maxtwo.iter_valid_blocks(inputs, constraints=c)),
+        (lambda c: product.iter_valid_blocks(inputs, constraints=c)),
+    ]
+    for blocks in engines:
+        expected = [row for row in rows_of(blocks(None)) if accepts(text, row)]
+        assert rows_of(blocks(constraints)) == expected, text
+
+
+def test_parse_accepts_valid_rules():
+    constraints = Constraints.parse(" sum = 100 - 160 , odd=2-4,, filter=0, consecutive=6, group=1 ")
+    assert constraints.key() == Constraints.parse("sum=100-160, odd=2-4, filter=0, consecutive=6, group=1").key()
+    assert Constraints.parse("odd=3") == Constraints.parse("odd=3-3")
+    assert not Constraints.parse(" , ")
+
+
+@pytest.mark.parametrize("text, message", [
+    ("size=3", "알 수 없는 조건입니다: size=3"),
+    ("sum=", "알 수 없는 조건입니다: sum="),
+    ("sum=abc", "정수여야 합니다: sum=abc"),
+    ("sum=1.5", "정수여야 합니다"),
+    ("sum=10-", "정수여야 합니다: sum=10-"),
+    ("sum=1-2-3", "정수여야 합니다"),
+    ("odd=-1", "정수여야 합니다"),
+    ("sum=160-100", "최솟값이 최댓값보다 큽니다: sum=160-100"),
+    ("odd=5-2", "최솟값이 최댓값보다 큽니다"),
+    ("odd=2-7", "odd 값은 0~6이어야 합니다: odd=2-7"),
+    ("filter=7", "filter 값은 0~6"),
+    ("consecutive=0", "consecutive 값은 1~6"),
+    ("group=9", "group 값은 1~6"),
+])
+def test_parse_rejects_bad_rules(text, message):
+    with pytest.raises(ValueError, match=message):
+        Constraints.parse(f"sum=0-1000, {text}")
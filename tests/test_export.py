@@ -0,0 +1,88 @@
+"""내보내기 형식별 왕복 (빈 결과, 여러 청크, 블록 제너레이터)"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lotto import export
+from lotto.results import ComboArray
+
+COLUMNS = [f"숫자{i+1}" for i in range(6)]
+ROWS = np.random.default_rng(0).integers(1, 46, size=(25, 6)).astype(np.uint8)
+
+
+def sources(rows):
+    """같은 행을 배열, ComboArray, 블록 제너레이터(크기가 고르지 않은 블록)로"""
+    result = ComboArray(6)
+    result.append(rows)
+    return {
+        "array": rows,
+        "combo_array": result,
+        "blocks": lambda: (rows[start:start + size] for start, size in zip([0, 3, 3, 10], [3, 0, 7, 15])),
+    }
+
+
+def read_back(data, fmt):
+    if fmt == "CSV":
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig")
+    if fmt == "Parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    return np.load(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("fmt", export.available_formats())
+@pytest.mark.parametrize("source", ["array", "combo_array", "blocks"])
+@pytest.mark.parametrize("n", [0, 1, 25])
+def test_round_trip(fmt, source, n):
+    rows = ROWS[:n]
+    given = sources(rows)[source]
+    # chunk_rows=4라 25행은 7개 청크로 나뉘어 기록됨
+    data = export.export_rows(given() if callable(given) else given, COLUMNS, fmt, chunk_rows=4).read()
+    back = read_back(data, fmt)
+    if fmt == "NPY":
+        assert back.dtype == np.uint8 and back.shape == (n, 6)
+        assert np.array_equal(back, rows)
+        return
+    assert list(back.columns) == COLUMNS
+    assert np.array_equal(back.to_numpy(), rows.reshape(-1, 6))
+    if fmt == "Parquet":
+        assert all(dtype == np.uint8 for dtype in back.dtypes)
+
+
+def test_csv_has_a_single_bom():
+    data = export.export_rows(ROWS, COLUMNS, "CSV", chunk_rows=4).read()
+    assert data.startswith(b"\xef\xbb\xbf")
+    assert data.count(b"\xef\xbb\xbf") == 1
+    assert data.decode("utf-8-sig").splitlines()[1] == ",".join(map(str, ROWS[0]))
+
+
+def test_csv_without_bom():
+    data = export.export_rows(ROWS, COLUMNS, "CSV", encoding="utf-8").read()
+    assert data.startswith(COLUMNS[0].encode())
+
+
+def test_npy_header_is_aligned():
+    data = export.export_rows(ROWS, COLUMNS, "NPY").read()
+    f = io.BytesIO(data)
+    assert np.lib.format.read_magic(f) == (1, 0)
+    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    assert shape == (25, 6) and not fortran_order and dtype == np.uint8
+    assert f.tell() % 64 == 0
+
+
+@pytest.mark.parametrize("fmt", ["Parquet", "NPY"])
+def test_binary_formats_reject_out_of_range(fmt):
+    if fmt not in export.available_formats():
+        pytest.skip("pyarrow 없음")
+    with pytest.raises(ValueError):
+        export.export_rows(np.array([[1, 2, 3, 4, 5, 300]]), COLUMNS, fmt)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="지원하지 않는 형식"):
+        export.export_rows(ROWS, COLUMNS, "XLSX")
+
+
+def test_file_info():
+    assert export.file_info("NPY", "result") == ("result.npy", "application/octet-stream")
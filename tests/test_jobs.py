@@ -0,0 +1,119 @@
+"""작업 실행기: 상태 전이, 취소, 행 수/시간 상한, 캐시·저장소로 넘기기"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from lotto import jobs
+from lotto.budget import WorkBudget
+from lotto.cache import ResultCache
+from lotto.results import StoredResult
+from lotto.store import ResultStore
+
+ROWS = np.arange(1, 61, dtype=np.uint8).reshape(10, 6)
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs, "result_cache", ResultCache())
+    monkeypatch.setattr(jobs, "result_store", ResultStore(str(tmp_path)))
+    return jobs.JobRunner(max_workers=1, budget=WorkBudget())
+
+
+def blocks(sizes, delay=0.0):
+    """ROWS를 sizes 크기의 블록으로 나눠 내는 blocks_factory"""
+    def factory(stats):
+        start = 0
+        for size in sizes:
+            time.sleep(delay)
+            stats["nodes"] += 1
+            yield ROWS[start:start + size]
+            start += size
+    return factory
+
+
+def wait(runner, job):
+    """작업 스레드가 하나이므로 뒤에 넣은 빈 작업이 끝나면 앞의 작업도 (예산 반환까지) 끝남"""
+    runner._pool.submit(lambda: None).result(timeout=5)
+    assert not job.active
+    return job
+
+
+def test_done_result_goes_to_store_and_cache(runner):
+    key = ("test", ((1,),), ())
+    job = wait(runner, runner.submit(blocks([4, 6]), cache_key=key, total=10))
+    assert job.status == jobs.DONE and job.complete and job.nodes == 2
+    assert isinstance(job.result, StoredResult)
+    assert np.array_equal(np.asarray(job.result), ROWS)
+    assert jobs.result_cache.get(key) is job.result
+    assert runner.budget.reserved == 0
+
+    # 같은 키는 실행하지 않고 캐시에서, 캐시가 비면 저장소에서 완료된 작업으로 돌려줌
+    again = runner.submit(blocks([]), cache_key=key)
+    assert again.status == jobs.DONE and again.result is job.result
+    jobs.result_cache.clear()
+    restored = runner.restore(key)
+    assert np.array_equal(np.asarray(restored.result), ROWS)
+    assert runner.restore(("test", ((2,),), ())) is None
+
+
+@pytest.mark.parametrize("limit, sizes, rows, capped", [
+    (4, [3, 3, 4], 4, True),    # 블록 중간에서 잘림
+    (6, [3, 3, 4], 6, True),    # 블록 경계에서 멈췄지만 뒤에 행이 더 있음
+    (10, [3, 3, 4], 10, False),  # 정확히 limit행이면 상한에 걸린 것이 아님
+    (20, [3, 3, 4], 10, False),
+])
+def test_row_limit(runner, limit, sizes, rows, capped):
+    job = wait(runner, runner.submit(blocks(sizes), limit=limit))
+    assert job.status == jobs.DONE
+    assert job.rows == rows and job.capped == capped
+    assert np.array_equal(np.asarray(job.result), ROWS[:rows])
+
+
+def test_seconds_cap(runner):
+    job = wait(runner, runner.submit(blocks([1] * 10, delay=0.02), seconds=0.01))
+    assert job.status == jobs.DONE and job.capped and not job.complete
+    assert 1 <= job.rows < 10
+
+
+def test_cancel_keeps_partial_result_out_of_cache(runner):
+    key = ("test", ((3,),), ())
+    gate = threading.Event()
+
+    def factory(stats):
+        yield ROWS[:2]
+        gate.wait(5)
+        yield ROWS[2:]
+
+    job = runner.submit(factory, cache_key=key)
+    while job.rows < 2:
+        time.sleep(0.005)
+    assert job.status == jobs.RUNNING
+    job.cancel()
+    gate.set()
+    wait(runner, job)
+    assert job.status == jobs.CANCELLED and not job.complete
+    assert jobs.result_cache.get(key) is None and jobs.result_store.get(key) is None
+    assert runner.budget.reserved == 0
+
+
+def test_cancel_before_start(runner):
+    gate = threading.Event()
+    first = runner.submit(lambda stats: iter([gate.wait(5) and ROWS]))
+    second = runner.submit(blocks([10]))
+    assert second.status == jobs.PENDING
+    second.cancel()
+    gate.set()
+    wait(runner, first)
+    assert wait(runner, second).status == jobs.CANCELLED and second.rows == 0 and second.started is None
+
+
+def test_failure_is_reported(runner):
+    def factory(stats):
+        yield ROWS[:3]
+        raise RuntimeError("boom")
+
+    job = wait(runner, runner.submit(factory, cost=1.0))
+    assert job.status == jobs.FAILED and isinstance(job.error, RuntimeError)
+    assert runner.budget.reserved == 0
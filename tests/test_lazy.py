@@ -0,0 +1,35 @@
+"""LazyCombos 순위 접근을 엔진이 실제로 만든 결과 순서와 비교"""
+import random
+
+import numpy as np
+import pytest
+
+from lotto import maxtwo, pick
+
+
+def materialized(blocks):
+    return [tuple(row) for block in blocks for row in np.asarray(block).tolist()]
+
+
+ENGINES = {
+    "pick": (pick.lazy_combinations, pick.iter_search_blocks),
+    "maxtwo": (maxtwo.lazy_combinations, maxtwo.iter_valid_blocks),
+}
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("seed", range(15))
+def test_unrank_follows_engine_order(engine, seed, random_inputs):
+    lazy_combinations, iter_blocks = ENGINES[engine]
+    inputs = random_inputs(random.Random(seed))
+    for max_filter in (1, 6):
+        rows = materialized(iter_blocks(inputs, max_filter))
+        view = lazy_combinations(inputs, max_filter)
+        assert len(view) == len(rows)
+        assert [tuple(view.unrank(i)) for i in range(len(rows))] == rows
+        assert [tuple(row) for row in view.page().tolist()] == rows
+        if rows:
+            start = len(rows) // 3
+            assert [tuple(row) for row in view.page(start, start + 7).tolist()] == rows[start:start + 7]
+            with pytest.raises(IndexError):
+                view.unrank(len(rows))
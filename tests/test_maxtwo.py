@@ -0,0 +1,50 @@
+"""maxtwo 엔진을 작은 무작위 입력에서 C(n, 6) 전수 검사와 비교"""
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from lotto import FILTER_NUMBERS, maxtwo
+
+
+def brute_rows(inputs):
+    """입력 숫자 합집합의 6개 조합 중 칸마다 최대 2개만 쓰는 조합 (오름차순)"""
+    numbers = sorted(set().union(*inputs))
+    return [
+        combo for combo in itertools.combinations(numbers, 6)
+        if all(len(set(combo) & set(col)) <= 2 for col in inputs)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_count_matches_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed))
+    rows = brute_rows(inputs)
+    by_filter = Counter(sum(num in FILTER_NUMBERS for num in row) for row in rows)
+    assert maxtwo.calc_unique_combinations(inputs) == len(rows)
+    assert maxtwo.calc_unique_combinations(inputs, by_filter=True) == dict(by_filter)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_scan_matches_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed))
+    rows = brute_rows(inputs)
+    for max_filter in (1, 6):
+        expected = [row for row in rows if sum(num in FILTER_NUMBERS for num in row) <= max_filter]
+        found = [tuple(row) for block in maxtwo.iter_valid_blocks(inputs, max_filter) for row in block.tolist()]
+        assert found == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_counter_matches_full_recount(seed, random_inputs, random_edits):
+    rng = random.Random(seed)
+    counter = maxtwo.IncrementalCounter()
+    inputs = random_inputs(rng, high=8)
+    for _ in range(300):
+        before = [tuple(col) for col in counter.columns]
+        changed = counter.update(inputs)
+        assert changed == [j for j in range(6) if tuple(inputs[j]) != before[j]]
+        assert counter.count() == maxtwo.calc_unique_combinations(inputs)
+        assert counter.count(by_filter=True) == maxtwo.calc_unique_combinations(inputs, by_filter=True)
+        inputs = random_edits(rng, inputs)
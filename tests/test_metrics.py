@@ -0,0 +1,114 @@
+"""측정 기록기: 단계 기록, 스레드별 현재 기록기, 설정 상속, 환경 변수로 켜는 메모리 추적"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from lotto import metrics
+
+
+@pytest.fixture(autouse=True)
+def no_current_recorder():
+    metrics.start("reset", enabled=False)
+    yield
+    metrics.start("reset", enabled=False)
+
+
+def test_stages_are_recorded_in_order():
+    recent = metrics.new_recent()
+    recorder = metrics.start("app.test", enabled=True, recent=recent, mode="pick")
+    assert metrics.current() is recorder
+    with metrics.stage("count") as stage:
+        stage.set(rows=10)
+    with pytest.raises(RuntimeError):
+        with metrics.stage("enumerate"):
+            raise RuntimeError  # 예외가 나도 단계는 기록됨
+    record = metrics.finish(status="done")
+    assert metrics.current() is None
+    assert record["request"] == "app.test" and record["mode"] == "pick" and record["status"] == "done"
+    assert [stage["name"] for stage in record["stages"]] == ["count", "enumerate"]
+    assert record["stages"][0]["rows"] == 10 and record["stages"][0]["seconds"] >= 0
+    assert list(recent) == [record]
+    json.dumps(record)
+
+
+def test_disabled_and_empty_recorders_record_nothing():
+    assert metrics.start("off", enabled=False) is metrics.NULL_RECORDER
+    with metrics.stage("count") as stage:
+        stage.set(rows=1)
+    assert metrics.finish() is None
+    recent = metrics.new_recent()
+    metrics.start("empty", enabled=True, recent=recent)
+    assert metrics.finish() is None and not recent  # 단계가 없으면 남기지 않음
+
+
+def test_recent_is_bounded():
+    recent = metrics.new_recent()
+    for i in range(metrics.RECENT_LIMIT + 5):
+        metrics.start(f"r{i}", enabled=True, recent=recent)
+        with metrics.stage("s"):
+            pass
+        metrics.finish()
+    assert len(recent) == metrics.RECENT_LIMIT and recent[0]["request"] == "r5"
+
+
+def test_current_recorder_is_per_thread():
+    main = metrics.start("main", enabled=True, recent=metrics.new_recent())
+    seen = {}
+
+    def worker():
+        seen["before"] = metrics.current()
+        other = metrics.start("worker", enabled=True, recent=metrics.new_recent())
+        with metrics.stage("work"):
+            pass
+        seen["worker"] = other
+        seen["record"] = metrics.finish()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen["before"] is None
+    assert seen["worker"] is not main and metrics.current() is main
+    assert seen["record"]["request"] == "worker" and main.stages == []
+
+
+def test_new_recorders_follow_the_session_settings():
+    recent = metrics.new_recent()
+    parent = metrics.start("page", enabled=True, recent=recent)
+    job = metrics.recorder("job")  # 현재 스레드의 기록기를 따름
+    assert job is not metrics.NULL_RECORDER and job.recent is recent
+    # 다른 스레드(작업, 다운로드)에서도 like로 넘긴 세션 설정을 따름
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(r=metrics.start("download", like=parent)))
+    thread.start()
+    thread.join()
+    assert result["r"].recent is recent
+    assert metrics.recorder("off", like=metrics.NULL_RECORDER) is metrics.NULL_RECORDER
+    assert metrics.current() is parent
+
+
+def run_with_env(env, code):
+    env = {**os.environ, **env, "PYTHONPATH": os.getcwd()}
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+MEMORY_PROBE = """
+import json, tracemalloc
+from lotto import metrics
+recorder = metrics.start("probe", enabled=True)
+with metrics.stage("alloc"):
+    data = bytearray(1 << 20)
+record = metrics.finish()
+print(json.dumps([tracemalloc.is_tracing(), metrics.enabled(), record["stages"][0]["peak_bytes"]]))
+"""
+
+
+def test_memory_tracing_is_env_gated():
+    tracing, enabled, peak = run_with_env({"LOTTO_METRICS_MEMORY": "1", "LOTTO_METRICS": "1"}, MEMORY_PROBE)
+    assert tracing and enabled and peak >= 1 << 20
+    tracing, enabled, peak = run_with_env({"LOTTO_METRICS_MEMORY": "0", "LOTTO_METRICS": ""}, MEMORY_PROBE)
+    assert not tracing and not enabled and peak is None
@@ -0,0 +1,38 @@
+"""overlap 엔진을 작은 무작위 입력에서 칸별 C(n, 6) 전수 열거와 비교"""
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from lotto import overlap
+
+
+def overlapping_inputs(rng):
+    # 칸끼리 많이 겹치도록 작은 공통 풀에서 뽑음 (6개 미만인 칸도 섞임)
+    pool = rng.sample(range(1, 30), 11)
+    return [sorted(rng.sample(pool, rng.randint(4, 10))) for _ in range(6)]
+
+
+def brute_duplicates(inputs):
+    """두 칸 이상에서 나오는 6개 조합과 등장 칸 수"""
+    counts = Counter(combo for col in inputs for combo in itertools.combinations(col, 6))
+    return {combo: n for combo, n in counts.items() if n >= 2}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_duplicates_match_brute_force(seed):
+    inputs = overlapping_inputs(random.Random(seed))
+    found = {}
+    for block in overlap.iter_duplicate_blocks(inputs, block_size=64):
+        for row in block.tolist():
+            assert tuple(row[:6]) not in found
+            found[tuple(row[:6])] = row[6]
+    assert found == brute_duplicates(inputs)
+
+
+def test_identical_and_disjoint_columns():
+    same = [list(range(1, 10))] * 6
+    assert dict(overlap.analyze_duplicates(same)) == {combo: 6 for combo in itertools.combinations(range(1, 10), 6)}
+    disjoint = [list(range(10 * c + 1, 10 * c + 8)) for c in range(6)]
+    assert overlap.analyze_duplicates(disjoint) == []
@@ -0,0 +1,59 @@
+"""여러 프로세스로 나눈 병렬 열거가 직렬 커널과 같은 행을 같은 순서로 내는지 확인
+
+작업 프로세스는 spawn으로 띄우므로(서버와 같은 방식) 이 파일을 직접 실행할 때도
+__main__ 가드 안에서만 테스트를 시작한다.
+"""
+import random
+import sys
+
+import numpy as np
+import pytest
+
+from lotto import maxtwo, parallel, pick, product
+from lotto.constraints import Constraints
+
+ENGINES = {
+    "pick": (lambda inputs, c: pick.iter_search_blocks(inputs, 2, constraints=c),
+             lambda inputs, c, stats: pick.iter_search_blocks_parallel(inputs, 2, stats, constraints=c)),
+    "maxtwo": (lambda inputs, c: maxtwo.iter_valid_blocks(inputs, 2, constraints=c),
+               lambda inputs, c, stats: maxtwo.iter_valid_blocks_parallel(inputs, 2, stats, constraints=c)),
+    "product": (lambda inputs, c: product.iter_valid_blocks(inputs, True, constraints=c),
+                lambda inputs, c, stats: product.iter_valid_blocks(inputs, True, True, stats, constraints=c)),
+}
+RULES = [None, "sum=70-150, odd=2-4, consecutive=2"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def spawn_pool():
+    """샤드가 여러 개로 나뉘도록 두 프로세스짜리 spawn 풀을 새로 띄우고 끝나면 닫음"""
+    saved = parallel.PROCESSES
+    parallel.PROCESSES = 2
+    parallel._reset_pool()
+    pool = parallel.get_pool()
+    assert pool._mp_context.get_start_method() == "spawn"
+    yield
+    pool.shutdown()
+    parallel._reset_pool()
+    parallel.PROCESSES = saved
+
+
+def rows_of(blocks):
+    return [tuple(row) for block in blocks for row in np.asarray(block).tolist()]
+
+
+@pytest.mark.parametrize("rules", RULES)
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("seed", range(2))
+def test_parallel_matches_serial(engine, rules, seed):
+    rng = random.Random(seed)
+    inputs = [sorted(rng.sample(range(1, 31), rng.randint(5, 8))) for _ in range(6)]
+    constraints = Constraints.parse(rules) if rules else None
+    serial, sharded = ENGINES[engine]
+    expected = rows_of(serial(inputs, constraints))
+    stats = {"nodes": 0}
+    assert rows_of(sharded(inputs, constraints, stats)) == expected
+    assert expected and stats["nodes"] > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,35 @@
+"""pick 엔진을 작은 무작위 입력에서 전수 탐색과 비교"""
+import itertools
+import random
+
+import pytest
+
+from lotto import FILTER_NUMBERS, pick
+
+
+def brute_rows(inputs, max_filter=6):
+    """칸마다 1~2개씩 골라 겹치지 않는 숫자 6개가 되는 모든 선택 (칸 순서대로 이어 붙인 튜플)"""
+    rows = []
+    for sizes in itertools.product([1, 2], repeat=6):
+        if sum(sizes) != 6:
+            continue
+        for parts in itertools.product(*(itertools.combinations(col, k) for col, k in zip(inputs, sizes))):
+            row = sum(parts, ())
+            if len(set(row)) == 6 and sum(num in FILTER_NUMBERS for num in row) <= max_filter:
+                rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_count_matches_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed))
+    for max_filter in (1, 6):
+        assert pick.calc_unique_combinations(inputs, max_filter) == len(brute_rows(inputs, max_filter))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_search_matches_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed))
+    for max_filter in (1, 6):
+        rows = [tuple(row) for block in pick.iter_search_blocks(inputs, max_filter) for row in block]
+        assert sorted(rows) == sorted(brute_rows(inputs, max_filter))
@@ -0,0 +1,120 @@
+"""product 엔진을 작은 무작위 입력에서 전수 열거(itertools.product)와 비교"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from lotto import FILTER_NUMBERS, product
+
+
+def brute_rows(inputs, filtered=False):
+    """칸마다 하나씩 고른 곱 중 숫자가 겹치지 않는 (필터면 필터 숫자 최대 1개) 배치"""
+    rows = []
+    for row in itertools.product(*inputs):
+        if len(set(row)) < 6:
+            continue
+        if filtered and sum(num in FILTER_NUMBERS for num in row) > 1:
+            continue
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_counts_match_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed))
+    assert product.calc_unique_combinations(inputs) == len(brute_rows(inputs))
+    assert product.calc_filtered_combinations(inputs) == len(brute_rows(inputs, filtered=True))
+    assert product.calc_max_combinations(inputs) == len(list(itertools.product(*inputs)))
+
+
+def test_identical_columns():
+    # 같은 n개 숫자 칸 여섯 개: 순열 수 n!/(n-6)!
+    inputs = [list(range(1, 9))] * 6
+    assert product.calc_unique_combinations(inputs) == 8 * 7 * 6 * 5 * 4 * 3
+
+
+def test_empty_column():
+    inputs = [[1, 2], [3], [], [4], [5], [6]]
+    assert product.calc_unique_combinations(inputs) == 0
+    assert product.calc_filtered_combinations(inputs) == 0
+
+
+def brute_distinct(inputs, filtered=False):
+    """유효 배치를 번호 조합(정렬)별로 묶은 {조합: 배치 수}"""
+    counts = {}
+    for row in brute_rows(inputs, filtered):
+        key = tuple(sorted(row))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_distinct_counts_match_brute_force(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed), high=6)
+    for filtered in (False, True):
+        expected = brute_distinct(inputs, filtered)
+        assert product.calc_distinct_combinations(inputs, filtered) == len(expected)
+        rows = [tuple(row) for block in product.iter_distinct_blocks(inputs, filtered) for row in block.tolist()]
+        assert len(rows) == len(expected)
+        assert {tuple(sorted(row)) for row in rows} == set(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_ryser_assignment_counts(seed, random_inputs):
+    # 번호 조합마다 칸 배치 수 = 칸 × 숫자 소속 행렬의 퍼머넌트
+    inputs = random_inputs(random.Random(seed), high=6)
+    expected = brute_distinct(inputs)
+    if not expected:
+        return
+    rows = np.array(sorted(expected), dtype=np.uint8)
+    counts = product._assignment_counts(rows, product._product_tables(inputs))
+    assert counts.tolist() == [expected[key] for key in sorted(expected)]
+
+
+def test_keyset_marks_first_new_keys(monkeypatch):
+    # 합치기 경로도 타도록 최근분 한도를 낮춤
+    monkeypatch.setattr(product, "ENUM_BLOCK_SIZE", 64)
+    rng = np.random.default_rng(0)
+    keyset = product.KeySet()
+    seen = set()
+    for _ in range(200):
+        keys = rng.integers(0, 5000, size=rng.integers(0, 400)).astype(np.uint64)
+        expected = []
+        for key in keys.tolist():
+            expected.append(key not in seen)
+            seen.add(key)
+        assert keyset.add(keys).tolist() == expected
+        assert len(keyset) == len(seen)
+
+
+def test_set_keys_round_trip():
+    rows = np.sort(np.random.default_rng(1).choice(256, size=(100, 6)), axis=1).astype(np.uint8)
+    assert (product.keys_to_rows(product.set_keys(rows)) == rows).all()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_distinct_sample_is_valid_and_unique(seed, random_inputs):
+    inputs = random_inputs(random.Random(seed), high=6)
+    expected = brute_distinct(inputs)
+    k = len(expected) // 3 + 1
+    picked = [tuple(sorted(row)) for row in np.asarray(product.sample_combinations(inputs, k, distinct=True)).tolist()]
+    assert len(picked) == min(k, len(expected))
+    assert len(set(picked)) == len(picked)
+    assert set(picked) <= set(expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_counter_matches_full_recount(seed, random_inputs, random_edits):
+    rng = random.Random(seed)
+    counter = product.IncrementalCounter()
+    inputs = random_inputs(rng, high=8)
+    for _ in range(300):
+        before = list(counter.columns)
+        changed = counter.update(inputs)
+        assert changed == [j for j in range(6) if tuple(inputs[j]) != before[j]]
+        assert counter.update(inputs) == []
+        assert counter.max_count() == product.calc_max_combinations(inputs)
+        assert counter.unique_count() == product.calc_unique_combinations(inputs)
+        assert counter.filtered_count() == product.calc_filtered_combinations(inputs)
+        inputs = random_edits(rng, inputs)
@@ -0,0 +1,60 @@
+"""조합 순위 색인을 itertools.combinations 사전순 번호와 파이썬 집합 연산으로 검사"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from lotto import rank_index
+from lotto.rank_index import RankIndex
+
+
+def combos(numbers):
+    return np.array(list(itertools.combinations(numbers, 6)), dtype=np.int64)
+
+
+def test_ranks_are_colex_positions():
+    # 조합 수 체계 순위는 colex 순서의 번호 (큰 숫자부터 비교한 사전순)
+    rows = combos(range(12))
+    expected = sorted(range(len(rows)), key=lambda i: tuple(reversed(rows[i])))
+    order = np.argsort(rank_index.ranks(rows))
+    assert order.tolist() == expected
+    assert sorted(rank_index.ranks(rows).tolist()) == list(range(len(rows)))
+
+
+def test_round_trip_and_order_independence():
+    rng = np.random.default_rng(0)
+    rows = np.sort(np.stack([rng.choice(256, 6, replace=False) for _ in range(500)]), axis=1)
+    values = rank_index.ranks(rows)
+    assert (rank_index.unrank(values) == rows).all()
+    shuffled = rng.permuted(rows, axis=1)
+    assert (rank_index.ranks(shuffled) == values).all()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_set_operations_match_python_sets(seed):
+    rng = random.Random(seed)
+    universe = [tuple(row) for row in combos(sorted(rng.sample(range(1, 46), 10))).tolist()]
+    a = set(rng.sample(universe, rng.randint(0, len(universe))))
+    b = set(rng.sample(universe, rng.randint(0, len(universe))))
+    index_a = RankIndex.from_rows(np.array(sorted(a) * 2, dtype=np.int64).reshape(-1, 6))
+    index_b = RankIndex.from_blocks([np.array(sorted(b), dtype=np.int64).reshape(-1, 6)])
+    assert len(index_a) == len(a)
+
+    def as_set(index):
+        return {tuple(row) for row in index[:].tolist()}
+
+    assert as_set(index_a & index_b) == a & b
+    assert as_set(index_a | index_b) == a | b
+    assert as_set(index_a - index_b) == a - b
+    probe = rng.sample(universe, 30)
+    assert index_a.contains(np.array(probe)).tolist() == [combo in a for combo in probe]
+    if a:
+        assert next(iter(a)) in index_a
+
+
+def test_parse_tickets():
+    rows, bad = rank_index.parse_tickets(["번호1,번호2,번호3,번호4,번호5,번호6", "6 5 4 3 2 1", "", "1 2 3", "1;2;3;4;5;300",
+                                         "7|8|9|10|11|12", "1 1 2 3 4 5"])
+    assert rows.tolist() == [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]]
+    assert bad == [4, 5, 7]
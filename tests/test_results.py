@@ -0,0 +1,67 @@
+"""ComboArray의 증가/붙이기, 슬라이스, uint8 범위 검사와 check_numbers"""
+import numpy as np
+import pytest
+
+from lotto.results import MAX_NUMBER, ComboArray, check_numbers
+
+
+def test_append_grows_and_keeps_rows():
+    rng = np.random.default_rng(1)
+    result = ComboArray(capacity=4)
+    expected = []
+    for size in [3, 0, 1, 7, 20, 2]:
+        block = rng.integers(1, 46, size=(size, 6))
+        result.append(block)
+        expected.append(block)
+    expected = np.concatenate(expected)
+    assert len(result) == len(expected) == 33
+    assert result.capacity_bytes >= result.nbytes == 33 * 6
+    assert np.array_equal(np.asarray(result), expected)
+    assert result.data.dtype == np.uint8
+
+
+def test_append_tuple_lists_and_width():
+    result = ComboArray(width=7)
+    result.append([(1, 2, 3, 4, 5, 6, 2), (7, 8, 9, 10, 11, 12, 3)])
+    result.append([])
+    assert result.data.tolist() == [[1, 2, 3, 4, 5, 6, 2], [7, 8, 9, 10, 11, 12, 3]]
+    with pytest.raises(ValueError):
+        result.append(np.arange(6))  # 한 행이 width와 맞지 않음
+
+
+def test_slicing_is_a_read_only_view():
+    result = ComboArray.from_blocks([np.arange(1, 61).reshape(10, 6)])
+    assert result[2:4].tolist() == [[13, 14, 15, 16, 17, 18], [19, 20, 21, 22, 23, 24]]
+    assert result[-1].tolist() == [55, 56, 57, 58, 59, 60]
+    assert np.shares_memory(result[2:4], result.data)
+    with pytest.raises(ValueError):
+        result.data[0, 0] = 0
+    frame = result.to_frame(list("abcdef"), 8)
+    assert frame.to_numpy().tolist() == result[8:].tolist()
+
+
+@pytest.mark.parametrize("bad", [-1, MAX_NUMBER + 1])
+def test_append_rejects_out_of_range(bad):
+    result = ComboArray()
+    with pytest.raises(ValueError, match="범위"):
+        result.append(np.array([[1, 2, 3, 4, 5, bad]]))
+    assert len(result) == 0
+    result.append(np.array([[0, 1, 2, 3, 4, MAX_NUMBER]]))
+    assert result[0].tolist() == [0, 1, 2, 3, 4, MAX_NUMBER]
+
+
+def test_freeze_trims_and_blocks_append():
+    result = ComboArray(capacity=100)
+    result.append(np.ones((3, 6), dtype=np.uint8))
+    assert result.freeze() is result
+    assert result.capacity_bytes == result.nbytes == 18
+    with pytest.raises(ValueError):
+        result.append(np.ones((1, 6), dtype=np.uint8))
+
+
+def test_check_numbers():
+    check_numbers([[0, 1, 45], [MAX_NUMBER], []])
+    with pytest.raises(ValueError, match=r"입력: -3, 256\)$"):
+        check_numbers([[1, 256], [-3, 256]])
+    with pytest.raises(ValueError, match=r"\.\.\.\)$"):
+        check_numbers([list(range(300, 320))])
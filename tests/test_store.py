@@ -0,0 +1,135 @@
+"""디스크 결과 저장소: 저장/읽기, 메타데이터, 예산 정리 순서, 지우기, 다시 열기"""
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from lotto.cache import make_key
+from lotto.results import ComboArray, StoredResult
+from lotto.store import ResultStore
+
+ROWS = np.arange(1, 61, dtype=np.uint8).reshape(10, 6)
+# 10행 NPY 파일 하나는 헤더 128바이트 + 60바이트
+FILE_BYTES = 128 + ROWS.nbytes
+
+
+def key(i):
+    return make_key("pick", [[i, i + 1], [20]], max_filter=6)
+
+
+def meta_of(store, k):
+    with open(store._paths(k)[1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def age(store, k, seconds):
+    """결과의 최근 사용 시각을 seconds초 전으로 (예산 정리 순서를 정함)"""
+    then = time.time() - seconds
+    os.utime(store._paths(k)[1], (then, then))
+
+
+def test_put_get_and_metadata(tmp_path):
+    store = ResultStore(str(tmp_path))
+    result = store.put(key(1), ComboArray.from_blocks([ROWS]))
+    assert isinstance(result, StoredResult) and len(result) == 10
+    assert np.array_equal(np.asarray(result), ROWS)
+
+    meta = meta_of(store, key(1))
+    assert meta["key"] == repr(key(1)) and meta["variant"] == "pick"
+    assert meta["inputs"] == [[1, 2], [20]] and meta["options"] == repr((("max_filter", 6),))
+    assert (meta["rows"], meta["width"], meta["bytes"]) == (10, 6, FILE_BYTES)
+    assert meta["created"] <= time.time()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+    again = store.get(key(1))
+    assert np.array_equal(again[2:4], ROWS[2:4])
+    assert store.get(key(2)) is None
+
+
+def test_put_blocks_and_width(tmp_path):
+    store = ResultStore(str(tmp_path))
+    blocks = (np.column_stack([ROWS[i:i + 3], np.full(len(ROWS[i:i + 3]), 2)]) for i in range(0, 10, 3))
+    result = store.put(key(1), blocks, width=7)
+    assert result.width == 7 and result.data.shape == (10, 7)
+    assert np.array_equal(result.data[:, :6], ROWS) and (result.data[:, 6] == 2).all()
+
+
+def test_reopen_after_restart(tmp_path):
+    ResultStore(str(tmp_path)).put(key(1), ROWS)
+    # 새 저장소 객체(서버 재시작)도 같은 디렉터리의 결과를 찾음
+    restarted = ResultStore(str(tmp_path))
+    result = restarted.get(key(1))
+    assert np.array_equal(np.asarray(result), ROWS)
+    # 다른 프로세스로 넘긴 핸들은 경로로 다시 엶
+    moved = pickle.loads(pickle.dumps(result))
+    assert moved._data is None and np.array_equal(np.asarray(moved), ROWS)
+
+
+def test_rejects_mismatched_or_truncated_files(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.put(key(1), ROWS)
+    data_path, meta_path = store._paths(key(1))
+    meta = meta_of(store, key(1))
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({**meta, "key": repr(key(2))}, f)  # 해시 충돌
+    assert store.get(key(1)) is None
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    assert store.get(key(1)) is not None
+    with open(data_path, "r+b") as f:
+        f.truncate(FILE_BYTES - 1)
+    assert store.get(key(1)) is None
+
+
+def test_prune_evicts_least_recently_read(tmp_path):
+    store = ResultStore(str(tmp_path), budget_bytes=2 * FILE_BYTES)
+    store.put(key(1), ROWS)
+    store.put(key(2), ROWS)
+    age(store, key(1), 30)
+    age(store, key(2), 20)
+    kept = store.get(key(1))  # 읽으면 가장 최근에 쓴 결과가 됨
+    store.put(key(3), ROWS)
+    assert store.get(key(2)) is None
+    assert store.get(key(1)) is not None and store.get(key(3)) is not None
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for k in (1, 3) for p in store._paths(key(k)))
+    assert np.array_equal(np.asarray(kept), ROWS)
+
+
+def test_evicted_handle_stays_readable(tmp_path):
+    store = ResultStore(str(tmp_path), budget_bytes=FILE_BYTES)
+    first = store.put(key(1), ROWS)
+    age(store, key(1), 30)
+    store.put(key(2), ROWS)
+    assert store.get(key(1)) is None
+    assert np.array_equal(np.asarray(first), ROWS)
+
+
+def test_discard(tmp_path):
+    store = ResultStore(str(tmp_path))
+    result = store.put(key(1), ROWS)
+    other = ResultStore(str(tmp_path / "other")).put(key(1), ROWS)
+    store.discard(other)  # 다른 저장소의 파일은 건드리지 않음
+    store.discard(ComboArray.from_blocks([ROWS]))
+    assert store.get(key(1)) is not None and os.path.exists(other.path)
+    store.discard(result)
+    assert store.get(key(1)) is None
+    assert not os.path.exists(result.path)
+    store.discard(result)  # 이미 지운 결과
+    assert np.array_equal(np.asarray(result), ROWS)
+
+
+def test_disabled_or_oversized(tmp_path):
+    disabled = ResultStore(str(tmp_path), budget_bytes=0)
+    assert disabled.put(key(1), ROWS) is ROWS and disabled.get(key(1)) is None
+    small = ResultStore(str(tmp_path), budget_bytes=FILE_BYTES - 1)
+    assert small.put(key(1), ROWS) is ROWS
+    assert os.listdir(tmp_path) == []
+
+
+def test_unwritable_root_returns_rows(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = ResultStore(str(blocker / "store"))
+    assert store.put(key(1), ROWS) is ROWS and store.get(key(1)) is None
@@ -0,0 +1,330 @@
+"""여러 앱에서 함께 쓰는 Streamlit 화면 요소"""
+import operator
+import uuid
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from lotto import analytics, budget, export, metrics
+from lotto.cache import make_key, result_cache
+from lotto.constraints import Constraints
+from lotto.jobs import CANCELLED, FAILED, job_runner
+from lotto.rank_index import RankIndex, parse_tickets
+from lotto.results import check_numbers
+
+# 실행 중인 작업의 진행 상황 영역을 다시 그리는 간격 (초)
+POLL_SECONDS = 0.5
+# 결과 표 한 페이지의 행 수
+PAGE_SIZE = 10000
+# 결과 비교 연산 (RankIndex끼리)
+SET_OPS = {"A ∩ B": operator.and_, "A ∪ B": operator.or_, "A − B": operator.sub}
+# 0~255의 두 자리 표시 문자열 ("07")
+_TWO_DIGITS = np.array([f"{i:02d}" for i in range(256)], dtype=object)
+
+
+def render_job(job, key):
+    """작업 진행 상황과 취소 버튼 표시 (실행 중이면 이 영역만 POLL_SECONDS마다 다시 그림)"""
+    if job.status == FAILED:
+        st.error(f"❌ 조합 생성 중 오류가 발생했습니다: {job.error}")
+    elif job.status == CANCELLED:
+        st.warning(f"⏹ 생성이 취소되었습니다. 부분 결과 {job.rows:,}행")
+    elif job.capped:
+        st.warning(f"✂️ 작업 한도에 걸려 {job.rows:,}행까지만 생성했습니다.")
+    elif job.active:
+        _render_progress(job, key)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _render_progress(job, key):
+    """실행 중인 작업의 진행 상황 (프래그먼트라 주기적으로 이 영역만 다시 실행)
+
+    작업이 끝나거나 취소되면 결과를 그리도록 앱 전체를 한 번 다시 실행한다.
+    """
+    if not job.active:
+        st.rerun()
+    text = f"조합 생성 중... {job.rows:,}행 생성 / 탐색 {job.nodes:,}개 ({job.elapsed:.1f}초)"
+    if job.total:
+        st.progress(min(job.rows / job.total, 1.0), text=text)
+    else:
+        st.caption(text)
+    if st.button("⏹ 생성 취소", key=f"cancel_{key}"):
+        job.cancel()
+        st.rerun()
+
+
+def render_estimate(estimate, key, sampling=True):
+    """생성 전 추정치 표시와 실행 방식 선택
+
+    요청 예산 안이면 None(전체 생성)을, 넘으면 고른 방식 ("cap", None) 또는
+    ("sample", 추출 수)를 돌려준다. sampling이 False면 제한 생성만 고를 수 있다.
+    """
+    st.caption(f"📏 {estimate.describe()}")
+    reason = estimate.over()
+    if reason is None:
+        return None
+    st.warning(f"⚠️ {reason} 전체를 생성하지 않고 아래 방식으로 실행합니다.")
+    limits = []
+    if budget.MAX_ROWS:
+        limits.append(f"{budget.MAX_ROWS:,}행")
+    if budget.MAX_SECONDS:
+        limits.append(f"{budget.MAX_SECONDS:,.0f}초")
+    modes = [f"앞에서부터 {' / '.join(limits)}까지만 생성"]
+    if sampling:
+        modes.append("무작위 추출")
+    mode = st.radio("실행 방식", modes, horizontal=True, key=f"{key}_budget_mode")
+    if mode == modes[0]:
+        return "cap", None
+    k = st.number_input("추출할 조합 수", 1, budget.MAX_ROWS or None, min(10000, budget.MAX_ROWS or 10000),
+                        key=f"{key}_sample_size")
+    return "sample", k
+
+
+def submit_job(plan, estimate, blocks_factory, cache_key, total=None, width=6, view=None, constraints=None):
+    """render_estimate의 계획대로 작업 등록 (서버 예산이 모자라면 오류를 표시하고 None)
+
+    제한 생성과 무작위 추출은 행 수/시간 상한을 걸고, 같은 입력이어도 실행마다 결과가
+    다르므로 실행마다 다른 키로 저장한다. 추출은 view(조건 없는 LazyCombos)에서 뽑아
+    constraints를 통과한 행만 남긴다.
+    """
+    try:
+        if plan is None:
+            return job_runner.submit(blocks_factory, width, cache_key, total, cost=estimate.seconds)
+        mode, k = plan
+        variant, inputs, options = cache_key
+        run_key = make_key(variant, inputs, **dict(options), plan=mode, draw=uuid.uuid4().hex)
+        seconds = budget.MAX_SECONDS or None
+        cost = estimate.seconds if seconds is None else min(estimate.seconds, seconds)
+        if mode == "sample":
+            return job_runner.submit(
+                lambda stats: budget.iter_sample_blocks(view, k, constraints, stats),
+                width, run_key, k, cost=cost, seconds=seconds,
+            )
+        return job_runner.submit(blocks_factory, width, run_key, total, cost=cost,
+                                 limit=budget.MAX_ROWS or None, seconds=seconds)
+    except budget.BudgetExceeded as e:
+        st.error(f"❌ {e}")
+        return None
+
+
+def check_inputs(inputs):
+    """결과 배열에 담을 수 없는 숫자가 있으면 오류를 표시하고 빈 입력을 돌려줌"""
+    try:
+        check_numbers(inputs)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return [[] for _ in inputs]
+    return inputs
+
+
+def render_constraints(key):
+    """추가 조건 입력란 (조건이 없으면 None, 잘못 입력하면 오류 표시 후 None)"""
+    with st.expander("추가 조건"):
+        text = st.text_input(
+            "조건 (쉼표로 구분)", key=f"{key}_rules",
+            placeholder="sum=100-160, odd=2-4, consecutive=2, group=2",
+            help="sum=합 범위, odd=홀수 개수 범위, consecutive=연속 숫자 최대 길이, "
+                 "group=10단위 구간별 최대 개수, filter=필터 숫자 최대 개수",
+        )
+        try:
+            constraints = Constraints.parse(text)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return None
+    return constraints or None
+
+
+def render_pages(view, columns, key, page_size=PAGE_SIZE):
+    """결과(ComboArray 또는 LazyCombos)를 페이지 단위로 표시 (현재 페이지만 DataFrame으로 만듦)"""
+    total_pages = max((len(view) - 1) // page_size + 1, 1)
+    page = st.number_input(f"페이지 번호 (전체 {total_pages:,}쪽)", 1, total_pages, 1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    frame = memo(view, f"{key}_frame", "dataframe", lambda: view.to_frame(columns, start, start + page_size),
+                 start, page_size)
+    st.dataframe(frame)
+
+
+def two_digit_frame(view, columns, start, stop):
+    """[start, stop) 구간을 두 자리 문자열 DataFrame으로 (칸마다 포맷하지 않고 표에서 한 번에 찾음)"""
+    frame = view.to_frame(columns, start, stop)
+    return pd.DataFrame(_TWO_DIGITS[frame.to_numpy()], columns=columns)
+
+
+def memo(result, key, stage_name, build, *version):
+    """결과에서 만든 값(색인, 분석, 표)을 세션에 두고 결과가 바뀌거나 행이 늘었거나
+    version(페이지 등)이 바뀌었을 때만 다시 만듦
+    """
+    built = st.session_state.get(key)
+    if built is None or built[0] is not result or built[1] != (len(result), *version):
+        with metrics.stage(stage_name) as stage:
+            built = (result, (len(result), *version), build())
+            stage.set(rows=len(result))
+        st.session_state[key] = built
+    return built[2]
+
+
+def memo_on_click(result, key, stage_name, build, label, *version):
+    """memo와 같지만 결과가 바뀐 뒤 처음 만들 때는 버튼을 눌러야 만듦 (누르기 전에는 None)
+
+    분석이나 색인처럼 결과 크기에 비례해 오래 걸리는 값을 화면을 그릴 때마다 만들지
+    않도록 쓴다.
+    """
+    built = st.session_state.get(key)
+    if built is None or built[0] is not result or built[1] != (len(result), *version):
+        if not st.button(label, key=f"{key}_build"):
+            return None
+    return memo(result, key, stage_name, build, *version)
+
+
+def render_download(label, rows, columns, fmt, base_name, key, source=None, encoding="utf-8-sig", **kwargs):
+    """다운로드 버튼 (파일은 버튼을 누를 때 만들고, 같은 결과·형식이면 만든 파일을 다시 줌)
+
+    rows는 결과(ComboArray, StoredResult, 배열)이거나 블록 이터러블을 돌려주는 함수다.
+    함수일 때는 source(작업 등)가 같은 동안 같은 파일로 본다. 화면을 다시 그릴 때는
+    내보내기를 하지 않으며, 버튼을 눌러도 스크립트를 다시 실행하지 않는다. 만든 파일은
+    세션이 아니라 메모리 예산이 있는 전역 캐시에 두므로, 밀려나면 다음 클릭에 다시 만든다.
+    """
+    file_name, mime = export.file_info(fmt, base_name)
+    origin = rows if source is None else source
+    version = (fmt, encoding) if callable(rows) else (fmt, encoding, len(rows))
+    # 세션 상태는 버튼 클릭을 처리하는 서버 스레드에서 읽을 수 없으므로 딕셔너리를 직접 넘김
+    built = st.session_state.setdefault(f"{key}_download", {})
+    # 서버 스레드에서도 이 세션의 측정 설정과 최근 기록을 따르도록 지금 기록기를 넘김
+    parent = metrics.current()
+
+    def export_file():
+        recorder = metrics.start(f"download.{key}", like=parent, fmt=fmt)
+        data = export.export_rows(rows() if callable(rows) else rows, columns, fmt, encoding).read()
+        recorder.finish(bytes=len(data))
+        return data
+
+    def build():
+        entry = built.get("file")
+        if entry is None or entry[0] is not origin or entry[1] != version:
+            entry = built["file"] = (origin, version, ("download", uuid.uuid4().hex))
+        return result_cache.get_or_compute(entry[2], export_file)
+
+    st.download_button(label, build, file_name=file_name, mime=mime, key=f"{key}_download_button",
+                       on_click="ignore", **kwargs)
+
+
+def render_index_tools(result, key):
+    """결과(ComboArray)의 순위 색인으로 번호표 일괄 조회와 결과끼리 비교
+
+    색인은 버튼을 눌렀을 때 만들고, 그 뒤로는 결과가 바뀌거나 행이 늘었을 때 다시 누르면
+    다시 만든다. 저장한 색인은 세션의 saved_indexes에 이름별로 남아 다른 입력/탭의 결과와
+    교집합/합집합/차집합을 낸다.
+    """
+    with st.expander("🔎 번호 조회 / 결과 비교"):
+        index = memo_on_click(result, f"{key}_index", "rank_index", lambda: RankIndex.from_rows(np.asarray(result)),
+                              f"🔎 결과 {len(result):,}개로 조회용 색인 만들기")
+        if index is None:
+            return
+        columns = [f"숫자{i+1}" for i in range(6)]
+
+        upload = st.file_uploader("번호표 파일 (한 줄에 숫자 6개)", type=["txt", "csv"], key=f"{key}_tickets_file")
+        text = st.text_area("번호표 직접 입력", placeholder="1 5 12 23 34 45", key=f"{key}_tickets_text")
+        lines = text.splitlines()
+        if upload is not None:
+            lines += upload.getvalue().decode("utf-8-sig", errors="replace").splitlines()
+        tickets, bad = parse_tickets(lines)
+        if bad:
+            st.warning(f"숫자 6개로 읽을 수 없는 줄 {len(bad):,}개를 건너뛰었습니다 (줄 {bad[:10]})")
+        if len(tickets):
+            found = index.contains(tickets)
+            st.write(f"번호표 {len(tickets):,}개 중 **{int(found.sum()):,}개**가 결과에 있습니다.")
+            frame = pd.DataFrame(tickets[:PAGE_SIZE], columns=columns)
+            frame["포함"] = found[:PAGE_SIZE]
+            st.dataframe(frame, hide_index=True)
+
+        saved = st.session_state.setdefault("saved_indexes", {})
+        name = st.text_input("저장 이름", value=f"{key} ({len(index):,}개)", key=f"{key}_save_name")
+        if st.button("현재 결과를 비교용으로 저장", key=f"{key}_save"):
+            saved[name] = index
+        if not saved:
+            return
+        choices = {"(현재 결과)": index, **saved}
+        left, right = st.columns(2)
+        a = left.selectbox("A", list(choices), key=f"{key}_cmp_a")
+        b = right.selectbox("B", list(choices), index=1, key=f"{key}_cmp_b")
+        op = st.radio("연산", list(SET_OPS), horizontal=True, key=f"{key}_cmp_op")
+        with metrics.stage("set_op") as stage:
+            combined = SET_OPS[op](choices[a], choices[b])
+            stage.set(rows=len(combined))
+        st.write(f"{op}: **{len(combined):,}개**")
+        if len(combined):
+            render_pages(combined, columns, key=f"{key}_cmp")
+
+
+def render_analytics(results, key):
+    """분석 탭 (results: 이름 → 결과 ComboArray, 생성 중이거나 없으면 None)
+
+    요약은 결과 전체를 훑으므로 버튼을 눌렀을 때만 만든다.
+    """
+    available = {name: rows for name, rows in results.items() if rows is not None and len(rows)}
+    if not available:
+        st.info("분석할 결과가 없습니다. 조합 생성이 끝나면 여기에서 분석합니다.")
+        return
+    name = st.radio("분석할 결과", list(available), horizontal=True, key=f"{key}_analytics_source")
+    result = available[name]
+    summary = memo_on_click(result, f"{key}_analytics_{name}", "analytics",
+                            lambda: analytics.summarize(np.asarray(result)), f"📈 {name} {len(result):,}개 분석")
+    if summary is not None:
+        render_summary(summary, key)
+
+
+def render_summary(summary, key):
+    """analytics.Summary 표시 (번호 빈도, 분포, 자주 함께 나온 쌍/세 숫자)"""
+    st.write(f"분석 대상: **{summary.rows:,}개** 조합")
+    st.write("#### 번호별 빈도")
+    st.bar_chart(summary.frequency_frame(), x="번호", y="횟수")
+    left, right = st.columns(2)
+    with left:
+        st.write("#### 합계 분포")
+        st.bar_chart(summary.sum_frame(), x="합계", y="횟수")
+    with right:
+        st.write("#### 홀짝 분포")
+        st.dataframe(summary.odd_frame(), hide_index=True)
+        st.write("#### 필터 숫자 개수")
+        st.dataframe(summary.filter_frame(), hide_index=True)
+    top = st.number_input("상위 몇 개까지 볼지", 5, 1000, 20, key=f"{key}_analytics_top")
+    left, right = st.columns(2)
+    with left:
+        st.write("#### 자주 함께 나온 쌍")
+        st.dataframe(summary.pair_frame(top), hide_index=True)
+    with right:
+        st.write("#### 자주 함께 나온 세 숫자")
+        triples = summary.triple_frame(top)
+        if triples is None:
+            st.caption("127보다 큰 숫자가 있으면 세 숫자는 세지 않습니다.")
+        else:
+            st.dataframe(triples, hide_index=True)
+    with st.expander("번호 × 번호 동시 출현 표"):
+        st.dataframe(summary.pair_matrix_frame())
+
+
+def start_metrics(name):
+    """이 스크립트 실행의 기록기를 정하고 사이드바 성능 측정 패널을 그림
+
+    측정 여부와 최근 기록은 세션마다 따로 두므로 다른 세션에 영향을 주지 않는다.
+    메모리는 서버를 LOTTO_METRICS_MEMORY=1로 시작했을 때만 기록된다.
+    """
+    recent = st.session_state.setdefault("metrics_recent", metrics.new_recent())
+    with st.sidebar.expander("⏱ 성능 측정"):
+        on = st.toggle("단계별 시간 측정 (이 세션)", value=metrics.enabled(), key="metrics_enabled")
+        metrics.start(name, enabled=on, recent=recent)
+        if not recent:
+            st.caption("기록된 요청이 없습니다.")
+            return
+        rows = []
+        for record in reversed(recent):
+            for stage in record["stages"]:
+                rows.append({
+                    "요청": record["request"],
+                    "시각": record["at"],
+                    "단계": stage["name"],
+                    "시간(초)": stage["seconds"],
+                    "최대 메모리(MB)": None if stage["peak_bytes"] is None else stage["peak_bytes"] / 2 ** 20,
+                    "행": stage.get("rows"),
+                })
+        st.dataframe(pd.DataFrame(rows), hide_index=True)